@@ -1,134 +1,86 @@
 import os
-import google.generativeai as genai
-from groq import Groq
 import json
-from typing import Dict, List, Any
-import pdfplumber
-import io
-import httpx
+from typing import Dict, List, Any, Tuple
 import random
 from datetime import datetime
 
+import llm_gateway
+from resume_cache import ResumeCache
+from pdf_extraction import PDFExtractionPool, PDFExtractionBusy, PDFExtractionError
+from skill_taxonomy import extract_skills, canonicalize_skills
+# Provider clients live in the gateway (re-exported for setup scripts)
+from llm_gateway import gemini_model, gemini_flash, groq_client, mistral_client, openrouter_client
+
 # Initialize APIs
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
 GROQ_API_KEY = os.environ.get('GROQ_API_KEY')
 OPENROUTER_API_KEY = os.environ.get('OPENROUTER_API_KEY')
 MISTRAL_API_KEY = os.environ.get('MISTRAL_API_KEY')
 
-# Gemini (for resume parsing and fast questions)
-gemini_flash = None
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-    gemini_model = genai.GenerativeModel('gemini-pro')
-    # Also initialize Gemini 2.0 Flash for fast question generation
-    try:
-        gemini_flash = genai.GenerativeModel('gemini-2.0-flash-exp')
-        print("✅ Gemini 2.0 Flash initialized (FREE, 3x faster)")
-    except:
-        gemini_flash = None
-        print("⚠️ Gemini 2.0 Flash not available, using gemini-pro")
-
-# Groq (primary for questions and feedback)
-if GROQ_API_KEY:
-    groq_client = Groq(api_key=GROQ_API_KEY)
-    print("✅ Groq API initialized (FREE & UNLIMITED)")
-else:
-    groq_client = None
-
-# Mistral AI (FREE tier - excellent for feedback generation)
-mistral_client = None
-if MISTRAL_API_KEY and MISTRAL_API_KEY != 'your_mistral_key_here':
-    mistral_client = httpx.AsyncClient(
-        base_url="https://api.mistral.ai/v1",
-        headers={
-            "Authorization": f"Bearer {MISTRAL_API_KEY}",
-            "Content-Type": "application/json"
-        },
-        timeout=30.0
-    )
-    print("✅ Mistral AI initialized (FREE tier)")
-
-# OpenRouter client for DeepSeek (Fallback)
-openrouter_client = None
-if OPENROUTER_API_KEY:
-    openrouter_client = httpx.AsyncClient(
-        base_url="https://openrouter.ai/api/v1",
-        headers={
-            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-            "HTTP-Referer": "http://localhost:3000",
-            "X-Title": "AI Interview System"
-        },
-        timeout=30.0
-    )
-    print("✅ OpenRouter API initialized")
+# Race question providers instead of waiting out a slow one (see llm_gateway hedging)
+HEDGE_QUESTIONS = os.environ.get('LLM_HEDGE_QUESTIONS', 'true').lower() == 'true'
 
 
 class ResumeParser:
     """Enhanced resume parser using multiple AI models and strategies"""
     
+    # Part of the parse cache key - bump when extraction, prompts or
+    # post-processing change so stale cached parses are ignored
+    PARSER_VERSION = '3'
+    
     @staticmethod
     async def parse_pdf(pdf_content: bytes) -> Dict[str, Any]:
-        """Extract text from PDF and parse with enhanced AI analysis"""
+        """Extract text from PDF and parse with enhanced AI analysis (cached by file content)"""
+        return await ResumeCache.get_or_parse(
+            ResumeCache.key(pdf_content, ResumeParser.PARSER_VERSION),
+            lambda: ResumeParser._parse_pdf_uncached(pdf_content)
+        )
+    
+    @staticmethod
+    async def _parse_pdf_uncached(pdf_content: bytes) -> Tuple[Dict[str, Any], bool]:
+        """Returns (result, cacheable) - fallback data is not cacheable"""
         try:
             # Enhanced PDF text extraction
-            text = ResumeParser._extract_text_from_pdf(pdf_content)
+            text = await ResumeParser._extract_text_from_pdf(pdf_content)
             
             if not text.strip():
                 raise Exception("No text could be extracted from the PDF")
             
             print(f"Extracted text length: {len(text)} characters")
             
-            # Try Groq first (reliable and fast)
-            try:
-                result = await ResumeParser._parse_with_groq(text)
-                if result and ResumeParser._validate_parsing_result(result):
-                    print("Successfully parsed with Groq")
-                    return result
-            except Exception as e:
-                print(f"Groq parsing failed: {e}")
-            
-            # Fallback to Gemini if Groq fails
-            try:
-                result = await ResumeParser._parse_with_gemini(text)
-                if result and ResumeParser._validate_parsing_result(result):
-                    print("Successfully parsed with Gemini")
-                    return result
-            except Exception as e:
-                print(f"Gemini parsing failed: {e}")
+            # Groq first (reliable and fast), Gemini as fallback - reordered or
+            # skipped by the circuit breakers when a provider is unhealthy
+            parsers = {
+                'groq': ('Groq', ResumeParser._parse_with_groq),
+                'gemini': ('Gemini', ResumeParser._parse_with_gemini)
+            }
+            for provider in llm_gateway.health.rank(['groq', 'gemini']):
+                provider_name, parse = parsers[provider]
+                try:
+                    result = await parse(text)
+                    if result and ResumeParser._validate_parsing_result(result):
+                        print(f"Successfully parsed with {provider_name}")
+                        return result, True
+                except Exception as e:
+                    print(f"{provider_name} parsing failed: {e}")
             
             # If both fail, return structured mock data
-            return ResumeParser._generate_fallback_data(text)
+            return ResumeParser._generate_fallback_data(text), False
             
+        except PDFExtractionBusy:
+            raise
         except Exception as e:
             print(f"Error in resume parsing: {e}")
-            return ResumeParser._generate_fallback_data("")
+            return ResumeParser._generate_fallback_data(""), False
     
     @staticmethod
-    def _extract_text_from_pdf(pdf_content: bytes) -> str:
-        """Enhanced PDF text extraction with multiple strategies"""
-        text = ""
-        
+    async def _extract_text_from_pdf(pdf_content: bytes) -> str:
+        """Enhanced PDF text extraction, run in the PDF worker pool"""
         try:
-            # Strategy 1: pdfplumber (best for most PDFs)
-            with pdfplumber.open(io.BytesIO(pdf_content)) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-        except Exception as e:
-            print(f"pdfplumber extraction failed: {e}")
-        
-        # Strategy 2: PyPDF2 fallback if pdfplumber fails
-        if not text.strip():
-            try:
-                import PyPDF2
-                pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_content))
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-            except Exception as e:
-                print(f"PyPDF2 extraction failed: {e}")
-        
-        return text.strip()
+            return await PDFExtractionPool.extract(pdf_content)
+        except PDFExtractionError as e:
+            print(f"PDF extraction failed: {e}")
+            return ""
     
     @staticmethod
     async def _parse_with_gemini(text: str) -> Dict[str, Any]:
@@ -222,8 +174,10 @@ Resume Text:
 
 JSON Response:"""
         
-        response = gemini_model.generate_content(prompt)
-        result_text = response.text.strip()
+        result_text = await llm_gateway.complete(
+            [{"role": "user", "content": prompt}],
+            'resume_gemini'
+        )
         
         # Clean up the response
         result_text = ResumeParser._clean_json_response(result_text)
@@ -335,17 +289,13 @@ Return only the JSON object:"""
             raise Exception("Groq client not initialized - GROQ_API_KEY missing")
         
         try:
-            completion = groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",  # Updated model for better parsing
-                messages=[
+            result_text = await llm_gateway.complete(
+                [
                     {"role": "system", "content": "You are an expert resume parser. Extract comprehensive information and return only valid JSON."},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.1,
-                max_tokens=2500
+                'resume_groq'
             )
-            
-            result_text = completion.choices[0].message.content.strip()
             print(f"✅ Groq raw response length: {len(result_text)}")
             
             result_text = ResumeParser._clean_json_response(result_text)
@@ -410,8 +360,8 @@ Return only the JSON object:"""
         elif not isinstance(data.get('skills'), list):
             data['skills'] = []
         
-        # Clean up skills list
-        data['skills'] = [skill.strip() for skill in data.get('skills', []) if skill.strip()]
+        # Canonical names ("node", "NodeJS" -> "Node.js") without duplicates
+        data['skills'] = canonicalize_skills(data.get('skills', []))
         
         # Ensure experience is properly formatted
         if not isinstance(data.get('experience'), list):
@@ -424,33 +374,14 @@ Return only the JSON object:"""
         # Extract additional skills from text if not found
         if len(data.get('skills', [])) < 3:
             additional_skills = ResumeParser._extract_skills_from_text(original_text)
-            data['skills'] = list(set(data.get('skills', []) + additional_skills))
+            data['skills'] = canonicalize_skills(data.get('skills', []) + additional_skills)
         
         return data
     
     @staticmethod
     def _extract_skills_from_text(text: str) -> List[str]:
-        """Extract technical skills from text using pattern matching"""
-        import re
-        
-        # Common technical skills patterns
-        skill_patterns = [
-            r'\b(Python|Java|JavaScript|TypeScript|C\+\+|C#|PHP|Ruby|Go|Rust|Swift|Kotlin)\b',
-            r'\b(React|Angular|Vue|Node\.js|Express|Django|Flask|Spring|Laravel)\b',
-            r'\b(HTML|CSS|SCSS|SASS|Bootstrap|Tailwind)\b',
-            r'\b(MySQL|PostgreSQL|MongoDB|Redis|SQLite|Oracle)\b',
-            r'\b(AWS|Azure|GCP|Docker|Kubernetes|Jenkins|Git|GitHub)\b',
-            r'\b(Machine Learning|AI|Data Science|TensorFlow|PyTorch)\b'
-        ]
-        
-        skills = []
-        text_upper = text.upper()
-        
-        for pattern in skill_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            skills.extend(matches)
-        
-        return list(set(skills))
+        """Extract technical skills from text using the compiled skill taxonomy"""
+        return extract_skills(text)
     
     @staticmethod
     def _validate_parsing_result(result: Dict[str, Any]) -> bool:
@@ -507,6 +438,59 @@ Return only the JSON object:"""
         }
 
 
+class ConversationState:
+    """
+    Running summary of an interview conversation
+    
+    Keeps the counters AIInterviewer plans with (questions per section, covered
+    topics, asked questions) up to date as entries are appended, so a turn does
+    not rescan the whole history. Anywhere a conversation_history list is
+    accepted, a ConversationState can be passed instead.
+    """
+    
+    def __init__(self, history: List[Dict[str, Any]] = None):
+        self.history: List[Dict[str, Any]] = []
+        self.question_count = 0
+        self.section_counts: Dict[str, int] = {}
+        self.covered_topics = set()
+        self.asked_questions: List[str] = []
+        self.first_answer: Dict[str, Any] = None
+        for entry in history or []:
+            self.append(entry)
+    
+    @staticmethod
+    def of(conversation) -> 'ConversationState':
+        if isinstance(conversation, ConversationState):
+            return conversation
+        return ConversationState(conversation)
+    
+    def append(self, entry: Dict[str, Any]):
+        self.history.append(entry)
+        if entry.get('type') == 'question':
+            self.question_count += 1
+            section = entry.get('section')
+            self.section_counts[section] = self.section_counts.get(section, 0) + 1
+            if entry.get('topic'):
+                self.covered_topics.add(entry['topic'])
+            self.asked_questions.append(entry.get('text', ''))
+        elif entry.get('type') == 'answer' and self.first_answer is None:
+            self.first_answer = entry
+    
+    def recent(self, count: int) -> List[Dict[str, Any]]:
+        return self.history[-count:]
+    
+    def fork(self) -> 'ConversationState':
+        """Independent copy for speculative turns"""
+        state = ConversationState()
+        state.history = list(self.history)
+        state.question_count = self.question_count
+        state.section_counts = dict(self.section_counts)
+        state.covered_topics = set(self.covered_topics)
+        state.asked_questions = list(self.asked_questions)
+        state.first_answer = self.first_answer
+        return state
+
+
 class AIInterviewer:
     """AI-powered interview engine with dynamic multi-turn conversations"""
     
@@ -565,9 +549,10 @@ class AIInterviewer:
     ) -> Dict[str, Any]:
         """Generate next interview question with dynamic follow-ups using AI"""
         try:
+            state = ConversationState.of(conversation_history)
+            
             # SPECIAL CASE: First question ONLY (when conversation is completely empty)
-            total_questions = len([c for c in conversation_history if c.get('type') == 'question'])
-            if total_questions == 0:
+            if state.question_count == 0:
                 candidate_name = candidate_info.get('name', 'there') if candidate_info else 'there'
                 target_role = candidate_info.get('role', 'this position') if candidate_info else 'this position'
                 
@@ -591,129 +576,296 @@ class AIInterviewer:
                     'followUpOpportunities': ['background', 'experience', 'motivation']
                 }
             
-            # Analyze conversation context for intelligent flow control
-            conversation_analysis = AIInterviewer._analyze_conversation_context(
-                conversation_history, section, previous_answer, candidate_info
+            # Decide follow-up / new topic / new section for this turn
+            plan = AIInterviewer.plan_question(
+                section, previous_answer, state, candidate_info
             )
-            
-            # Determine if we should ask a follow-up or move to next topic/section
-            should_follow_up = AIInterviewer._should_ask_follow_up(
-                conversation_analysis, section, conversation_history
-            )
-            
-            # Get current section configuration
-            section_config = next((s for s in AIInterviewer.SECTIONS if s['id'] == section), None)
-            if not section_config:
+            if plan['isComplete']:
                 return {'question': '', 'section': 'closing', 'isComplete': True}
+            section = plan['section']
             
-            # Count questions in current section
-            section_questions = [c for c in conversation_history if c.get('type') == 'question' and c.get('section') == section]
-            
-            # Determine next action: follow-up, new topic, or new section
-            if should_follow_up and len(section_questions) < section_config['max_questions']:
-                # Generate follow-up question
-                question_type = 'follow_up'
-                current_topic = conversation_analysis.get('current_topic', section_config['topics'][0])
-            elif len(section_questions) < section_config['min_questions']:
-                # Continue with current section, new topic
-                question_type = 'new_topic'
-                current_topic = AIInterviewer._get_next_topic(section_config, conversation_history)
-            elif len(section_questions) >= section_config['max_questions'] or conversation_analysis.get('section_complete', False):
-                # Move to next section
-                current_idx = next(i for i, s in enumerate(AIInterviewer.SECTIONS) if s['id'] == section)
-                if current_idx + 1 < len(AIInterviewer.SECTIONS):
-                    section = AIInterviewer.SECTIONS[current_idx + 1]['id']
-                    section_config = AIInterviewer.SECTIONS[current_idx + 1]
-                    question_type = 'new_section'
-                    current_topic = section_config['topics'][0]
-                else:
-                    return {'question': '', 'section': 'closing', 'isComplete': True}
-            else:
-                # Continue with current section, potentially new topic
-                question_type = 'continue_section'
-                current_topic = AIInterviewer._get_next_topic(section_config, conversation_history)
-            
-            # Build DETAILED resume context for AI
-            candidate_name = candidate_info.get('name', 'Candidate') if candidate_info else 'Candidate'
-            target_role = candidate_info.get('role', 'software-engineer') if candidate_info else 'software-engineer'
-            experience_level = candidate_info.get('experience', 'mid-level') if candidate_info else 'mid-level'
-            
-            # Extract introduction/background from first answer if available
-            introduction_context = ""
-            if len(conversation_history) >= 2:
-                first_answer = next((c for c in conversation_history if c.get('type') == 'answer'), None)
-                if first_answer:
-                    intro_text = first_answer.get('text', '')[:300]  # First 300 chars
-                    introduction_context = f"\n\nCANDIDATE'S INTRODUCTION (USE THIS IN YOUR QUESTIONS):\n{intro_text}\n"
-            
-            # Extract comprehensive skills
-            skills = resume_data.get('skills', [])
-            if candidate_info and candidate_info.get('skills'):
-                skills = candidate_info['skills']
-            skills_text = ', '.join(skills[:10]) if skills else 'various technologies'
-            
-            # Extract detailed projects with technologies
-            projects = candidate_info.get('projects', []) if candidate_info else resume_data.get('projects', [])
-            projects_detail = []
-            for p in projects[:3]:
-                proj_name = p.get('name', 'Project')
-                proj_tech = ', '.join(p.get('technologies', [])[:3]) if p.get('technologies') else ''
-                proj_desc = p.get('description', '')[:100]
-                projects_detail.append({
-                    'name': proj_name,
-                    'tech': proj_tech,
-                    'desc': proj_desc
-                })
-            
-            # Extract work experience with companies
-            experience = resume_data.get('experience', [])
-            experience_detail = []
-            for exp in experience[:3]:
-                exp_detail = {
-                    'title': exp.get('title', 'Role'),
-                    'company': exp.get('company', 'Company'),
-                    'responsibilities': exp.get('responsibilities', [])[:2],
-                    'technologies': exp.get('technologies', [])[:3]
-                }
-                experience_detail.append(exp_detail)
-            
-            # Build conversation context
-            recent_history = conversation_history[-6:] if len(conversation_history) > 6 else conversation_history
-            history_text = "\n".join([
-                f"{'AI' if c['type'] == 'question' else candidate_name}: {c['text']}"
-                for c in recent_history
-            ])
-            
-            # Dynamic prompts based on question type and context
-            if question_type == 'follow_up':
-                follow_up_prompts = AIInterviewer._get_follow_up_prompts(
-                    conversation_analysis, candidate_name, target_role, previous_answer
-                )
-                section_prompt = follow_up_prompts.get(
-                    conversation_analysis['follow_up_opportunities'][0] if conversation_analysis['follow_up_opportunities'] else 'elaborate',
-                    f"Ask {candidate_name} to elaborate on their previous answer with more specific details."
-                )
-            else:
-                # Topic-specific prompts for each section with resume details
-                section_prompt = AIInterviewer._get_topic_prompts(
-                    section, current_topic, candidate_name, target_role, experience_level, 
-                    skills_text, projects_detail, experience_detail
-                )
+            return await AIInterviewer.generate_planned_question(
+                plan, previous_answer, resume_data, state, candidate_info
+            )
             
-            # Enhanced context for dynamic conversations
-            conversation_context = ""
-            if question_type == 'follow_up':
-                conversation_context = f"This is a FOLLOW-UP question to dig deeper into their previous answer about: {previous_answer[:100]}..."
-            elif question_type == 'new_section':
-                conversation_context = f"This is the START of the {section.upper()} section. Transition smoothly from the previous topic."
+        except Exception as e:
+            print(f"Error generating question: {e}")
+            return AIInterviewer._fallback_question(section)
+
+    @staticmethod
+    def plan_question(
+        section: str,
+        previous_answer: str,
+        conversation_history: List[Dict[str, Any]],
+        candidate_info: Dict[str, Any] = None,
+        allow_follow_up: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Decide what kind of question comes next without calling any AI provider
+        
+        With allow_follow_up=False the answer-dependent follow-up branch is skipped,
+        which lets the next question be planned before the answer is known.
+        """
+        state = ConversationState.of(conversation_history)
+        
+        # Analyze conversation context for intelligent flow control
+        conversation_analysis = AIInterviewer._analyze_conversation_context(
+            state.history, section, previous_answer, candidate_info
+        )
+        
+        # Determine if we should ask a follow-up or move to next topic/section
+        should_follow_up = allow_follow_up and AIInterviewer._should_ask_follow_up(
+            conversation_analysis, section, state.recent(2)
+        )
+        
+        # Get current section configuration
+        section_config = next((s for s in AIInterviewer.SECTIONS if s['id'] == section), None)
+        if not section_config:
+            return {'isComplete': True}
+        
+        # Count questions in current section
+        section_question_count = state.section_counts.get(section, 0)
+        
+        # Determine next action: follow-up, new topic, or new section
+        if should_follow_up and section_question_count < section_config['max_questions']:
+            # Generate follow-up question
+            question_type = 'follow_up'
+            current_topic = conversation_analysis.get('current_topic', section_config['topics'][0])
+        elif section_question_count < section_config['min_questions']:
+            # Continue with current section, new topic
+            question_type = 'new_topic'
+            current_topic = AIInterviewer._get_next_topic(section_config, state.covered_topics)
+        elif section_question_count >= section_config['max_questions'] or conversation_analysis.get('section_complete', False):
+            # Move to next section
+            current_idx = next(i for i, s in enumerate(AIInterviewer.SECTIONS) if s['id'] == section)
+            if current_idx + 1 < len(AIInterviewer.SECTIONS):
+                section = AIInterviewer.SECTIONS[current_idx + 1]['id']
+                section_config = AIInterviewer.SECTIONS[current_idx + 1]
+                question_type = 'new_section'
+                current_topic = section_config['topics'][0]
             else:
-                conversation_context = f"Continue the conversation naturally in the {section} section, topic: {current_topic}."
+                return {'isComplete': True}
+        else:
+            # Continue with current section, potentially new topic
+            question_type = 'continue_section'
+            current_topic = AIInterviewer._get_next_topic(section_config, state.covered_topics)
+        
+        return {
+            'isComplete': False,
+            'section': section,
+            'questionType': question_type,
+            'topic': current_topic,
+            'analysis': conversation_analysis
+        }
+    
+    @staticmethod
+    async def generate_planned_question(
+        plan: Dict[str, Any],
+        previous_answer: str,
+        resume_data: Dict[str, Any],
+        conversation_history: List[Dict[str, Any]],
+        candidate_info: Dict[str, Any] = None,
+        hedge: bool = HEDGE_QUESTIONS
+    ) -> Dict[str, Any]:
+        """Generate the question for a plan from plan_question (raises if all AI providers fail)"""
+        messages, chosen_style = AIInterviewer._build_question_messages(
+            plan, previous_answer, resume_data, conversation_history, candidate_info
+        )
+        
+        # Gemini 2.0 Flash → Groq → OpenRouter (see llm_gateway.MODEL_POLICIES['question'])
+        # With hedging, the backup starts as soon as the primary exceeds its p95
+        print(f"🎯 Generating question (Style: {chosen_style})...")
+        question = await llm_gateway.complete(messages, 'question', hedge=hedge)
+        
+        return AIInterviewer._planned_result(plan, question, chosen_style)
+    
+    @staticmethod
+    async def stream_question(
+        section: str,
+        previous_answer: str,
+        resume_data: Dict[str, Any],
+        conversation_history: List[Dict[str, Any]],
+        candidate_info: Dict[str, Any] = None
+    ):
+        """
+        Streaming variant of generate_question
+        
+        Yields ('token', text) as provider tokens arrive, then ('done', result) with
+        the same metadata generate_question returns. The 'done' question is
+        authoritative - if a provider fails mid-stream it carries the fallback.
+        """
+        state = ConversationState.of(conversation_history)
+        if state.question_count == 0:
+            # Templated introduction - no AI call to stream
+            result = await AIInterviewer.generate_question(
+                section, previous_answer, resume_data, state, candidate_info
+            )
+            yield ('token', result['question'])
+            yield ('done', result)
+            return
+        
+        plan = AIInterviewer.plan_question(section, previous_answer, state, candidate_info)
+        if plan['isComplete']:
+            yield ('done', {'question': '', 'section': 'closing', 'isComplete': True})
+            return
+        
+        streamed = []
+        try:
+            messages, chosen_style = AIInterviewer._build_question_messages(
+                plan, previous_answer, resume_data, state, candidate_info
+            )
+            print(f"🎯 Streaming question (Style: {chosen_style})...")
+            async for token in llm_gateway.stream(messages, 'question'):
+                streamed.append(token)
+                yield ('token', token)
+            result = AIInterviewer._planned_result(plan, ''.join(streamed).strip(), chosen_style)
+        except Exception as e:
+            print(f"Error streaming question: {e}")
+            result = AIInterviewer._fallback_question(plan['section'])
+            if not streamed:
+                yield ('token', result['question'])
+        
+        yield ('done', result)
+    
+    @staticmethod
+    def question_entry(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Conversation entry for a generated question, with the metadata planning uses"""
+        return {
+            'type': 'question',
+            'text': result['question'],
+            'section': result['section'],
+            'questionType': result.get('questionType'),
+            'topic': result.get('topic'),
+            'questionStyle': result.get('questionStyle')
+        }
+    
+    @staticmethod
+    def _planned_result(plan: Dict[str, Any], question: str, chosen_style: str) -> Dict[str, Any]:
+        return {
+            'question': question,
+            'section': plan['section'],
+            'isComplete': False,
+            'questionType': plan['questionType'],
+            'topic': plan['topic'],
+            'questionStyle': chosen_style,  # Track the style used
+            'followUpOpportunities': plan['analysis'].get('follow_up_opportunities', [])
+        }
+    
+    @staticmethod
+    def _fallback_question(section: str) -> Dict[str, Any]:
+        """Static question used when every AI provider failed"""
+        fallback = {
+            'greeting': "Hello! Thank you for joining us today. Could you please introduce yourself and tell me a bit about your background?",
+            'resume': "I see you have experience with React. Can you tell me about a project where you used it?",
+            'projects': "What was the biggest technical challenge in that project, and how did you overcome it?",
+            'behavioral': "Tell me about a time when you had to work with a difficult team member. How did you handle it?",
+            'technical': "Can you explain the difference between props and state in React?",
+            'closing': "Do you have any questions for us about the role or the company?"
+        }
+        return {
+            'question': fallback.get(section, "Can you tell me more about your experience?"),
+            'section': section,
+            'isComplete': False,
+            'questionType': 'fallback',
+            'topic': 'general'
+        }
+    
+    @staticmethod
+    def _build_question_messages(
+        plan: Dict[str, Any],
+        previous_answer: str,
+        resume_data: Dict[str, Any],
+        conversation_history: List[Dict[str, Any]],
+        candidate_info: Dict[str, Any] = None
+    ):
+        """Build the system/user messages for a planned question; returns (messages, chosen_style)"""
+        state = ConversationState.of(conversation_history)
+        section = plan['section']
+        question_type = plan['questionType']
+        current_topic = plan['topic']
+        conversation_analysis = plan['analysis']
+        
+        # Build DETAILED resume context for AI
+        candidate_name = candidate_info.get('name', 'Candidate') if candidate_info else 'Candidate'
+        target_role = candidate_info.get('role', 'software-engineer') if candidate_info else 'software-engineer'
+        experience_level = candidate_info.get('experience', 'mid-level') if candidate_info else 'mid-level'
+        
+        # Extract introduction/background from first answer if available
+        introduction_context = ""
+        if len(state.history) >= 2:
+            first_answer = state.first_answer
+            if first_answer:
+                intro_text = first_answer.get('text', '')[:300]  # First 300 chars
+                introduction_context = f"\n\nCANDIDATE'S INTRODUCTION (USE THIS IN YOUR QUESTIONS):\n{intro_text}\n"
+        
+        # Extract comprehensive skills
+        skills = resume_data.get('skills', [])
+        if candidate_info and candidate_info.get('skills'):
+            skills = candidate_info['skills']
+        skills_text = ', '.join(skills[:10]) if skills else 'various technologies'
+        
+        # Extract detailed projects with technologies
+        projects = candidate_info.get('projects', []) if candidate_info else resume_data.get('projects', [])
+        projects_detail = []
+        for p in projects[:3]:
+            proj_name = p.get('name', 'Project')
+            proj_tech = ', '.join(p.get('technologies', [])[:3]) if p.get('technologies') else ''
+            proj_desc = p.get('description', '')[:100]
+            projects_detail.append({
+                'name': proj_name,
+                'tech': proj_tech,
+                'desc': proj_desc
+            })
+        
+        # Extract work experience with companies
+        experience = resume_data.get('experience', [])
+        experience_detail = []
+        for exp in experience[:3]:
+            exp_detail = {
+                'title': exp.get('title', 'Role'),
+                'company': exp.get('company', 'Company'),
+                'responsibilities': exp.get('responsibilities', [])[:2],
+                'technologies': exp.get('technologies', [])[:3]
+            }
+            experience_detail.append(exp_detail)
+        
+        # Build conversation context
+        recent_history = state.recent(6)
+        history_text = "\n".join([
+            f"{'AI' if c['type'] == 'question' else candidate_name}: {c['text']}"
+            for c in recent_history
+        ])
+        
+        # Dynamic prompts based on question type and context
+        if question_type == 'follow_up':
+            follow_up_prompts = AIInterviewer._get_follow_up_prompts(
+                conversation_analysis, candidate_name, target_role, previous_answer
+            )
+            section_prompt = follow_up_prompts.get(
+                conversation_analysis['follow_up_opportunities'][0] if conversation_analysis['follow_up_opportunities'] else 'elaborate',
+                f"Ask {candidate_name} to elaborate on their previous answer with more specific details."
+            )
+        else:
+            # Topic-specific prompts for each section with resume details
+            section_prompt = AIInterviewer._get_topic_prompts(
+                section, current_topic, candidate_name, target_role, experience_level, 
+                skills_text, projects_detail, experience_detail
+            )
+        
+        # Enhanced context for dynamic conversations
+        conversation_context = ""
+        if question_type == 'follow_up':
+            conversation_context = f"This is a FOLLOW-UP question to dig deeper into their previous answer about: {previous_answer[:100]}..."
+        elif question_type == 'new_section':
+            conversation_context = f"This is the START of the {section.upper()} section. Transition smoothly from the previous topic."
+        else:
+            conversation_context = f"Continue the conversation naturally in the {section} section, topic: {current_topic}."
 
-            # Extract already asked questions to avoid repetition
-            asked_questions = [c['text'] for c in conversation_history if c.get('type') == 'question']
-            asked_questions_text = "\n".join([f"- {q}" for q in asked_questions[-5:]]) if asked_questions else "None yet"
-            
-            prompt = f"""You are an experienced, friendly interviewer conducting a natural {target_role} interview conversation.
+        # Extract already asked questions to avoid repetition
+        asked_questions = state.asked_questions
+        asked_questions_text = "\n".join([f"- {q}" for q in asked_questions[-5:]]) if asked_questions else "None yet"
+        
+        prompt = f"""You are an experienced, friendly interviewer conducting a natural {target_role} interview conversation.
 
 CONTEXT:
 - Candidate: {candidate_name} ({experience_level} level)
@@ -738,7 +890,7 @@ RECENT CONVERSATION:
 {history_text}
 
 CANDIDATE'S LAST ANSWER: 
-{previous_answer if previous_answer else 'No previous answer (this is the first question)'}
+{previous_answer if previous_answer else 'Not available yet - build on the conversation so far'}
 
 ALREADY ASKED QUESTIONS (DO NOT REPEAT):
 {asked_questions_text}
@@ -780,49 +932,46 @@ RESPONSE FORMAT:
 - Must be a NEW question not asked before
 
 Question:"""
-            
-            # Generate question using AI (Priority: Groq > A4F > OpenRouter)
-            question = None
-            
-            # Determine question style to force variety
-            question_styles = [
-                'behavioral_star',      # "Tell me about a time when..."
-                'situational',          # "How would you handle..."
-                'technical_deep',       # "Explain how... works"
-                'project_walkthrough',  # "Walk me through..."
-                'problem_solving',      # "If you encountered X, what would you do?"
-                'opinion_based',        # "What do you think about..."
-                'comparison',           # "What's the difference between..."
-                'experience_specific'   # "In your experience with X, how did you..."
-            ]
-            
-            # Track which styles have been used recently
-            recent_styles = [c.get('questionStyle') for c in conversation_history[-5:] if c.get('type') == 'question' and c.get('questionStyle')]
-            
-            # Choose a style that hasn't been used recently
-            available_styles = [s for s in question_styles if s not in recent_styles]
-            if not available_styles:
-                available_styles = question_styles  # Reset if all used
-            
-            chosen_style = random.choice(available_styles)
-            
-            # Add style instruction to prompt
-            style_instructions = {
-                'behavioral_star': "Use STAR format: 'Tell me about a time when...' or 'Describe a situation where...'",
-                'situational': "Ask a hypothetical: 'How would you handle...' or 'What would you do if...'",
-                'technical_deep': "Ask for technical explanation: 'Explain how... works' or 'What's your understanding of...'",
-                'project_walkthrough': "Ask for detailed walkthrough: 'Walk me through...' or 'Can you describe the process of...'",
-                'problem_solving': "Present a problem: 'If you encountered... what steps would you take?' or 'How would you approach...'",
-                'opinion_based': "Ask for opinion: 'What do you think about...' or 'What's your view on...'",
-                'comparison': "Ask for comparison: 'What's the difference between... and...' or 'How do you choose between...'",
-                'experience_specific': "Reference their experience: 'In your work with X, how did you...' or 'Given your background in Y, tell me about...'"
-            }
-            
-            style_instruction = style_instructions.get(chosen_style, "Ask a unique question")
-            enhanced_prompt = f"{prompt}\n\nQUESTION STYLE REQUIREMENT: {style_instruction}\nYou MUST use this style for this question."
-            
-            # System message emphasizing conversational flow and context awareness
-            system_message = f"""You are an experienced, empathetic technical interviewer conducting a natural conversation.
+        
+        # Determine question style to force variety
+        question_styles = [
+            'behavioral_star',      # "Tell me about a time when..."
+            'situational',          # "How would you handle..."
+            'technical_deep',       # "Explain how... works"
+            'project_walkthrough',  # "Walk me through..."
+            'problem_solving',      # "If you encountered X, what would you do?"
+            'opinion_based',        # "What do you think about..."
+            'comparison',           # "What's the difference between..."
+            'experience_specific'   # "In your experience with X, how did you..."
+        ]
+        
+        # Track which styles have been used recently
+        recent_styles = [c.get('questionStyle') for c in state.recent(5) if c.get('type') == 'question' and c.get('questionStyle')]
+        
+        # Choose a style that hasn't been used recently
+        available_styles = [s for s in question_styles if s not in recent_styles]
+        if not available_styles:
+            available_styles = question_styles  # Reset if all used
+        
+        chosen_style = random.choice(available_styles)
+        
+        # Add style instruction to prompt
+        style_instructions = {
+            'behavioral_star': "Use STAR format: 'Tell me about a time when...' or 'Describe a situation where...'",
+            'situational': "Ask a hypothetical: 'How would you handle...' or 'What would you do if...'",
+            'technical_deep': "Ask for technical explanation: 'Explain how... works' or 'What's your understanding of...'",
+            'project_walkthrough': "Ask for detailed walkthrough: 'Walk me through...' or 'Can you describe the process of...'",
+            'problem_solving': "Present a problem: 'If you encountered... what steps would you take?' or 'How would you approach...'",
+            'opinion_based': "Ask for opinion: 'What do you think about...' or 'What's your view on...'",
+            'comparison': "Ask for comparison: 'What's the difference between... and...' or 'How do you choose between...'",
+            'experience_specific': "Reference their experience: 'In your work with X, how did you...' or 'Given your background in Y, tell me about...'"
+        }
+        
+        style_instruction = style_instructions.get(chosen_style, "Ask a unique question")
+        enhanced_prompt = f"{prompt}\n\nQUESTION STYLE REQUIREMENT: {style_instruction}\nYou MUST use this style for this question."
+        
+        # System message emphasizing conversational flow and context awareness
+        system_message = f"""You are an experienced, empathetic technical interviewer conducting a natural conversation.
 
 CORE PRINCIPLES:
 1. LISTEN to their previous answers and build on them
@@ -834,103 +983,12 @@ CORE PRINCIPLES:
 7. NEVER repeat questions or patterns
 
 You're having a real conversation, not conducting a robotic Q&A session. Remember what they told you about themselves!"""
-            
-            # Try Gemini 2.0 Flash FIRST (FASTEST - 0.2s, 4x faster than Groq)
-            if gemini_flash:
-                try:
-                    print(f"🎯 Generating question with Gemini 2.0 Flash (Style: {chosen_style})...")
-                    response = await gemini_flash.generate_content_async(
-                        f"{system_message}\n\n{enhanced_prompt}",
-                        generation_config=genai.types.GenerationConfig(
-                            temperature=0.9,
-                            max_output_tokens=120,
-                            top_p=0.95
-                        )
-                    )
-                    question = response.text.strip()
-                    print(f"✅ Generated with Gemini 2.0 Flash (Style: {chosen_style}) - 0.2s ⚡")
-                except Exception as e:
-                    print(f"⚠️ Gemini Flash failed: {e}, trying Groq...")
-            
-            # Fallback to Groq (Fast and reliable)
-            if not question and groq_client:
-                try:
-                    print(f"🎯 Generating question with Groq (Style: {chosen_style})...")
-                    completion = groq_client.chat.completions.create(
-                        model="llama-3.3-70b-versatile",  # Updated model (replaces deprecated llama3-70b-8192)
-                        messages=[
-                            {"role": "system", "content": system_message},
-                            {"role": "user", "content": enhanced_prompt}
-                        ],
-                        temperature=0.9,   # High for variety and natural conversation
-                        max_tokens=120,    # Allow detailed questions
-                        top_p=0.95,        # High diversity
-                        frequency_penalty=0.8,  # Strong penalty against repetition
-                        presence_penalty=0.6,   # Encourage new topics
-                        stream=False
-                    )
-                    question = completion.choices[0].message.content.strip()
-                    print(f"✅ Generated with Groq Llama-3.3-70B (Style: {chosen_style})")
-                except Exception as e:
-                    print(f"⚠️ Groq failed: {e}, trying OpenRouter...")
-            
-            # Final fallback to OpenRouter
-            if not question and openrouter_client:
-                try:
-                    response = await openrouter_client.post(
-                        "/chat/completions",
-                        json={
-                            "model": "deepseek/deepseek-chat",
-                            "messages": [
-                                {"role": "system", "content": system_message},
-                                {"role": "user", "content": enhanced_prompt}
-                            ],
-                            "temperature": 0.9,
-                            "max_tokens": 120,
-                            "top_p": 0.95,
-                            "frequency_penalty": 0.7,
-                            "presence_penalty": 0.5
-                        }
-                    )
-                    if response.status_code == 200:
-                        result = response.json()
-                        question = result['choices'][0]['message']['content'].strip()
-                        print(f"✅ Generated with OpenRouter DeepSeek (Style: {chosen_style})")
-                except Exception as e:
-                    print(f"⚠️ OpenRouter failed: {e}")
-            
-            if not question:
-                raise Exception("All AI providers failed")
-            
-            return {
-                'question': question,
-                'section': section,
-                'isComplete': False,
-                'questionType': question_type,
-                'topic': current_topic,
-                'questionStyle': chosen_style,  # Track the style used
-                'followUpOpportunities': conversation_analysis.get('follow_up_opportunities', [])
-            }
-            
-        except Exception as e:
-            print(f"Error generating question: {e}")
-            # Fallback questions
-            fallback = {
-                'greeting': "Hello! Thank you for joining us today. Could you please introduce yourself and tell me a bit about your background?",
-                'resume': "I see you have experience with React. Can you tell me about a project where you used it?",
-                'projects': "What was the biggest technical challenge in that project, and how did you overcome it?",
-                'behavioral': "Tell me about a time when you had to work with a difficult team member. How did you handle it?",
-                'technical': "Can you explain the difference between props and state in React?",
-                'closing': "Do you have any questions for us about the role or the company?"
-            }
-            return {
-                'question': fallback.get(section, "Can you tell me more about your experience?"),
-                'section': section,
-                'isComplete': False,
-                'questionType': 'fallback',
-                'topic': 'general'
-            }
-
+        
+        return [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": enhanced_prompt}
+        ], chosen_style
+    
     @staticmethod
     def _analyze_conversation_context(conversation_history, current_section, previous_answer, candidate_info):
         """Analyze conversation to determine follow-up opportunities"""
@@ -1011,14 +1069,8 @@ You're having a real conversation, not conducting a robotic Q&A session. Remembe
         return False
     
     @staticmethod
-    def _get_next_topic(section_config, conversation_history):
+    def _get_next_topic(section_config, covered_topics):
         """Get the next topic to explore in the current section"""
-        # Find topics already covered
-        covered_topics = set()
-        for entry in conversation_history:
-            if entry.get('type') == 'question' and entry.get('topic'):
-                covered_topics.add(entry['topic'])
-        
         # Return first uncovered topic
         for topic in section_config['topics']:
             if topic not in covered_topics:
@@ -1258,18 +1310,15 @@ Be specific, constructive, and balanced. Reference actual answers from the inter
             raise Exception("Groq client not initialized - GROQ_API_KEY missing")
         
         try:
-            completion = groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",  # Updated model (replaces deprecated llama3-70b-8192)
-                messages=[
+            result_text = await llm_gateway.complete(
+                [
                     {"role": "system", "content": "You are an expert HR analyst providing comprehensive interview feedback."},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.3,
-                max_tokens=2000,
-                stream=False
+                'feedback'
             )
             print("✅ Feedback generated with Groq")
-            return completion.choices[0].message.content.strip()
+            return result_text
         except Exception as e:
             print(f"❌ Groq feedback generation failed: {e}")
             raise
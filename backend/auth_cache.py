@@ -0,0 +1,121 @@
+"""
+Authentication Cache
+Keeps get_current_user off the database on the hot path.
+
+- Verified tokens: signature/expiry checks are cached per token string until
+  the token's own expiry (bounded by size)
+- User records: short-TTL LRU keyed by user id, dropped explicitly when a
+  user changes (password reset, profile updates)
+- Claims-only mode (AUTH_CLAIMS_ONLY=true): trust the signed token's
+  user_id/email/role/name and never read the users collection. A deleted
+  user then keeps access until the token expires.
+
+Caches are per worker process; the TTL bounds how long another worker can
+serve a stale user record.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from auth_utils import decode_access_token
+
+AUTH_USER_CACHE_TTL = float(os.environ.get('AUTH_USER_CACHE_TTL', '60'))  # Seconds
+AUTH_CACHE_SIZE = int(os.environ.get('AUTH_CACHE_SIZE', '10000'))  # Entries per cache
+AUTH_CLAIMS_ONLY = os.environ.get('AUTH_CLAIMS_ONLY', 'false').lower() == 'true'
+
+
+class AuthCache:
+    """Per-process caches of verified tokens and user records"""
+
+    _tokens: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+    _users: 'OrderedDict[str, tuple]' = OrderedDict()  # user_id -> (user, cached_at)
+
+    _metrics = {
+        'tokenHits': 0,
+        'tokenMisses': 0,
+        'userHits': 0,
+        'userMisses': 0,
+        'invalidations': 0
+    }
+
+    @staticmethod
+    def _remember(cache: OrderedDict, key: str, value: Any):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > AUTH_CACHE_SIZE:
+            cache.popitem(last=False)
+
+    @staticmethod
+    def verify_token(token: str) -> Optional[Dict[str, Any]]:
+        """decode_access_token, cached until the token expires"""
+        payload = AuthCache._tokens.get(token)
+        if payload is not None:
+            if payload.get('exp', 0) > time.time():
+                AuthCache._tokens.move_to_end(token)
+                AuthCache._metrics['tokenHits'] += 1
+                return payload
+            del AuthCache._tokens[token]
+
+        AuthCache._metrics['tokenMisses'] += 1
+        payload = decode_access_token(token)
+        if payload and payload.get('user_id'):
+            AuthCache._remember(AuthCache._tokens, token, payload)
+        return payload
+
+    @staticmethod
+    async def get_user(
+        payload: Dict[str, Any],
+        load_user: Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Resolve verified token claims to the current user
+
+        Returns None when the user no longer exists. load_user(user_id)
+        fetches the user from the database on a miss.
+        """
+        user_id = payload.get('user_id')
+        if not user_id:
+            return None
+
+        if AUTH_CLAIMS_ONLY:
+            return {
+                'id': user_id,
+                'email': payload.get('email'),
+                'name': payload.get('name') or payload.get('email'),
+                'role': payload.get('role', 'user')
+            }
+
+        cached = AuthCache._users.get(user_id)
+        if cached is not None and time.monotonic() - cached[1] < AUTH_USER_CACHE_TTL:
+            AuthCache._users.move_to_end(user_id)
+            AuthCache._metrics['userHits'] += 1
+            return dict(cached[0])
+
+        AuthCache._metrics['userMisses'] += 1
+        user = await load_user(user_id)
+        if user is None:
+            AuthCache._users.pop(user_id, None)
+            return None
+        AuthCache._remember(AuthCache._users, user_id, (user, time.monotonic()))
+        return dict(user)
+
+    @staticmethod
+    def invalidate_user(user_id: Optional[str] = None, email: Optional[str] = None):
+        """Forget a changed user so the next request reloads it"""
+        AuthCache._metrics['invalidations'] += 1
+        if user_id:
+            AuthCache._users.pop(user_id, None)
+        if email:
+            for key, (user, _) in list(AuthCache._users.items()):
+                if user.get('email') == email:
+                    AuthCache._users.pop(key, None)
+
+    @staticmethod
+    def get_metrics() -> Dict[str, Any]:
+        metrics = dict(AuthCache._metrics)
+        metrics['claimsOnly'] = AUTH_CLAIMS_ONLY
+        metrics['cachedTokens'] = len(AuthCache._tokens)
+        metrics['cachedUsers'] = len(AuthCache._users)
+        return metrics
@@ -1,8 +1,11 @@
 import jwt
 import os
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from passlib.context import CryptContext
-from typing import Optional
+from typing import Optional, Tuple, Dict, Any
 
 JWT_SECRET = os.environ.get('JWT_SECRET')
 if not JWT_SECRET:
@@ -11,7 +14,19 @@ if not JWT_SECRET:
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_HOURS = 24 * 7  # 7 days
 
-pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+# bcrypt cost factor; hashes made with another cost are re-hashed on the next successful login
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+BCRYPT_THREADS = int(os.environ.get('BCRYPT_THREADS', str(min(4, os.cpu_count() or 1))))
+LOGIN_CONCURRENCY = int(os.environ.get('LOGIN_CONCURRENCY', str(BCRYPT_THREADS * 2)))  # Verifications admitted at once
+LOGIN_QUEUE_TIMEOUT = float(os.environ.get('LOGIN_QUEUE_TIMEOUT', '5'))  # Seconds a login may wait for a slot
+
+pwd_context = CryptContext(
+    schemes=['bcrypt'],
+    deprecated='auto',
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS
+)
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
@@ -21,12 +36,101 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
-def create_access_token(user_id: str, email: str, role: str) -> str:
+class PasswordHasherBusy(Exception):
+    """Raised when a login waited too long for a verification slot"""
+
+
+class PasswordHasher:
+    """
+    bcrypt off the event loop
+
+    bcrypt releases the GIL, so a small dedicated thread pool hashes in
+    parallel while the loop keeps serving requests. Logins are additionally
+    capped by a semaphore so a burst queues (and eventually sheds) instead of
+    piling hundreds of ~250ms jobs onto the pool.
+    """
+    
+    _executor: Optional[ThreadPoolExecutor] = None
+    _login_slots: Optional[asyncio.Semaphore] = None
+    
+    _metrics = {
+        'hashes': 0,
+        'verifications': 0,
+        'rehashed': 0,
+        'rejected': 0,      # Logins shed after LOGIN_QUEUE_TIMEOUT
+        'totalMs': 0.0
+    }
+    
+    @staticmethod
+    def _get_executor() -> ThreadPoolExecutor:
+        if PasswordHasher._executor is None:
+            PasswordHasher._executor = ThreadPoolExecutor(max_workers=BCRYPT_THREADS, thread_name_prefix='bcrypt')
+        return PasswordHasher._executor
+    
+    @staticmethod
+    async def _run(fn, *args):
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(PasswordHasher._get_executor(), fn, *args)
+        finally:
+            PasswordHasher._metrics['totalMs'] += (time.perf_counter() - started) * 1000
+    
+    @staticmethod
+    async def hash(password: str) -> str:
+        PasswordHasher._metrics['hashes'] += 1
+        return await PasswordHasher._run(pwd_context.hash, password)
+    
+    @staticmethod
+    async def verify_login(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a login password under the login concurrency limit
+        
+        Returns (valid, new_hash); new_hash is set when the stored hash used a
+        different cost and should be replaced.
+        
+        Raises:
+            PasswordHasherBusy: no slot freed up within LOGIN_QUEUE_TIMEOUT
+        """
+        if PasswordHasher._login_slots is None:
+            PasswordHasher._login_slots = asyncio.Semaphore(LOGIN_CONCURRENCY)
+        try:
+            await asyncio.wait_for(PasswordHasher._login_slots.acquire(), timeout=LOGIN_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            PasswordHasher._metrics['rejected'] += 1
+            raise PasswordHasherBusy("Too many concurrent logins")
+        try:
+            PasswordHasher._metrics['verifications'] += 1
+            valid, new_hash = await PasswordHasher._run(pwd_context.verify_and_update, plain_password, hashed_password)
+            if new_hash:
+                PasswordHasher._metrics['rehashed'] += 1
+            return valid, new_hash
+        finally:
+            PasswordHasher._login_slots.release()
+    
+    @staticmethod
+    def shutdown():
+        executor = PasswordHasher._executor
+        PasswordHasher._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False)
+    
+    @staticmethod
+    def get_metrics() -> Dict[str, Any]:
+        metrics = dict(PasswordHasher._metrics)
+        jobs = metrics['hashes'] + metrics['verifications']
+        metrics['avgMs'] = round(metrics.pop('totalMs') / jobs, 1) if jobs else 0.0
+        metrics['rounds'] = BCRYPT_ROUNDS
+        metrics['threads'] = BCRYPT_THREADS
+        metrics['loginConcurrency'] = LOGIN_CONCURRENCY
+        return metrics
+
+def create_access_token(user_id: str, email: str, role: str, name: Optional[str] = None) -> str:
     """Create a JWT access token"""
     payload = {
         'user_id': user_id,
         'email': email,
         'role': role,
+        'name': name,
         'exp': datetime.utcnow() + timedelta(hours=JWT_EXPIRATION_HOURS),
         'iat': datetime.utcnow()
     }
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark the API's hot MongoDB queries with and without the declared indexes
+
+Seeds a scratch database with N interviews (default 100k) spread over a few
+hundred users, times each query the API runs per request, then applies
+db_indexes.INDEXES and times them again. The winning plan stage (COLLSCAN vs
+IXSCAN) is printed next to each latency. The scratch database is dropped at
+the end.
+
+Usage:
+    MONGO_URL=mongodb://localhost:27017 python benchmark_db_indexes.py [--interviews 100000] [--repeat 50]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from db_indexes import DBIndexes
+
+STATUSES = ['completed', 'completed', 'completed', 'active', 'pending']
+
+
+async def seed(db, interview_count: int, user_count: int, rng: random.Random):
+    users = [f"user{i:05d}" for i in range(user_count)]
+    await db.users.insert_many([
+        {'_id': f"id-{name}", 'email': f"{name}@example.com", 'name': name} for name in users
+    ])
+    await db.campaigns.insert_many([
+        {'recruiterId': f"id-{rng.choice(users)}", 'title': f"Campaign {i}"} for i in range(user_count * 2)
+    ])
+
+    now = datetime.utcnow()
+    batch, interview_ids = [], []
+    for i in range(interview_count):
+        interview_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        status = rng.choice(STATUSES)
+        created = now - timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+        interview_ids.append(interview_id)
+        batch.append({
+            'interviewId': interview_id,
+            'createdBy': f"id-{rng.choice(users)}",
+            'status': status,
+            'createdAt': created,
+            'completedAt': created + timedelta(minutes=30) if status == 'completed' else None,
+            'candidateName': f"Candidate {i}",
+            'scores': {'overall': rng.randint(40, 95)},
+            # Realistic document size: transcripts dominate
+            'conversation': [{'type': 'answer', 'text': 'x' * 200} for _ in range(10)]
+        })
+        if len(batch) == 5000:
+            await db.interviews.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await db.interviews.insert_many(batch, ordered=False)
+    return users, interview_ids
+
+
+def queries(users, interview_ids, rng: random.Random):
+    """Each entry: name -> fn(db) returning an awaitable, mirroring server.py"""
+    return {
+        'users.find_one(email)': lambda db: db.users.find_one({'email': f"{rng.choice(users)}@example.com"}),
+        'interviews.find_one(interviewId)': lambda db: db.interviews.find_one({'interviewId': rng.choice(interview_ids)}),
+        'interviews.find(createdBy,status)': lambda db: db.interviews.find(
+            {'createdBy': f"id-{rng.choice(users)}", 'status': 'completed'}
+        ).to_list(1000),
+        'campaigns.find(recruiterId)': lambda db: db.campaigns.find({'recruiterId': f"id-{rng.choice(users)}"}).to_list(1000),
+    }
+
+
+async def plan_stage(db, name: str, users, interview_ids) -> str:
+    filters = {
+        'users.find_one(email)': ('users', {'email': f"{users[0]}@example.com"}),
+        'interviews.find_one(interviewId)': ('interviews', {'interviewId': interview_ids[0]}),
+        'interviews.find(createdBy,status)': ('interviews', {'createdBy': f"id-{users[0]}", 'status': 'completed'}),
+        'campaigns.find(recruiterId)': ('campaigns', {'recruiterId': f"id-{users[0]}"}),
+    }
+    collection, query = filters[name]
+    explain = await db[collection].find(query).explain()
+    stage = explain['queryPlanner']['winningPlan']
+    stage = stage.get('queryPlan', stage)  # Slot-based engine nests the classic plan
+    while 'inputStage' in stage and stage.get('stage') not in ('COLLSCAN', 'IXSCAN'):
+        stage = stage['inputStage']
+    return stage.get('stage', '?')
+
+
+async def measure(db, users, interview_ids, repeat: int, rng: random.Random):
+    results = {}
+    for name, run in queries(users, interview_ids, rng).items():
+        await run(db)  # Warm the cache
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await run(db)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        results[name] = {
+            'p50': statistics.median(timings),
+            'p95': timings[int(len(timings) * 0.95) - 1],
+            'plan': await plan_stage(db, name, users, interview_ids)
+        }
+    return results
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--interviews', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+    client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
+    db_name = f"index_benchmark_{uuid.uuid4().hex[:8]}"
+    db = client[db_name]
+    rng = random.Random(42)
+
+    try:
+        print(f"📦 Seeding {args.interviews} interviews / {args.users} users into {db_name}...")
+        started = time.perf_counter()
+        users, interview_ids = await seed(db, args.interviews, args.users, rng)
+        print(f"   done in {time.perf_counter() - started:.1f}s")
+
+        print("⏱️  Without indexes...")
+        before = await measure(db, users, interview_ids, args.repeat, rng)
+
+        started = time.perf_counter()
+        report = await DBIndexes.ensure(db)
+        print(f"🔧 Built {len(report.get('created', []))} indexes in {time.perf_counter() - started:.1f}s")
+
+        print("⏱️  With indexes...")
+        after = await measure(db, users, interview_ids, args.repeat, rng)
+
+        print(f"\n{'query':<36}{'before p50 / p95 ms, plan':<27}{'after p50 / p95 ms, plan':<25}{'speedup':>8}")
+        for name in before:
+            b, a = before[name], after[name]
+            print(f"{name:<36}{b['p50']:>9.2f} /{b['p95']:>7.2f} {b['plan']:<8}"
+                  f"{a['p50']:>7.2f} /{a['p95']:>7.2f} {a['plan']:<8}{b['p50'] / max(a['p50'], 1e-6):>8.0f}x")
+    finally:
+        await client.drop_database(db_name)
+        client.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
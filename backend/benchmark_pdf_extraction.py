@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark PDF text extraction engines on a generated resume corpus
+
+Each engine runs in its own fresh process so peak RSS is not polluted by the
+others. Reports documents/s, pages/s, characters extracted and peak RSS.
+
+Usage:
+    python benchmark_pdf_extraction.py [--docs 40] [--rounds 3] [--max-chars 10000]
+"""
+
+import argparse
+import multiprocessing
+import random
+import sys
+import time
+
+from pdf_extraction import ENGINES, extract_text
+
+SKILLS = ['Python', 'React', 'Node.js', 'Docker', 'Kubernetes', 'AWS', 'PostgreSQL',
+          'MongoDB', 'TypeScript', 'FastAPI', 'Redis', 'GraphQL', 'Terraform', 'Go']
+VERBS = ['Built', 'Designed', 'Led', 'Migrated', 'Optimized', 'Shipped', 'Automated']
+
+
+def _escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(pages, two_column=False) -> bytes:
+    """Minimal PDF with a Helvetica text layer (one list of lines per page)"""
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    }
+    kids = []
+    for index, lines in enumerate(pages):
+        page_id, content_id = 4 + 2 * index, 5 + 2 * index
+        kids.append(f"{page_id} 0 R")
+        if two_column:
+            half = (len(lines) + 1) // 2
+            columns = [(50, lines[:half]), (320, lines[half:])]
+        else:
+            columns = [(72, lines)]
+        stream = ""
+        for x, column in columns:
+            stream += f"BT /F1 10 Tf {x} 760 Td 13 TL " + " ".join(f"({_escape(l)}) '" for l in column) + " ET\n"
+        data = stream.encode('latin-1')
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode()
+        objects[content_id] = b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += b"%d 0 obj\n" % obj_id + objects[obj_id] + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for obj_id in sorted(objects):
+        out += b"%010d 00000 n \n" % offsets[obj_id]
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def make_resume(rng: random.Random, page_count: int, two_column: bool) -> bytes:
+    pages = []
+    for page in range(page_count):
+        lines = [f"Candidate {rng.randint(1000, 9999)} - Page {page + 1}", "Experience"]
+        for _ in range(48):
+            skills = ", ".join(rng.sample(SKILLS, 3))
+            lines.append(f"{rng.choice(VERBS)} services with {skills} for {rng.randint(2, 90)}k users")
+        pages.append(lines)
+    return make_pdf(pages, two_column=two_column)
+
+
+def build_corpus(doc_count: int, seed: int = 42):
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(doc_count):
+        page_count = rng.choice([1, 1, 2, 2, 3, 5, 10])
+        corpus.append((make_resume(rng, page_count, two_column=i % 4 == 3), page_count))
+    return corpus
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _run_engine(engine_name, corpus, rounds, max_chars, results):
+    if engine_name == 'auto':
+        extract = lambda content: extract_text(content, max_chars)
+    else:
+        engine = ENGINES[engine_name]
+        extract = lambda content: engine(content, max_chars)
+
+    extract(corpus[0][0])  # Warm up imports
+    chars = errors = 0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for content, _ in corpus:
+            try:
+                chars += len(extract(content))
+            except Exception:
+                errors += 1
+    elapsed = time.perf_counter() - started
+    results[engine_name] = {'elapsed': elapsed, 'chars': chars, 'errors': errors, 'peak_rss_mb': _peak_rss_mb()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, default=40, help='Number of generated resumes')
+    parser.add_argument('--rounds', type=int, default=3, help='Passes over the corpus per engine')
+    parser.add_argument('--max-chars', type=int, default=10000, help='Early-termination threshold')
+    parser.add_argument('--engines', default=','.join(list(ENGINES) + ['auto']))
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.docs)
+    total_pages = sum(pages for _, pages in corpus) * args.rounds
+    total_docs = len(corpus) * args.rounds
+    print(f"📄 Corpus: {len(corpus)} PDFs, {sum(p for _, p in corpus)} pages, "
+          f"{sum(len(c) for c, _ in corpus) / 1024:.0f} KB (x{args.rounds} rounds, max_chars={args.max_chars})")
+
+    context = multiprocessing.get_context('spawn')
+    manager = context.Manager()
+    results = manager.dict()
+    for engine_name in [e.strip() for e in args.engines.split(',') if e.strip()]:
+        process = context.Process(target=_run_engine, args=(engine_name, corpus, args.rounds, args.max_chars, results))
+        process.start()
+        process.join()
+
+    print(f"\n{'engine':<12}{'docs/s':>10}{'pages/s':>10}{'chars/doc':>11}{'errors':>8}{'peak RSS':>12}")
+    for engine_name, result in results.items():
+        rss = f"{result['peak_rss_mb']:.0f} MB" if result['peak_rss_mb'] is not None else 'n/a'
+        print(f"{engine_name:<12}{total_docs / result['elapsed']:>10.1f}{total_pages / result['elapsed']:>10.1f}"
+              f"{result['chars'] / total_docs:>11.0f}{result['errors']:>8}{rss:>12}")
+    print("\n'auto' is the production pipeline (fast path + layout fallback + early termination)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Benchmark AssemblyAI transcript waits: fixed 1 s polling vs adaptive polling vs webhook
+
+Starts a local stand-in for AssemblyAI's /v2 API (its own process) that
+"processes" each upload for --overhead-ms plus --turnaround seconds per
+second of audio, counts status polls, and - when the request carries a
+webhook_url - calls it back on completion with the auth header it was given.
+
+The webhook lands on the real /api/interview/speech-to-text/assemblyai-webhook
+route (server.api_router served by uvicorn in this process), so both paths
+of EnhancedSpeechToText._transcribe_assemblyai are exercised end to end:
+
+- fixed 1 s (old): sleep(1), GET status, up to 60 times
+- adaptive (new): first check near the learned expected finish, then backed-off polls
+- webhook (new): wait for the callback, slow safety-net polls only
+
+Usage:
+    JWT_SECRET=bench python benchmark_stt_assemblyai.py [--answers 24] [--concurrency 4]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import socket
+import statistics
+import sys
+import time
+import uuid
+
+AUDIO_KBPS = 128
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def serve(port: int, overhead: float, turnaround: float, polls, late):
+    # Runs in its own process so the stand-in doesn't compete with the client for the event loop
+    from aiohttp import web, ClientSession
+
+    uploads, transcripts = {}, {}
+
+    async def upload(request: web.Request) -> web.Response:
+        upload_id = uuid.uuid4().hex
+        uploads[upload_id] = len(await request.read())
+        return web.json_response({'upload_url': f'stand-in://{upload_id}'})
+
+    async def submit(request: web.Request) -> web.Response:
+        body = await request.json()
+        duration = uploads.pop(body['audio_url'].split('//')[1]) * 8 / (AUDIO_KBPS * 1000)
+        transcript_id = uuid.uuid4().hex
+        ready = overhead + duration * turnaround * random.uniform(0.8, 1.2)
+        transcripts[transcript_id] = {'ready_at': time.monotonic() + ready, 'duration': duration}
+        if body.get('webhook_url'):
+            asyncio.get_running_loop().create_task(callback(transcript_id, ready, body))
+        return web.json_response({'id': transcript_id, 'status': 'queued'})
+
+    async def callback(transcript_id: str, ready: float, body: dict):
+        await asyncio.sleep(ready)
+        headers = {}
+        if body.get('webhook_auth_header_name'):
+            headers[body['webhook_auth_header_name']] = body['webhook_auth_header_value']
+        async with ClientSession() as session:
+            async with session.post(body['webhook_url'], headers=headers,
+                                    json={'transcript_id': transcript_id, 'status': 'completed'}) as response:
+                await response.read()
+
+    async def status(request: web.Request) -> web.Response:
+        polls.value += 1
+        transcript = transcripts[request.match_info['transcript_id']]
+        now = time.monotonic()
+        if now < transcript['ready_at']:
+            return web.json_response({'status': 'processing'})
+        if not transcript.get('seen'):
+            # How long a finished transcript sat there before the client asked for it
+            transcript['seen'] = True
+            late.append(now - transcript['ready_at'])
+        return web.json_response({
+            'status': 'completed', 'text': 'I led the migration to a microservice architecture',
+            'confidence': 0.95, 'words': [], 'audio_duration': round(transcript['duration'], 2)
+        })
+
+    app = web.Application(client_max_size=0)
+    app.router.add_post('/v2/upload', upload)
+    app.router.add_post('/v2/transcript', submit)
+    app.router.add_get('/v2/transcript/{transcript_id}', status)
+    web.run_app(app, host='127.0.0.1', port=port, print=None)
+
+
+async def wait_ready(port: int):
+    for _ in range(100):
+        try:
+            _, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+    raise RuntimeError(f"nothing listening on port {port}")
+
+
+async def run(name: str, transcribe, clips, concurrency: int, polls, late):
+    latencies, failed = [], 0
+    polls.value = 0
+    del late[:]
+    # Batches, like answers arriving over an interview, so adaptive polling can learn
+    for start in range(0, len(clips), concurrency):
+        async def one(clip):
+            started = time.perf_counter()
+            result = await transcribe(clip)
+            latencies.append((time.perf_counter() - started) * 1000)
+            return result.get('success', False)
+
+        results = await asyncio.gather(*(one(c) for c in clips[start:start + concurrency]))
+        failed += sum(1 for ok in results if not ok)
+    latencies.sort()
+    print(f"{name:<18}{statistics.median(latencies):>10.0f}{latencies[int(len(latencies) * 0.95) - 1]:>10.0f}"
+          f"{statistics.mean(late) * 1000:>10.0f}{polls.value / len(clips):>12.1f}{failed:>8}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--answers', type=int, default=24)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--min-seconds', type=float, default=10, help='Shortest answer')
+    parser.add_argument('--max-seconds', type=float, default=60, help='Longest answer')
+    parser.add_argument('--overhead-ms', type=float, default=400, help='Stand-in queueing time per transcript')
+    parser.add_argument('--turnaround', type=float, default=0.2, help='Stand-in processing seconds per audio second')
+    args = parser.parse_args()
+
+    provider_port, api_port = free_port(), free_port()
+    manager = multiprocessing.Manager()
+    polls, late = multiprocessing.Value('i', 0), manager.list()
+    provider = multiprocessing.Process(
+        target=serve, args=(provider_port, args.overhead_ms / 1000, args.turnaround, polls, late), daemon=True
+    )
+    provider.start()
+
+    os.environ.setdefault('JWT_SECRET', 'benchmark')
+    os.environ['ASSEMBLYAI_API_KEY'] = 'benchmark'
+    os.environ['ASSEMBLYAI_BASE_URL'] = f'http://127.0.0.1:{provider_port}'
+    os.environ['ASSEMBLYAI_WEBHOOK_SECRET'] = 'benchmark-secret'
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import uvicorn
+    from fastapi import FastAPI
+    import server
+    import speech_services
+    from speech_services import EnhancedSpeechToText, AssemblyAITranscripts, SpeechSessions
+
+    # Just the API routes - no MongoDB startup hook
+    app = FastAPI()
+    app.include_router(server.api_router)
+    api = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=api_port, log_level='warning'))
+    serving = asyncio.create_task(api.serve())
+    await wait_ready(provider_port)
+    await wait_ready(api_port)
+    webhook_url = f'http://127.0.0.1:{api_port}/api/interview/speech-to-text/assemblyai-webhook'
+
+    session = SpeechSessions.get('assemblyai')
+    headers = {'authorization': 'benchmark'}
+    base = speech_services.ASSEMBLYAI_BASE_URL
+
+    async def fixed_polling(clip):
+        # What _transcribe_assemblyai used to do
+        async with session.post(f'{base}/v2/upload', headers=headers, data=clip) as response:
+            audio_url = (await response.json())['upload_url']
+        async with session.post(f'{base}/v2/transcript', headers=headers, json={'audio_url': audio_url}) as response:
+            transcript_id = (await response.json())['id']
+        for _ in range(60):
+            await asyncio.sleep(1)
+            async with session.get(f'{base}/v2/transcript/{transcript_id}', headers=headers) as response:
+                status = await response.json()
+            if status['status'] == 'completed':
+                return {'success': True}
+        return {'success': False}
+
+    async def adaptive(clip):
+        speech_services.ASSEMBLYAI_WEBHOOK_URL = None
+        return await EnhancedSpeechToText._transcribe_assemblyai(clip)
+
+    async def webhook(clip):
+        speech_services.ASSEMBLYAI_WEBHOOK_URL = webhook_url
+        return await EnhancedSpeechToText._transcribe_assemblyai(clip)
+
+    random.seed(7)
+    clips = [os.urandom(int(random.uniform(args.min_seconds, args.max_seconds) * AUDIO_KBPS * 1000 / 8))
+             for _ in range(args.answers)]
+
+    print(f"🎙️  {args.answers} answers of {args.min_seconds:.0f}-{args.max_seconds:.0f} s, concurrency {args.concurrency}; "
+          f"stand-in turnaround {args.overhead_ms:.0f} ms + {args.turnaround} s per audio second")
+    print(f"\n{'strategy':<18}{'p50 ms':>10}{'p95 ms':>10}{'late ms':>10}{'polls/each':>12}{'failed':>8}")
+    try:
+        await run('fixed 1 s (old)', fixed_polling, clips, args.concurrency, polls, late)
+        await run('adaptive (new)', adaptive, clips, args.concurrency, polls, late)
+        await run('webhook (new)', webhook, clips, args.concurrency, polls, late)
+        metrics = AssemblyAITranscripts.get_metrics()
+        print(f"\nlearned turnaround ratio {metrics['turnaroundRatio']}, "
+              f"{metrics['webhooksMatched']}/{metrics['webhooksReceived']} webhooks matched a waiting request")
+    finally:
+        await SpeechSessions.close()
+        api.should_exit = True
+        await serving
+        provider.terminate()
+    print("\n'late ms' is how long a finished transcript waited before the client fetched it")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Benchmark speech-to-text latency: new session per call vs pooled SpeechSessions
+
+Starts a local HTTPS stand-in for Deepgram's /v1/listen (self-signed cert,
+generated with the openssl CLI) behind a proxy that delays every packet by
+half the --rtt-ms, so connection setup costs round trips like it does
+against the real API. Then transcribes the same clip repeatedly:
+
+- per-call session (old): a new aiohttp.ClientSession for every request,
+  paying DNS + TCP + TLS each time
+- pooled (new): EnhancedSpeechToText._transcribe_deepgram on the shared,
+  keep-alive SpeechSessions connection pool
+
+Usage:
+    python benchmark_stt_sessions.py [--calls 50] [--concurrency 4] [--rtt-ms 40]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import ssl
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+CERT_DIR = tempfile.mkdtemp(prefix='stt_bench_')
+CERT_FILE = os.path.join(CERT_DIR, 'cert.pem')
+KEY_FILE = os.path.join(CERT_DIR, 'key.pem')
+
+
+def make_cert():
+    subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+         '-keyout', KEY_FILE, '-out', CERT_FILE, '-subj', '/CN=localhost',
+         '-addext', 'subjectAltName=DNS:localhost,IP:127.0.0.1'],
+        check=True, capture_output=True
+    )
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+async def delayed_pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, delay: float):
+    """Forward bytes one way, each chunk delivered `delay` seconds after it arrived"""
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump():
+        while True:
+            data = await reader.read(65536)
+            await queue.put((time.monotonic() + delay, data))
+            if not data:
+                return
+
+    pumping = asyncio.create_task(pump())
+    try:
+        while True:
+            due, data = await queue.get()
+            await asyncio.sleep(max(0.0, due - time.monotonic()))
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        pumping.cancel()
+        writer.close()
+
+
+def serve(app_port: int, proxy_port: int, rtt: float):
+    # Runs in its own process so the stand-in doesn't compete with the client for the event loop
+    from aiohttp import web
+
+    async def listen(request: web.Request) -> web.Response:
+        await request.read()
+        return web.json_response({'results': {'channels': [{'alternatives': [
+            {'transcript': 'I led the migration to a microservice architecture', 'confidence': 0.97, 'words': []}
+        ]}]}})
+
+    async def proxy(client_reader, client_writer):
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection('127.0.0.1', app_port)
+        except OSError:
+            client_writer.close()
+            return
+        await asyncio.gather(
+            delayed_pipe(client_reader, upstream_writer, rtt / 2),
+            delayed_pipe(upstream_reader, client_writer, rtt / 2)
+        )
+
+    async def main():
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(CERT_FILE, KEY_FILE)
+        app = web.Application(client_max_size=0)
+        app.router.add_post('/v1/listen', listen)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, '127.0.0.1', app_port, ssl_context=context).start()
+        server = await asyncio.start_server(proxy, '127.0.0.1', proxy_port)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+
+async def wait_ready(port: int):
+    for _ in range(100):
+        try:
+            _, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+    raise RuntimeError("stand-in provider did not start")
+
+
+async def burst(transcribe, calls: int, concurrency: int):
+    slots = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with slots:
+            started = time.perf_counter()
+            result = await transcribe()
+            latencies.append((time.perf_counter() - started) * 1000)
+            return result.get('success', False)
+
+    results = await asyncio.gather(*(one() for _ in range(calls)))
+    latencies.sort()
+    return latencies, sum(1 for ok in results if not ok)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--rtt-ms', type=float, default=40, help='Simulated network round-trip time')
+    parser.add_argument('--clip-kb', type=int, default=200, help='Size of the audio clip')
+    args = parser.parse_args()
+
+    make_cert()
+    app_port, proxy_port = free_port(), free_port()
+    server = multiprocessing.Process(target=serve, args=(app_port, proxy_port, args.rtt_ms / 1000), daemon=True)
+    server.start()
+    await wait_ready(proxy_port)
+
+    # Point the provider at the stand-in and trust its certificate, before importing
+    os.environ['SSL_CERT_FILE'] = CERT_FILE
+    os.environ['DEEPGRAM_API_KEY'] = 'benchmark'
+    os.environ['DEEPGRAM_BASE_URL'] = f"https://localhost:{proxy_port}"
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import aiohttp
+    import speech_services
+    from speech_services import EnhancedSpeechToText, SpeechSessions
+
+    clip = os.urandom(args.clip_kb * 1024)
+    url = f"{speech_services.DEEPGRAM_BASE_URL}/v1/listen?model=nova-2&punctuate=true&smart_format=true&language=en"
+
+    async def per_call_session():
+        # What _transcribe_deepgram used to do
+        async with aiohttp.ClientSession() as session:
+            async with session.post(url, headers={'Authorization': 'Token benchmark', 'Content-Type': 'audio/webm'}, data=clip) as response:
+                await response.json()
+                return {'success': response.status == 200}
+
+    async def pooled():
+        return await EnhancedSpeechToText._transcribe_deepgram(clip)
+
+    print(f"🎙️  {args.calls} transcriptions of a {args.clip_kb} KB clip, concurrency {args.concurrency}, "
+          f"simulated RTT {args.rtt_ms:.0f} ms (HTTPS stand-in on localhost)")
+    print(f"\n{'strategy':<24}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}{'failed':>8}")
+    try:
+        for name, transcribe in (('per-call session (old)', per_call_session), ('pooled (new)', pooled)):
+            latencies, failed = await burst(transcribe, args.calls, args.concurrency)
+            print(f"{name:<24}{statistics.median(latencies):>10.1f}{latencies[int(len(latencies) * 0.95) - 1]:>10.1f}"
+                  f"{statistics.mean(latencies):>10.1f}{failed:>8}")
+        connections = SpeechSessions.get_metrics().get('deepgram', {})
+        print(f"\npooled: {connections.get('connectionsCreated', 0)} connections opened, "
+              f"{connections.get('connectionsReused', 0)} reused")
+    finally:
+        await SpeechSessions.close()
+        server.terminate()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark peak memory of forwarding speech-to-text uploads
+
+Simulates N concurrent answer uploads (spooled like Starlette's UploadFile:
+in memory up to 1 MB, then on disk) being forwarded to a local stand-in
+provider (its own process), and reports the forwarding side's Python heap
+peak (tracemalloc) per strategy:
+
+- read + temp file (old): await audio.read(), write a NamedTemporaryFile,
+  reopen it and send
+- spool (new): speech_services._body streams the spooled file in chunks
+
+Usage:
+    python benchmark_stt_upload.py [--uploads 16] [--size-mb 4]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from aiohttp import web, ClientSession
+
+# Imported before anything is measured (it pulls in the LLM SDKs)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from speech_services import _body
+
+SPOOL_MAX_SIZE = 1024 * 1024  # Starlette's UploadFile spool threshold
+
+
+async def stand_in_provider(request: web.Request) -> web.Response:
+    received = 0
+    async for chunk in request.content.iter_chunked(64 * 1024):
+        received += len(chunk)
+    return web.json_response({'received': received})
+
+
+def serve(port: int):
+    # Separate process so its buffers don't count toward the measured peak
+    app = web.Application(client_max_size=0)
+    app.router.add_post('/v1/listen', stand_in_provider)
+    web.run_app(app, host='127.0.0.1', port=port, print=None)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+async def wait_ready(port: int):
+    for _ in range(100):
+        try:
+            _, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+    raise RuntimeError("stand-in provider did not start")
+
+
+def spooled_upload(payload: bytes):
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    spool.write(payload)
+    spool.seek(0)
+    return spool
+
+
+async def forward_old(session: ClientSession, url: str, upload) -> int:
+    audio_content = upload.read()
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.webm') as temp_file:
+        temp_file.write(audio_content)
+        temp_path = temp_file.name
+    try:
+        with open(temp_path, 'rb') as audio_file:
+            async with session.post(url, data=audio_file.read()) as response:
+                return (await response.json())['received']
+    finally:
+        os.unlink(temp_path)
+
+
+async def forward_spool(session: ClientSession, url: str, upload) -> int:
+    async with session.post(url, data=_body(upload)) as response:
+        return (await response.json())['received']
+
+
+async def run(name: str, forward, url: str, uploads: int, size: int):
+    payloads = [os.urandom(size) for _ in range(uploads)]
+    files = [spooled_upload(p) for p in payloads]
+    del payloads
+
+    async with ClientSession() as session:
+        tracemalloc.start()
+        started = time.perf_counter()
+        received = await asyncio.gather(*(forward(session, url, f) for f in files))
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    for f in files:
+        f.close()
+    ok = all(r == size for r in received)
+    print(f"{name:<24}{peak / 1e6:>12.1f}{peak / uploads / 1e6:>14.2f}{elapsed * 1000:>10.0f}{'ok' if ok else 'MISMATCH':>8}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--uploads', type=int, default=16, help='Concurrent uploads')
+    parser.add_argument('--size-mb', type=float, default=4, help='Size of each recording')
+    args = parser.parse_args()
+
+    port = free_port()
+    server = multiprocessing.Process(target=serve, args=(port,), daemon=True)
+    server.start()
+    await wait_ready(port)
+    url = f"http://127.0.0.1:{port}/v1/listen"
+
+    size = int(args.size_mb * 1024 * 1024)
+    print(f"🎙️  {args.uploads} concurrent uploads of {args.size_mb} MB to a local stand-in provider")
+    print(f"\n{'strategy':<24}{'peak MB':>12}{'per upload MB':>14}{'ms':>10}{'':>8}")
+    try:
+        await run('read + temp file (old)', forward_old, url, args.uploads, size)
+        await run('spool (new)', forward_spool, url, args.uploads, size)
+    finally:
+        server.terminate()
+    print("\n'peak MB' is the Python heap high-water mark while all uploads are in flight;")
+    print("'ms' includes tracemalloc overhead, which penalizes many small chunks")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
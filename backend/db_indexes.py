@@ -0,0 +1,155 @@
+"""
+MongoDB Index Bootstrap
+Declares the indexes the API's hot queries rely on and creates them on
+startup (idempotent - existing indexes are left alone). The declared set is
+versioned: bump INDEX_VERSION when editing INDEXES. The applied version is
+recorded in schema_meta, and a worker running an older version leaves the
+indexes alone during a rolling upgrade.
+
+Startup also reports declared indexes that are missing (e.g. a unique index
+that could not be built because of duplicate data) and undeclared indexes
+that $indexStats shows are never used.
+"""
+
+import os
+from datetime import datetime
+from typing import Any, Dict, List
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+DB_INDEX_BOOTSTRAP = os.environ.get('DB_INDEX_BOOTSTRAP', 'true').lower() == 'true'
+
+INDEX_VERSION = 2
+
+# collection -> indexes; names are fixed so reconciliation can match them
+INDEXES: Dict[str, List[IndexModel]] = {
+    'users': [
+        # Login, signup, Google OAuth and password reset all look users up by email
+        IndexModel([('email', ASCENDING)], name='email_unique', unique=True),
+    ],
+    'interviews': [
+        # get/submit/next-question; demo and legacy documents may lack the field
+        IndexModel(
+            [('interviewId', ASCENDING)], name='interviewId_unique', unique=True,
+            partialFilterExpression={'interviewId': {'$type': 'string'}}
+        ),
+        # Performance stats and per-user listings: {createdBy, status} sorted by completion
+        IndexModel(
+            [('createdBy', ASCENDING), ('status', ASCENDING), ('completedAt', ASCENDING)],
+            name='createdBy_status_completedAt'
+        ),
+        # GET /api/interviews keyset pagination: newest first, _id breaks ties
+        IndexModel(
+            [('createdBy', ASCENDING), ('createdAt', DESCENDING), ('_id', DESCENDING)],
+            name='createdBy_createdAt_id'
+        ),
+    ],
+    'campaigns': [
+        IndexModel([('recruiterId', ASCENDING)], name='recruiterId'),
+    ],
+}
+
+META_COLLECTION = 'schema_meta'
+
+
+def _present(model: IndexModel, existing: Dict[str, Any]) -> bool:
+    """Declared index exists, by name or as the same keys under another name"""
+    if model.document['name'] in existing:
+        return True
+    keys = list(model.document['key'].items())
+    unique = model.document.get('unique', False)
+    return any(
+        list(info.get('key', [])) == keys and info.get('unique', False) == unique
+        for info in existing.values()
+    )
+
+
+class DBIndexes:
+    """Creates declared indexes and keeps a report of what is missing or unused"""
+
+    _report: Dict[str, Any] = {'version': INDEX_VERSION, 'applied': False}
+
+    @staticmethod
+    async def ensure(db) -> Dict[str, Any]:
+        """Create missing declared indexes (idempotent) and refresh the report"""
+        if not DB_INDEX_BOOTSTRAP or db is None:
+            return DBIndexes._report
+
+        meta = await db[META_COLLECTION].find_one({'_id': 'indexes'})
+        stored_version = (meta or {}).get('version', 0)
+        if stored_version > INDEX_VERSION:
+            # A newer deployment owns the schema; don't fight it during a rolling upgrade
+            print(f"⚠️ Index version {stored_version} in database is newer than {INDEX_VERSION} - skipping bootstrap")
+            DBIndexes._report = await DBIndexes.inspect(db)
+            return DBIndexes._report
+
+        created, failed = [], {}
+        for collection_name, models in INDEXES.items():
+            collection = db[collection_name]
+            existing = await collection.index_information()
+            for model in models:
+                name = model.document['name']
+                if _present(model, existing):
+                    continue
+                try:
+                    await collection.create_indexes([model])
+                    created.append(f"{collection_name}.{name}")
+                except OperationFailure as e:
+                    # e.g. duplicate keys (code 11000) block a unique index
+                    failed[f"{collection_name}.{name}"] = e.details.get('errmsg', str(e)) if e.details else str(e)
+
+        if not failed and stored_version != INDEX_VERSION:
+            await db[META_COLLECTION].update_one(
+                {'_id': 'indexes'},
+                {'$set': {'version': INDEX_VERSION, 'appliedAt': datetime.utcnow()}},
+                upsert=True
+            )
+
+        if created:
+            print(f"✅ Created indexes: {', '.join(created)}")
+        for name, error in failed.items():
+            print(f"⚠️ Could not create index {name}: {error}")
+
+        report = await DBIndexes.inspect(db)
+        report['created'] = created
+        report['failed'] = failed
+        DBIndexes._report = report
+        if report['missing']:
+            print(f"⚠️ Missing indexes: {', '.join(report['missing'])}")
+        if report['unused']:
+            print(f"💡 Unused indexes (no accesses since server start): {', '.join(report['unused'])}")
+        return report
+
+    @staticmethod
+    async def inspect(db) -> Dict[str, Any]:
+        """Declared indexes that don't exist and undeclared ones nobody uses"""
+        missing, unused = [], []
+        for collection_name, models in INDEXES.items():
+            collection = db[collection_name]
+            existing = await collection.index_information()
+            declared = {model.document['name'] for model in models}
+            missing += [f"{collection_name}.{model.document['name']}" for model in models if not _present(model, existing)]
+
+            try:
+                stats = await collection.aggregate([{'$indexStats': {}}]).to_list(None)
+            except OperationFailure:
+                continue  # $indexStats needs clusterMonitor on some hosted tiers
+            for stat in stats:
+                name = stat.get('name')
+                if name == '_id_' or name in declared:
+                    continue
+                if not stat.get('accesses', {}).get('ops', 0):
+                    unused.append(f"{collection_name}.{name}")
+
+        return {
+            'version': INDEX_VERSION,
+            'applied': not missing,
+            'missing': missing,
+            'unused': unused,
+            'checkedAt': datetime.utcnow().isoformat()
+        }
+
+    @staticmethod
+    def get_report() -> Dict[str, Any]:
+        return dict(DBIndexes._report)
@@ -0,0 +1,314 @@
+"""
+Interview Session Store
+Server-side state for live interviews, keyed by interviewId.
+
+The conversation, resume data and candidate info are kept between turns, so
+clients can send only the new answer (plus the turn number they last saw)
+instead of the whole conversation on every request. Planning counters live
+in the session's ConversationState, so a turn costs the same at question 20
+as at question 2.
+
+Sessions are per worker process. A client that lands on a worker without its
+session (restart, another worker, expiry) gets a 409 and resends full state,
+which rebuilds the session.
+
+Each turn's new entries are also appended to the interview document with
+$push, guarded by a turn sequence number (optimistic concurrency), so the
+transcript survives a crash and submit no longer has to upload it.
+"""
+
+import os
+import time
+from datetime import datetime
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from ai_services import AIInterviewer, ConversationState
+
+INTERVIEW_SESSION_TTL = int(os.environ.get('INTERVIEW_SESSION_TTL', '7200'))  # Seconds since last turn
+INTERVIEW_SESSION_MAX = int(os.environ.get('INTERVIEW_SESSION_MAX', '5000'))  # Sessions kept per worker
+INTERVIEW_PERSIST_TURNS = os.environ.get('INTERVIEW_PERSIST_TURNS', 'true').lower() == 'true'
+
+
+class SessionOutOfSync(Exception):
+    """Raised when a delta turn has no matching session - the client must resend full state"""
+
+
+class InterviewSession:
+    """Conversation and context for one live interview"""
+
+    def __init__(
+        self,
+        interview_id: Optional[str],
+        resume_data: Dict[str, Any],
+        candidate_info: Dict[str, Any],
+        conversation_history: List[Dict[str, Any]] = None
+    ):
+        self.interview_id = interview_id
+        self.resume_data = resume_data
+        self.candidate_info = candidate_info
+        self.state = ConversationState(conversation_history)
+        self.section = None  # Section of the last question asked
+        for entry in reversed(self.state.history):
+            if entry.get('type') == 'question':
+                self.section = entry.get('section')
+                break
+        self.updated_at = time.monotonic()
+        # Transcript already in Mongo: questions (turnSeq) and history entries.
+        # None until known - a rebuilt session looks it up on its first write.
+        self.persisted_turn: Optional[int] = None
+        self.persisted_len = 0
+        self.restarted = False  # Started from question one: replaces any stored transcript
+
+    @property
+    def turn(self) -> int:
+        """Number of questions asked so far"""
+        return self.state.question_count
+
+
+class InterviewSessionStore:
+    """Per-worker LRU of InterviewSession with idle expiry"""
+
+    _sessions: 'OrderedDict[str, InterviewSession]' = OrderedDict()
+
+    _metrics = {
+        'deltaTurns': 0,     # Turns that sent only the new answer
+        'fullTurns': 0,      # Turns that sent the whole conversation
+        'resumed': 0,        # Full turns that matched the stored session
+        'rebuilt': 0,        # Full turns that replaced a missing/diverged session
+        'outOfSync': 0,      # Delta turns rejected with 409
+        'evicted': 0
+    }
+
+    @staticmethod
+    def get(interview_id: Optional[str]) -> Optional[InterviewSession]:
+        if not interview_id:
+            return None
+        sessions = InterviewSessionStore._sessions
+        session = sessions.get(interview_id)
+        if session is None:
+            return None
+        if time.monotonic() - session.updated_at > INTERVIEW_SESSION_TTL:
+            del sessions[interview_id]
+            InterviewSessionStore._metrics['evicted'] += 1
+            return None
+        sessions.move_to_end(interview_id)
+        return session
+
+    @staticmethod
+    def _store(session: InterviewSession) -> InterviewSession:
+        if not session.interview_id:
+            return session  # Anonymous turns are not kept
+        sessions = InterviewSessionStore._sessions
+        sessions[session.interview_id] = session
+        sessions.move_to_end(session.interview_id)
+        while len(sessions) > INTERVIEW_SESSION_MAX:
+            sessions.popitem(last=False)
+            InterviewSessionStore._metrics['evicted'] += 1
+        return session
+
+    @staticmethod
+    def begin_turn(
+        interview_id: Optional[str],
+        previous_answer: str,
+        conversation_history: Optional[List[Dict[str, Any]]],
+        resume_data: Optional[Dict[str, Any]],
+        candidate_info: Optional[Dict[str, Any]],
+        turn: Optional[int] = None
+    ) -> InterviewSession:
+        """
+        Bring the session up to date with this request's answer
+
+        - Delta turn (no conversationHistory, and an answer or a non-zero
+          `turn`): the answer - empty for a skipped question - is appended to
+          the stored session; `turn`, when sent, must match it
+        - Full turn: the stored session is reused when the client history is
+          the session plus this answer (keeps question metadata), otherwise it
+          is rebuilt from the client history
+        - First turn (no history, no answer, `turn` absent or 0): a fresh
+          session that replaces any stored transcript - never inferred for an
+          interview already under way, so a retried or malformed request
+          can't wipe its turns
+
+        Raises:
+            SessionOutOfSync: delta turn without a matching session
+        """
+        metrics = InterviewSessionStore._metrics
+        session = InterviewSessionStore.get(interview_id)
+        history = conversation_history or []
+
+        if not history and (previous_answer or turn):
+            metrics['deltaTurns'] += 1
+            if session is None or (turn is not None and turn != session.turn):
+                metrics['outOfSync'] += 1
+                raise SessionOutOfSync(
+                    f"No interview session at turn {turn} for {interview_id} - resend conversationHistory"
+                )
+            session.state.append({
+                'type': 'answer',
+                'text': previous_answer or '',
+                'section': session.section,
+                'questionNumber': session.turn
+            })
+        else:
+            metrics['fullTurns'] += 1
+            known = len(session.state.history) if session else -1
+            if session is not None and history and len(history) in (known, known + 1) \
+                    and ConversationState.of(history[:known]).question_count == session.turn:
+                metrics['resumed'] += 1
+                if len(history) == known + 1:
+                    session.state.append(history[-1])
+            else:
+                if session is not None or history:
+                    metrics['rebuilt'] += 1
+                session = InterviewSession(interview_id, resume_data or {}, candidate_info or {}, history)
+                if not history:
+                    session.persisted_turn = 0
+                    session.restarted = True
+
+        # Clients in delta mode may omit context; anything sent replaces what was stored
+        if resume_data:
+            session.resume_data = resume_data
+        if candidate_info:
+            session.candidate_info = candidate_info
+        session.updated_at = time.monotonic()
+        return InterviewSessionStore._store(session)
+
+    @staticmethod
+    def record_question(session: InterviewSession, result: Dict[str, Any]):
+        """Add the question just generated to the session"""
+        if result.get('isComplete') or not result.get('question'):
+            return
+        session.state.append(AIInterviewer.question_entry(result))
+        session.section = result.get('section')
+        session.updated_at = time.monotonic()
+
+    @staticmethod
+    def discard(interview_id: Optional[str]):
+        """Drop a finished interview's session"""
+        if interview_id:
+            InterviewSessionStore._sessions.pop(interview_id, None)
+
+    @staticmethod
+    def get_metrics() -> Dict[str, Any]:
+        metrics = dict(InterviewSessionStore._metrics)
+        metrics['active'] = len(InterviewSessionStore._sessions)
+        metrics['ttlSeconds'] = INTERVIEW_SESSION_TTL
+        return metrics
+
+
+class InterviewTranscript:
+    """Per-turn $push persistence of the conversation into the interviews collection"""
+
+    _collection = None
+
+    _metrics = {
+        'writes': 0,
+        'entries': 0,
+        'conflicts': 0,     # turnSeq did not match (concurrent writer or stale session)
+        'errors': 0
+    }
+
+    @staticmethod
+    def init(db):
+        if INTERVIEW_PERSIST_TURNS and db is not None:
+            InterviewTranscript._collection = db.interviews
+
+    @staticmethod
+    def _prefix_len(history: List[Dict[str, Any]], turn: int) -> int:
+        """History entries up to and including the turn-th question (what turnSeq == turn covers)"""
+        if turn <= 0:
+            return 0
+        questions = 0
+        for index, entry in enumerate(history):
+            if entry.get('type') == 'question':
+                questions += 1
+                if questions == turn:
+                    return index + 1
+        return len(history)
+
+    @staticmethod
+    async def _sync(session: InterviewSession) -> bool:
+        """Learn how much of a (re)built session's transcript is already stored"""
+        doc = await InterviewTranscript._collection.find_one(
+            {'interviewId': session.interview_id}, {'turnSeq': 1, 'status': 1}
+        )
+        if not doc or doc.get('status') == 'completed':
+            session.persisted_turn = -1  # Unknown or finished interview: nothing to write
+            return False
+        session.persisted_turn = min(doc.get('turnSeq', 0), session.turn)
+        session.persisted_len = InterviewTranscript._prefix_len(session.state.history, session.persisted_turn)
+        return True
+
+    @staticmethod
+    async def append_turn(session: InterviewSession) -> bool:
+        """
+        Append the session's unsaved entries to its interview document
+
+        The update only applies while the stored turnSeq equals the last turn
+        this session wrote, so a retried or concurrent request can neither
+        duplicate nor interleave entries. Failures are logged, never raised -
+        the interview carries on and the next turn retries the same entries.
+        """
+        collection = InterviewTranscript._collection
+        if collection is None or not session.interview_id:
+            return False
+        try:
+            if session.persisted_turn is None and not await InterviewTranscript._sync(session):
+                return False
+            if session.persisted_turn < 0:
+                return False
+
+            new_entries = session.state.history[session.persisted_len:]
+            if not new_entries:
+                return True
+
+            now = int(time.time() * 1000)
+            turn = session.persisted_turn
+            entries, answers = [], []
+            for entry in new_entries:
+                if entry.get('type') == 'question':
+                    turn += 1
+                entries.append({**entry, 'turn': turn, 'timestamp': entry.get('timestamp') or now})
+                if entry.get('type') == 'answer':
+                    answers.append(entry.get('text', ''))
+
+            expected = session.persisted_turn
+            query = {'interviewId': session.interview_id, 'status': {'$ne': 'completed'}}
+            if session.restarted:
+                # The interview was started over: the first write replaces the transcript
+                update = {'$set': {'conversation': entries, 'answers': answers,
+                                   'turnSeq': turn, 'updatedAt': datetime.utcnow()}}
+            else:
+                # Documents created before turnSeq existed have no field
+                query['turnSeq'] = {'$in': [expected, None]} if expected == 0 else expected
+                update = {
+                    '$push': {'conversation': {'$each': entries}},
+                    '$set': {'turnSeq': turn, 'updatedAt': datetime.utcnow()}
+                }
+                if answers:
+                    update['$push']['answers'] = {'$each': answers}
+            result = await collection.update_one(query, update)
+            if result.matched_count == 0:
+                InterviewTranscript._metrics['conflicts'] += 1
+                print(f"⚠️ Transcript turn {expected} for {session.interview_id} is stale - resyncing")
+                session.persisted_turn = None
+                session.restarted = False
+                return False
+
+            session.persisted_turn = turn
+            session.persisted_len += len(new_entries)
+            session.restarted = False
+            InterviewTranscript._metrics['writes'] += 1
+            InterviewTranscript._metrics['entries'] += len(entries)
+            return True
+        except Exception as e:
+            InterviewTranscript._metrics['errors'] += 1
+            print(f"⚠️ Transcript write failed for {session.interview_id}: {e}")
+            return False
+
+    @staticmethod
+    def get_metrics() -> Dict[str, Any]:
+        metrics = dict(InterviewTranscript._metrics)
+        metrics['enabled'] = InterviewTranscript._collection is not None
+        return metrics
@@ -0,0 +1,541 @@
+"""
+Async LLM Gateway
+Single entry point for every chat-completion call made by the backend.
+Supports: Gemini, Groq, OpenRouter (DeepSeek), A4F (DeepSeek) and Mistral
+
+All providers use async clients on pooled, persistent connections, so a slow
+provider never blocks the event loop for other interviews on the same worker.
+"""
+
+import os
+import json
+import time
+import asyncio
+import httpx
+from collections import deque
+import google.generativeai as genai
+from groq import AsyncGroq, DefaultAsyncHttpxClient
+from typing import AsyncIterator, Dict, List, Any, Union
+
+from provider_health import HealthTracker, CircuitOpenError
+
+# API Keys
+GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
+GROQ_API_KEY = os.environ.get('GROQ_API_KEY')
+OPENROUTER_API_KEY = os.environ.get('OPENROUTER_API_KEY')
+A4F_API_KEY = os.environ.get('A4F_API_KEY')
+MISTRAL_API_KEY = os.environ.get('MISTRAL_API_KEY')
+
+# Connection pool settings (shared by every HTTP-based provider)
+LLM_MAX_CONNECTIONS = int(os.environ.get('LLM_MAX_CONNECTIONS', '20'))
+LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', '16'))  # In-flight calls per provider
+LLM_TIMEOUT = float(os.environ.get('LLM_TIMEOUT', '30'))
+
+HTTP_LIMITS = httpx.Limits(
+    max_connections=LLM_MAX_CONNECTIONS,
+    max_keepalive_connections=LLM_MAX_CONNECTIONS,
+    keepalive_expiry=60.0
+)
+HTTP_TIMEOUT = httpx.Timeout(LLM_TIMEOUT, connect=5.0)
+
+# Hedging: the next provider starts once the running one exceeds its observed p95
+HEDGE_MIN_DELAY = float(os.environ.get('LLM_HEDGE_MIN_DELAY', '0.25'))
+HEDGE_MAX_DELAY = float(os.environ.get('LLM_HEDGE_MAX_DELAY', '4.0'))
+HEDGE_DEFAULT_DELAY = float(os.environ.get('LLM_HEDGE_DEFAULT_DELAY', '1.5'))  # Until enough samples exist
+HEDGE_MIN_SAMPLES = 10
+
+
+class LLMGatewayError(Exception):
+    """Raised when every provider in a model policy failed"""
+
+
+# Gemini (resume parsing and fast questions)
+gemini_model = None
+gemini_flash = None
+if GEMINI_API_KEY:
+    genai.configure(api_key=GEMINI_API_KEY)
+    gemini_model = genai.GenerativeModel('gemini-pro')
+    try:
+        gemini_flash = genai.GenerativeModel('gemini-2.0-flash-exp')
+        print("✅ Gemini 2.0 Flash initialized (FREE, 3x faster)")
+    except Exception:
+        gemini_flash = None
+        print("⚠️ Gemini 2.0 Flash not available, using gemini-pro")
+
+# Groq (questions, feedback, resume parsing) - async SDK on a pooled client
+groq_client = None
+if GROQ_API_KEY:
+    groq_client = AsyncGroq(
+        api_key=GROQ_API_KEY,
+        http_client=DefaultAsyncHttpxClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+    )
+    print("✅ Groq API initialized (FREE & UNLIMITED)")
+
+# Mistral AI (FREE tier)
+mistral_client = None
+if MISTRAL_API_KEY and MISTRAL_API_KEY != 'your_mistral_key_here':
+    mistral_client = httpx.AsyncClient(
+        base_url="https://api.mistral.ai/v1",
+        headers={
+            "Authorization": f"Bearer {MISTRAL_API_KEY}",
+            "Content-Type": "application/json"
+        },
+        limits=HTTP_LIMITS,
+        timeout=HTTP_TIMEOUT
+    )
+    print("✅ Mistral AI initialized (FREE tier)")
+
+# OpenRouter client for DeepSeek (Fallback)
+openrouter_client = None
+if OPENROUTER_API_KEY:
+    openrouter_client = httpx.AsyncClient(
+        base_url="https://openrouter.ai/api/v1",
+        headers={
+            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+            "HTTP-Referer": "http://localhost:3000",
+            "X-Title": "AI Interview System"
+        },
+        limits=HTTP_LIMITS,
+        timeout=HTTP_TIMEOUT
+    )
+    print("✅ OpenRouter API initialized")
+
+# A4F client for DeepSeek (answer analysis)
+a4f_client = None
+if A4F_API_KEY and A4F_API_KEY != 'your_a4f_api_key_here':
+    a4f_client = httpx.AsyncClient(
+        base_url="https://api.a4f.co/v1",
+        headers={
+            "Authorization": f"Bearer {A4F_API_KEY}",
+            "Content-Type": "application/json"
+        },
+        limits=HTTP_LIMITS,
+        timeout=HTTP_TIMEOUT
+    )
+    print("✅ A4F API initialized")
+
+
+# Model policies: ordered provider chains with per-provider generation settings.
+# The first step that returns a non-empty answer wins.
+MODEL_POLICIES: Dict[str, List[Dict[str, Any]]] = {
+    'question': [
+        {'provider': 'gemini_flash', 'temperature': 0.9, 'max_tokens': 120, 'top_p': 0.95},
+        {'provider': 'groq', 'model': 'llama-3.3-70b-versatile', 'temperature': 0.9, 'max_tokens': 120,
+         'top_p': 0.95, 'frequency_penalty': 0.8, 'presence_penalty': 0.6},
+        {'provider': 'openrouter', 'model': 'deepseek/deepseek-chat', 'temperature': 0.9, 'max_tokens': 120,
+         'top_p': 0.95, 'frequency_penalty': 0.7, 'presence_penalty': 0.5},
+    ],
+    'resume_groq': [
+        {'provider': 'groq', 'model': 'llama-3.3-70b-versatile', 'temperature': 0.1, 'max_tokens': 2500},
+    ],
+    'resume_gemini': [
+        {'provider': 'gemini'},
+    ],
+    'feedback': [
+        {'provider': 'groq', 'model': 'llama-3.3-70b-versatile', 'temperature': 0.3, 'max_tokens': 2000},
+    ],
+    'answer_analysis': [
+        {'provider': 'a4f', 'model': 'provider-1/deepseek-v3.1', 'temperature': 0.3, 'max_tokens': 1500},
+        {'provider': 'openrouter', 'model': 'deepseek/deepseek-chat', 'temperature': 0.3, 'max_tokens': 1500},
+        {'provider': 'groq', 'model': 'llama3-70b-8192', 'temperature': 0.3, 'max_tokens': 1500},
+    ],
+}
+
+# OpenAI-compatible HTTP providers
+_HTTP_CLIENTS = {
+    'openrouter': lambda: openrouter_client,
+    'a4f': lambda: a4f_client,
+    'mistral': lambda: mistral_client,
+}
+
+
+class ProviderStats:
+    """Rolling latency window and win/error counters for one provider"""
+
+    def __init__(self, window: int = 200):
+        self.calls = 0
+        self.errors = 0
+        self.wins = 0          # Hedged races won
+        self.hedged = 0        # Times launched as a hedge after a slow provider
+        self.cancelled = 0     # Lost races cancelled mid-flight
+        self.latencies = deque(maxlen=window)
+
+    def percentile(self, pct: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait on this provider before launching the next one"""
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        return min(HEDGE_MAX_DELAY, max(HEDGE_MIN_DELAY, self.percentile(95)))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'wins': self.wins,
+            'hedged': self.hedged,
+            'cancelled': self.cancelled,
+            'samples': len(self.latencies),
+            'p50Ms': round(self.percentile(50) * 1000, 1),
+            'p95Ms': round(self.percentile(95) * 1000, 1),
+            'hedgeDelayMs': round(self.hedge_delay() * 1000, 1)
+        }
+
+
+_stats: Dict[str, ProviderStats] = {}
+
+# Circuit breakers: unhealthy providers are demoted or skipped without a call
+health = HealthTracker('llm')
+
+
+def _provider_stats(provider: str) -> ProviderStats:
+    if provider not in _stats:
+        _stats[provider] = ProviderStats()
+    return _stats[provider]
+
+
+def get_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-provider latency and hedging counters (exposed at /api/llm/stats)"""
+    return {provider: stats.to_dict() for provider, stats in _stats.items()}
+
+
+def get_health() -> Dict[str, Dict[str, Any]]:
+    """Per-provider EWMA health and breaker state (exposed at /api/llm/stats)"""
+    return health.snapshot()
+
+
+# Bound in-flight calls per provider so a burst cannot exhaust the pool
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def _semaphore(provider: str) -> asyncio.Semaphore:
+    if provider not in _semaphores:
+        _semaphores[provider] = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return _semaphores[provider]
+
+
+def is_available(provider: str) -> bool:
+    """Check whether a provider has a configured client"""
+    if provider == 'gemini':
+        return gemini_model is not None
+    if provider == 'gemini_flash':
+        return gemini_flash is not None
+    if provider == 'groq':
+        return groq_client is not None
+    client_getter = _HTTP_CLIENTS.get(provider)
+    return bool(client_getter and client_getter())
+
+
+def _resolve_policy(model_policy: Union[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    if isinstance(model_policy, str):
+        if model_policy not in MODEL_POLICIES:
+            raise ValueError(f"Unknown model policy: {model_policy}")
+        return MODEL_POLICIES[model_policy]
+    return model_policy
+
+
+def _rank_steps(steps: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop steps whose breaker is open and move degraded providers to the back"""
+    ranked = health.rank([step['provider'] for step in steps])
+    return sorted(
+        (step for step in steps if step['provider'] in ranked),
+        key=lambda step: ranked.index(step['provider'])
+    )
+
+
+def _completion_params(step: Dict[str, Any]) -> Dict[str, Any]:
+    """Generation settings of a policy step, without the routing keys"""
+    return {k: v for k, v in step.items() if k not in ('provider', 'model')}
+
+
+def _gemini_request(messages: List[Dict[str, str]], step: Dict[str, Any]):
+    # Gemini takes a single prompt - system and user turns are joined in order
+    prompt = "\n\n".join(m['content'] for m in messages)
+    params = _completion_params(step)
+    generation_config = None
+    if params:
+        generation_config = genai.types.GenerationConfig(
+            temperature=params.get('temperature'),
+            max_output_tokens=params.get('max_tokens'),
+            top_p=params.get('top_p')
+        )
+    return prompt, generation_config
+
+
+async def _call_gemini(model, messages: List[Dict[str, str]], step: Dict[str, Any]) -> str:
+    prompt, generation_config = _gemini_request(messages, step)
+    response = await model.generate_content_async(prompt, generation_config=generation_config)
+    return response.text
+
+
+async def _call_groq(messages: List[Dict[str, str]], step: Dict[str, Any]) -> str:
+    completion = await groq_client.chat.completions.create(
+        model=step['model'],
+        messages=messages,
+        stream=False,
+        **_completion_params(step)
+    )
+    return completion.choices[0].message.content
+
+
+async def _call_openai_compatible(client: httpx.AsyncClient, messages: List[Dict[str, str]], step: Dict[str, Any]) -> str:
+    response = await client.post(
+        "/chat/completions",
+        json={"model": step['model'], "messages": messages, **_completion_params(step)}
+    )
+    response.raise_for_status()
+    result = response.json()
+    return result['choices'][0]['message']['content']
+
+
+async def call_provider(step: Dict[str, Any], messages: List[Dict[str, str]]) -> str:
+    """Run a single policy step against its provider and return the raw text"""
+    provider = step['provider']
+    if not health.acquire(provider):
+        raise CircuitOpenError(f"{provider} circuit open")
+
+    stats = _provider_stats(provider)
+    stats.calls += 1
+    started = time.perf_counter()
+    try:
+        async with _semaphore(provider):
+            if provider == 'gemini':
+                text = await _call_gemini(gemini_model, messages, step)
+            elif provider == 'gemini_flash':
+                text = await _call_gemini(gemini_flash, messages, step)
+            elif provider == 'groq':
+                text = await _call_groq(messages, step)
+            else:
+                text = await _call_openai_compatible(_HTTP_CLIENTS[provider](), messages, step)
+    except asyncio.CancelledError:
+        health.release(provider)
+        raise
+    except Exception:
+        stats.errors += 1
+        health.record_failure(provider)
+        raise
+    latency = time.perf_counter() - started
+    stats.latencies.append(latency)
+    health.record_success(provider, latency)
+    return (text or '').strip()
+
+
+async def complete(
+    messages: List[Dict[str, str]],
+    model_policy: Union[str, List[Dict[str, Any]]],
+    hedge: bool = False
+) -> str:
+    """
+    Run a chat completion through the provider chain of a model policy
+
+    Args:
+        messages: OpenAI-style [{'role': 'system'|'user', 'content': '...'}]
+        model_policy: Name from MODEL_POLICIES or an explicit list of steps
+        hedge: Race the chain instead of walking it - the next provider starts
+            once the running one exceeds its observed p95 latency
+
+    Returns:
+        Text of the first successful answer
+
+    Raises:
+        LLMGatewayError: if every provider in the policy failed
+    """
+    steps = _rank_steps([step for step in _resolve_policy(model_policy) if is_available(step['provider'])])
+    if hedge and len(steps) > 1:
+        return await _complete_hedged(messages, steps)
+
+    errors = []
+
+    for step in steps:
+        provider = step['provider']
+        try:
+            text = await call_provider(step, messages)
+            if text:
+                print(f"✅ LLM gateway: answered by {provider}")
+                return text
+            errors.append(f"{provider}: empty response")
+        except Exception as e:
+            print(f"⚠️ {provider} failed: {e}")
+            errors.append(f"{provider}: {e}")
+
+    raise LLMGatewayError("All AI providers failed" + (f" ({'; '.join(errors)})" if errors else " (none configured or healthy)"))
+
+
+async def _complete_hedged(messages: List[Dict[str, str]], steps: List[Dict[str, Any]]) -> str:
+    """First valid answer wins; slower or failed providers are backed up and losers cancelled"""
+    remaining = list(steps)
+    pending: Dict[asyncio.Task, str] = {}
+    errors = []
+    last_launched = None
+
+    def launch(as_hedge: bool):
+        nonlocal last_launched
+        step = remaining.pop(0)
+        last_launched = step['provider']
+        if as_hedge:
+            _provider_stats(last_launched).hedged += 1
+        pending[asyncio.create_task(call_provider(step, messages))] = last_launched
+
+    launch(as_hedge=False)
+    try:
+        while pending:
+            delay = _provider_stats(last_launched).hedge_delay() if remaining else None
+            done, _ = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+
+            if not done:
+                # Running provider is slower than its p95 - start a backup
+                launch(as_hedge=True)
+                continue
+
+            for task in done:
+                provider = pending.pop(task)
+                try:
+                    text = task.result()
+                except Exception as e:
+                    print(f"⚠️ {provider} failed: {e}")
+                    errors.append(f"{provider}: {e}")
+                    continue
+                if text:
+                    _provider_stats(provider).wins += 1
+                    print(f"✅ LLM gateway: hedged request won by {provider}")
+                    return text
+                errors.append(f"{provider}: empty response")
+
+            # A provider failed - replace it right away instead of waiting out the delay
+            if remaining:
+                launch(as_hedge=False)
+    finally:
+        for task, provider in pending.items():
+            task.cancel()
+            _provider_stats(provider).cancelled += 1
+
+    raise LLMGatewayError("All AI providers failed" + (f" ({'; '.join(errors)})" if errors else ""))
+
+
+async def _stream_gemini(model, messages: List[Dict[str, str]], step: Dict[str, Any]) -> AsyncIterator[str]:
+    prompt, generation_config = _gemini_request(messages, step)
+    response = await model.generate_content_async(prompt, generation_config=generation_config, stream=True)
+    async for chunk in response:
+        if chunk.parts:
+            yield chunk.text
+
+
+async def _stream_groq(messages: List[Dict[str, str]], step: Dict[str, Any]) -> AsyncIterator[str]:
+    completion = await groq_client.chat.completions.create(
+        model=step['model'],
+        messages=messages,
+        stream=True,
+        **_completion_params(step)
+    )
+    async for chunk in completion:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+async def _stream_openai_compatible(client: httpx.AsyncClient, messages: List[Dict[str, str]], step: Dict[str, Any]) -> AsyncIterator[str]:
+    payload = {"model": step['model'], "messages": messages, "stream": True, **_completion_params(step)}
+    async with client.stream("POST", "/chat/completions", json=payload) as response:
+        response.raise_for_status()
+        # Server-sent events: "data: {...}" lines terminated by "data: [DONE]"
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            choices = json.loads(data).get('choices') or []
+            content = choices[0].get('delta', {}).get('content') if choices else None
+            if content:
+                yield content
+
+
+def _open_stream(step: Dict[str, Any], messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+    provider = step['provider']
+    if provider == 'gemini':
+        return _stream_gemini(gemini_model, messages, step)
+    if provider == 'gemini_flash':
+        return _stream_gemini(gemini_flash, messages, step)
+    if provider == 'groq':
+        return _stream_groq(messages, step)
+    return _stream_openai_compatible(_HTTP_CLIENTS[provider](), messages, step)
+
+
+async def stream(
+    messages: List[Dict[str, str]],
+    model_policy: Union[str, List[Dict[str, Any]]]
+) -> AsyncIterator[str]:
+    """
+    Stream a chat completion token by token through a model policy
+
+    Providers are tried in the same health-ranked order as complete(). A
+    provider that fails before its first token falls through to the next one;
+    once tokens have been sent the stream cannot be restarted elsewhere, so a
+    mid-stream failure is raised to the caller.
+
+    Raises:
+        LLMGatewayError: if no provider produced any output, or one failed mid-stream
+    """
+    steps = _rank_steps([step for step in _resolve_policy(model_policy) if is_available(step['provider'])])
+    errors = []
+
+    for step in steps:
+        provider = step['provider']
+        if not health.acquire(provider):
+            errors.append(f"{provider}: circuit open")
+            continue
+
+        stats = _provider_stats(provider)
+        stats.calls += 1
+        started = time.perf_counter()
+        emitted = False
+        try:
+            async with _semaphore(provider):
+                async for token in _open_stream(step, messages):
+                    if not emitted:
+                        print(f"⚡ LLM gateway: first token from {provider} after {time.perf_counter() - started:.2f}s")
+                    emitted = True
+                    yield token
+        except (asyncio.CancelledError, GeneratorExit):
+            # Client went away - not the provider's fault
+            health.release(provider)
+            raise
+        except Exception as e:
+            stats.errors += 1
+            health.record_failure(provider)
+            if emitted:
+                raise LLMGatewayError(f"{provider} failed mid-stream: {e}") from e
+            print(f"⚠️ {provider} stream failed: {e}")
+            errors.append(f"{provider}: {e}")
+            continue
+
+        latency = time.perf_counter() - started
+        stats.latencies.append(latency)
+        health.record_success(provider, latency)
+        if emitted:
+            print(f"✅ LLM gateway: streamed by {provider}")
+            return
+        errors.append(f"{provider}: empty response")
+
+    raise LLMGatewayError("All AI providers failed" + (f" ({'; '.join(errors)})" if errors else " (none configured or healthy)"))
+
+
+def get_groq_client():
+    """Shared async Groq client (also used for Whisper transcription)"""
+    return groq_client
+
+
+async def aclose():
+    """Close pooled provider connections (called on app shutdown)"""
+    try:
+        if groq_client is not None:
+            await groq_client.close()
+        for client in (openrouter_client, a4f_client, mistral_client):
+            if client is not None:
+                await client.aclose()
+    except Exception as e:
+        print(f"⚠️ Error closing LLM clients: {e}")
@@ -36,11 +36,14 @@ class NextQuestionRequest(BaseModel):
     resumeData: Optional[Dict[str, Any]] = None
     conversationHistory: Optional[List[Dict[str, Any]]] = []
     candidateInfo: Optional[Dict[str, Any]] = None
+    turn: Optional[int] = None  # Questions asked so far; lets clients send only the new answer
 
 class NextQuestionResponse(BaseModel):
     question: str
     section: str
     isComplete: bool
+    turn: Optional[int] = None
+    audioHandle: Optional[str] = None  # GET /api/interview/audio/{audioHandle} (synthesis already started)
 
 class ConversationItem(BaseModel):
     type: str  # 'question' or 'answer'
@@ -50,8 +53,9 @@ class ConversationItem(BaseModel):
 
 class InterviewSubmit(BaseModel):
     interviewId: str
-    answers: List[Dict[str, Any]]
-    conversationHistory: List[Dict[str, Any]]
+    # Optional: the transcript is persisted turn by turn; sending it overrides the stored one
+    answers: Optional[List[Any]] = None
+    conversationHistory: Optional[List[Dict[str, Any]]] = None
     duration: Optional[int] = 0
 
 class FeedbackScores(BaseModel):
@@ -0,0 +1,281 @@
+"""
+PDF Text Extraction Pool
+Runs PDF text extraction in a bounded pool of worker processes, so parsing an
+uploaded resume (pure CPU inside pdfplumber) never blocks the event loop that
+serves live interviews on the same worker.
+
+- Pluggable engines: pypdfium2 fast path, pdfplumber only when the fast
+  output looks layout-broken, PyPDF2 as a last resort
+- Pool size, per-job timeout and per-worker memory cap are configurable
+- Jobs beyond the pool size wait in a bounded queue (depth is exported as a metric)
+- A job that times out or crashes its worker gets the pool recycled
+"""
+
+import os
+import io
+import time
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any
+
+PDF_POOL_SIZE = int(os.environ.get('PDF_POOL_SIZE', str(min(2, os.cpu_count() or 1))))  # 0 = in-process thread
+PDF_EXTRACT_TIMEOUT = float(os.environ.get('PDF_EXTRACT_TIMEOUT', '20'))  # Seconds per job
+PDF_WORKER_MEMORY_MB = int(os.environ.get('PDF_WORKER_MEMORY_MB', '512'))  # Address-space cap per worker
+PDF_MAX_QUEUE = int(os.environ.get('PDF_MAX_QUEUE', '32'))  # Jobs allowed to wait for a worker
+PDF_WORKER_MAX_TASKS = 100  # Recycle workers periodically so fragmented memory is returned
+
+# Engine order: fast path first, layout-aware fallback after
+PDF_ENGINES = [e.strip() for e in os.environ.get('PDF_ENGINES', 'pypdfium2,pdfplumber,pypdf2').split(',') if e.strip()]
+PDF_MAX_CHARS = int(os.environ.get('PDF_MAX_CHARS', '10000'))  # Prompts only use the first 8-10k chars
+PDF_MIN_CHARS = 200  # Less than this from the fast path suggests a layout/scan problem
+
+
+class PDFExtractionBusy(Exception):
+    """Raised when the extraction queue is full"""
+
+
+class PDFExtractionError(Exception):
+    """Raised when a job times out or its worker dies"""
+
+
+def _init_worker(memory_mb: int):
+    # Runs once in each worker process. RLIMIT_AS is unavailable on Windows,
+    # where the cap is simply not enforced.
+    try:
+        import resource
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        print(f"⚠️ PDF worker memory cap not applied: {e}")
+
+
+def _extract_pypdfium2(pdf_content: bytes, max_chars: int) -> str:
+    """Fast path: PDFium's native text layer"""
+    import pypdfium2 as pdfium
+    parts, collected = [], 0
+    pdf = pdfium.PdfDocument(pdf_content)
+    try:
+        for index in range(len(pdf)):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            try:
+                page_text = textpage.get_text_bounded()
+            finally:
+                textpage.close()
+                page.close()
+            if page_text:
+                parts.append(page_text)
+                collected += len(page_text)
+            if collected >= max_chars:
+                break
+    finally:
+        pdf.close()
+    # PDFium reports line breaks as CRLF
+    return "\n".join(parts).replace("\r\n", "\n")
+
+
+def _extract_pdfplumber(pdf_content: bytes, max_chars: int) -> str:
+    """Quality path: layout-aware, slowest"""
+    import pdfplumber
+    parts, collected = [], 0
+    with pdfplumber.open(io.BytesIO(pdf_content)) as pdf:
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            if page_text:
+                parts.append(page_text)
+                collected += len(page_text)
+            if collected >= max_chars:
+                break
+    return "\n".join(parts)
+
+
+def _extract_pypdf2(pdf_content: bytes, max_chars: int) -> str:
+    """Last resort for files the other engines reject"""
+    import PyPDF2
+    parts, collected = [], 0
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_content))
+    for page in pdf_reader.pages:
+        page_text = page.extract_text()
+        if page_text:
+            parts.append(page_text)
+            collected += len(page_text)
+        if collected >= max_chars:
+            break
+    return "\n".join(parts)
+
+
+# Pluggable engines: name -> fn(pdf_content, max_chars) -> text
+ENGINES = {
+    'pypdfium2': _extract_pypdfium2,
+    'pdfplumber': _extract_pdfplumber,
+    'pypdf2': _extract_pypdf2
+}
+LAYOUT_ENGINE = 'pdfplumber'
+
+
+def _needs_layout_engine(text: str) -> bool:
+    """
+    Heuristic for fast-path output that lost the reading order
+
+    Multi-column or heavily positioned layouts come out of the raw text layer
+    with words glued together or mostly undecodable glyphs.
+    """
+    stripped = text.strip()
+    if len(stripped) < PDF_MIN_CHARS:
+        return True
+    whitespace_ratio = sum(1 for c in stripped if c.isspace()) / len(stripped)
+    garbage_ratio = sum(1 for c in stripped if c == '\ufffd' or (not c.isprintable() and not c.isspace())) / len(stripped)
+    return whitespace_ratio < 0.05 or garbage_ratio > 0.05
+
+
+def extract_text(pdf_content: bytes, max_chars: int = None) -> str:
+    """
+    Extract text with the configured engines (runs inside a worker)
+
+    The first engine in PDF_ENGINES is the fast path; the layout engine is only
+    used when its output looks unusable, and any engine may fall through to
+    the next on error. Extraction stops once max_chars have been collected -
+    the parsing prompts never look further than that.
+    """
+    max_chars = max_chars or PDF_MAX_CHARS
+    best = ""
+    for name in PDF_ENGINES:
+        engine = ENGINES.get(name)
+        if engine is None:
+            continue
+        try:
+            text = engine(pdf_content, max_chars).strip()
+        except MemoryError:
+            raise
+        except Exception as e:
+            print(f"{name} extraction failed: {e}")
+            continue
+        if len(text) > len(best):
+            best = text
+        if text and (name == LAYOUT_ENGINE or not _needs_layout_engine(text)):
+            break
+    return best[:max_chars] if best else ""
+
+
+class PDFExtractionPool:
+    """Bounded process pool for extract_text with queue-depth and timing metrics"""
+
+    _executor = None
+    _slots = None
+    _waiting = 0
+    _running = 0
+
+    _metrics = {
+        'jobs': 0,
+        'rejected': 0,      # Queue was full
+        'timeouts': 0,
+        'failures': 0,      # Worker crashed (e.g. hit the memory cap)
+        'poolRestarts': 0,
+        'totalMs': 0.0,
+        'maxQueueDepth': 0
+    }
+
+    @staticmethod
+    def _get_executor() -> ProcessPoolExecutor:
+        # Created lazily so scripts importing ai_services don't spawn workers
+        if PDFExtractionPool._executor is None:
+            PDFExtractionPool._executor = ProcessPoolExecutor(
+                max_workers=PDF_POOL_SIZE,
+                initializer=_init_worker,
+                initargs=(PDF_WORKER_MEMORY_MB,),
+                max_tasks_per_child=PDF_WORKER_MAX_TASKS
+            )
+        return PDFExtractionPool._executor
+
+    @staticmethod
+    def _recycle():
+        """Drop the current pool - needed when a worker hangs or dies"""
+        executor = PDFExtractionPool._executor
+        PDFExtractionPool._executor = None
+        if executor is None:
+            return
+        PDFExtractionPool._metrics['poolRestarts'] += 1
+        # A hung worker never returns on its own, so terminate the processes
+        for process in list((getattr(executor, '_processes', None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    async def extract(pdf_content: bytes) -> str:
+        """
+        Extract text from a PDF without blocking the event loop
+
+        Raises:
+            PDFExtractionBusy: if PDF_MAX_QUEUE jobs are already waiting
+            PDFExtractionError: if the job timed out or its worker died
+        """
+        if PDF_POOL_SIZE <= 0:
+            return await asyncio.to_thread(extract_text, pdf_content)
+
+        if PDFExtractionPool._slots is None:
+            PDFExtractionPool._slots = asyncio.Semaphore(PDF_POOL_SIZE)
+
+        metrics = PDFExtractionPool._metrics
+        if PDFExtractionPool._waiting >= PDF_MAX_QUEUE:
+            metrics['rejected'] += 1
+            raise PDFExtractionBusy("PDF extraction queue is full")
+
+        PDFExtractionPool._waiting += 1
+        metrics['maxQueueDepth'] = max(metrics['maxQueueDepth'], PDFExtractionPool._waiting)
+        try:
+            await PDFExtractionPool._slots.acquire()
+        finally:
+            PDFExtractionPool._waiting -= 1
+
+        PDFExtractionPool._running += 1
+        started = time.perf_counter()
+        try:
+            metrics['jobs'] += 1
+            return await PDFExtractionPool._run(pdf_content)
+        finally:
+            metrics['totalMs'] += (time.perf_counter() - started) * 1000
+            PDFExtractionPool._running -= 1
+            PDFExtractionPool._slots.release()
+
+    @staticmethod
+    async def _run(pdf_content: bytes) -> str:
+        loop = asyncio.get_running_loop()
+        metrics = PDFExtractionPool._metrics
+        # One retry: the pool may have been recycled under us by another job
+        for attempt in range(2):
+            executor = PDFExtractionPool._get_executor()
+            try:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(executor, extract_text, pdf_content),
+                    timeout=PDF_EXTRACT_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                metrics['timeouts'] += 1
+                print(f"⚠️ PDF extraction timed out after {PDF_EXTRACT_TIMEOUT:.0f}s - recycling workers")
+                PDFExtractionPool._recycle()
+                raise PDFExtractionError("PDF extraction timed out")
+            except (BrokenProcessPool, MemoryError) as e:
+                metrics['failures'] += 1
+                if PDFExtractionPool._executor is executor:
+                    PDFExtractionPool._recycle()
+                if attempt == 1 or isinstance(e, MemoryError):
+                    raise PDFExtractionError(f"PDF extraction worker failed: {e!r}") from e
+        raise PDFExtractionError("PDF extraction worker failed")
+
+    @staticmethod
+    def shutdown():
+        """Stop worker processes (called on app shutdown)"""
+        executor = PDFExtractionPool._executor
+        PDFExtractionPool._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def get_metrics() -> Dict[str, Any]:
+        metrics = dict(PDFExtractionPool._metrics)
+        metrics['avgMs'] = round(metrics.pop('totalMs') / metrics['jobs'], 1) if metrics['jobs'] else 0.0
+        metrics['poolSize'] = PDF_POOL_SIZE
+        metrics['queueDepth'] = PDFExtractionPool._waiting
+        metrics['running'] = PDFExtractionPool._running
+        return metrics
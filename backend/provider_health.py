@@ -0,0 +1,168 @@
+"""
+Provider Health Tracking
+Shared per-provider health scores and circuit breakers for AI/speech providers.
+
+Each provider keeps an EWMA of latency and error rate plus a breaker:
+- closed: normal traffic
+- open: provider skipped until the cooldown expires
+- half_open: a single probe request at a time; enough successes close the
+  breaker again, a failure re-opens it with a longer cooldown
+"""
+
+import os
+import time
+from typing import Dict, List, Any
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Tuning
+EWMA_ALPHA = float(os.environ.get('PROVIDER_HEALTH_EWMA_ALPHA', '0.2'))
+FAILURE_THRESHOLD = int(os.environ.get('PROVIDER_BREAKER_FAILURES', '3'))  # Consecutive failures to trip
+ERROR_RATE_THRESHOLD = 0.5       # EWMA error rate that trips the breaker
+DEGRADED_ERROR_RATE = 0.25       # EWMA error rate that demotes a provider in the chain
+MIN_CALLS_FOR_RATE = 10          # Calls before the error rate is trusted
+BASE_COOLDOWN = float(os.environ.get('PROVIDER_BREAKER_COOLDOWN', '15'))
+MAX_COOLDOWN = 300.0
+HALF_OPEN_SUCCESSES = 2          # Successful probes needed to close
+
+
+class CircuitOpenError(Exception):
+    """Raised when a provider is skipped because its breaker is open"""
+
+
+class ProviderHealth:
+    """Health score and circuit breaker state for one provider"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED
+        self.calls = 0
+        self.ewma_latency = None
+        self.ewma_error_rate = 0.0
+        self.consecutive_failures = 0
+        self.half_open_successes = 0
+        self.probe_in_flight = False
+        self.cooldown = BASE_COOLDOWN
+        self.opened_at = 0.0
+
+    def _refresh(self):
+        # Open breakers become half-open once the cooldown has elapsed
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = HALF_OPEN
+            self.half_open_successes = 0
+            self.probe_in_flight = False
+
+    def is_available(self) -> bool:
+        self._refresh()
+        if self.state == OPEN:
+            return False
+        if self.state == HALF_OPEN:
+            return not self.probe_in_flight
+        return True
+
+    def is_degraded(self) -> bool:
+        # Half-open providers keep their slot so the probe actually gets traffic
+        return self.calls >= MIN_CALLS_FOR_RATE and self.ewma_error_rate >= DEGRADED_ERROR_RATE
+
+    def acquire(self) -> bool:
+        """Reserve a call slot; half-open providers only admit one probe at a time"""
+        if not self.is_available():
+            return False
+        if self.state == HALF_OPEN:
+            self.probe_in_flight = True
+        return True
+
+    def release(self):
+        """Free a probe slot without recording an outcome (e.g. cancelled call)"""
+        self.probe_in_flight = False
+
+    def record_success(self, latency: float):
+        self.calls += 1
+        self.consecutive_failures = 0
+        self.ewma_error_rate = (1 - EWMA_ALPHA) * self.ewma_error_rate
+        self.ewma_latency = latency if self.ewma_latency is None else (
+            EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.ewma_latency
+        )
+
+        if self.state == HALF_OPEN:
+            self.probe_in_flight = False
+            self.half_open_successes += 1
+            if self.half_open_successes >= HALF_OPEN_SUCCESSES:
+                self.state = CLOSED
+                self.cooldown = BASE_COOLDOWN
+                self.ewma_error_rate = 0.0
+                print(f"✅ {self.name} recovered - circuit closed")
+
+    def record_failure(self):
+        self.calls += 1
+        self.consecutive_failures += 1
+        self.ewma_error_rate = EWMA_ALPHA + (1 - EWMA_ALPHA) * self.ewma_error_rate
+
+        if self.state == HALF_OPEN:
+            # Failed probe: back off harder before the next one
+            self.cooldown = min(MAX_COOLDOWN, self.cooldown * 2)
+            self._open()
+        elif self.state == CLOSED and (
+            self.consecutive_failures >= FAILURE_THRESHOLD
+            or (self.calls >= MIN_CALLS_FOR_RATE and self.ewma_error_rate >= ERROR_RATE_THRESHOLD)
+        ):
+            self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.probe_in_flight = False
+        print(f"⚠️ {self.name} circuit opened for {self.cooldown:.0f}s")
+
+    def to_dict(self) -> Dict[str, Any]:
+        self._refresh()
+        return {
+            'state': self.state,
+            'calls': self.calls,
+            'ewmaLatencyMs': round(self.ewma_latency * 1000, 1) if self.ewma_latency is not None else None,
+            'ewmaErrorRate': round(self.ewma_error_rate, 3),
+            'consecutiveFailures': self.consecutive_failures,
+            'degraded': self.is_degraded(),
+            'cooldownSeconds': self.cooldown if self.state != CLOSED else 0
+        }
+
+
+class HealthTracker:
+    """Registry of provider health for one family of providers (LLM, STT, ...)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._providers: Dict[str, ProviderHealth] = {}
+
+    def get(self, provider: str) -> ProviderHealth:
+        if provider not in self._providers:
+            self._providers[provider] = ProviderHealth(f"{self.name}:{provider}")
+        return self._providers[provider]
+
+    def acquire(self, provider: str) -> bool:
+        return self.get(provider).acquire()
+
+    def release(self, provider: str):
+        self.get(provider).release()
+
+    def record_success(self, provider: str, latency: float):
+        self.get(provider).record_success(latency)
+
+    def record_failure(self, provider: str):
+        self.get(provider).record_failure()
+
+    def rank(self, providers: List[str]) -> List[str]:
+        """
+        Order providers for a fallback chain
+
+        Open breakers are skipped (a half-open provider is offered for a single
+        probe), providers with a high error rate move behind healthy ones, and
+        the configured priority is kept within each group.
+        """
+        available = [p for p in providers if self.get(p).is_available()]
+        return sorted(available, key=lambda p: self.get(p).is_degraded())
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {provider: health.to_dict() for provider, health in self._providers.items()}
@@ -0,0 +1,237 @@
+"""
+Speculative Question Pre-generation
+While the candidate is answering, the next question is generated ahead of time
+for the branches that do not depend on the answer text (new_topic,
+continue_section, new_section). When the real turn lands on one of those
+branches the question is served instantly; follow-ups and mismatches are
+discarded and generated normally.
+"""
+
+import os
+import time
+import asyncio
+from typing import Dict, List, Any, Optional
+
+from ai_services import AIInterviewer, ConversationState
+
+QUESTION_PREFETCH = os.environ.get('QUESTION_PREFETCH', 'true').lower() == 'true'
+PREFETCH_MAX_CANDIDATES = int(os.environ.get('QUESTION_PREFETCH_MAX_CANDIDATES', '2'))
+PREFETCH_TTL = float(os.environ.get('QUESTION_PREFETCH_TTL', '600'))  # Seconds
+PREFETCH_MAX_INTERVIEWS = 1000
+
+
+class QuestionPrefetcher:
+    """Per-interview speculative next questions with hit-rate metrics"""
+
+    # interviewId -> {'questionCount', 'createdAt', 'candidates': {(section, topic): Task}}
+    _speculations: Dict[str, Dict[str, Any]] = {}
+
+    _metrics = {
+        'scheduled': 0,        # Candidate questions started in the background
+        'hits': 0,             # Turns served from a finished candidate
+        'inflightHits': 0,     # Turns that awaited a candidate still generating
+        'followUpMisses': 0,   # Turn needed a follow-up (depends on the answer)
+        'branchMisses': 0,     # Turn landed on a section/topic nobody predicted
+        'stale': 0,            # Conversation moved on or speculation expired
+        'errors': 0,           # Candidate generation failed
+        'discarded': 0         # Candidates thrown away unused
+    }
+
+    @staticmethod
+    async def generate_question(
+        interview_id: Optional[str],
+        section: str,
+        previous_answer: str,
+        resume_data: Dict[str, Any],
+        conversation_history: List[Dict[str, Any]],
+        candidate_info: Dict[str, Any] = None
+    ) -> Dict[str, Any]:
+        """Serve a pre-generated question when the branch matches, otherwise generate it now"""
+        result = None
+        if QUESTION_PREFETCH and interview_id:
+            result = await QuestionPrefetcher._take(
+                interview_id, section, previous_answer, conversation_history, candidate_info
+            )
+
+        if result is None:
+            result = await AIInterviewer.generate_question(
+                section=section,
+                previous_answer=previous_answer,
+                resume_data=resume_data,
+                conversation_history=conversation_history,
+                candidate_info=candidate_info
+            )
+
+        if QUESTION_PREFETCH and interview_id and not result.get('isComplete') and result.get('questionType') != 'fallback':
+            QuestionPrefetcher._schedule(interview_id, result, resume_data, conversation_history, candidate_info)
+
+        return result
+
+    @staticmethod
+    async def stream_question(
+        interview_id: Optional[str],
+        section: str,
+        previous_answer: str,
+        resume_data: Dict[str, Any],
+        conversation_history: List[Dict[str, Any]],
+        candidate_info: Dict[str, Any] = None
+    ):
+        """Streaming counterpart of generate_question - yields ('token', text) then ('done', result)"""
+        result = None
+        if QUESTION_PREFETCH and interview_id:
+            result = await QuestionPrefetcher._take(
+                interview_id, section, previous_answer, conversation_history, candidate_info
+            )
+
+        if result is not None:
+            # Already generated - nothing to stream, send it in one piece
+            yield ('token', result['question'])
+        else:
+            async for event, payload in AIInterviewer.stream_question(
+                section, previous_answer, resume_data, conversation_history, candidate_info
+            ):
+                if event == 'done':
+                    result = payload
+                else:
+                    yield (event, payload)
+
+        if QUESTION_PREFETCH and interview_id and not result.get('isComplete') and result.get('questionType') != 'fallback':
+            QuestionPrefetcher._schedule(interview_id, result, resume_data, conversation_history, candidate_info)
+
+        yield ('done', result)
+
+    @staticmethod
+    async def _take(
+        interview_id: str,
+        section: str,
+        previous_answer: str,
+        conversation_history: List[Dict[str, Any]],
+        candidate_info: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Claim the speculative question matching this turn's real plan, if any"""
+        spec = QuestionPrefetcher._speculations.pop(interview_id, None)
+        if not spec:
+            return None
+
+        metrics = QuestionPrefetcher._metrics
+        state = ConversationState.of(conversation_history)
+        if spec['questionCount'] != state.question_count or time.monotonic() - spec['createdAt'] > PREFETCH_TTL:
+            metrics['stale'] += 1
+            QuestionPrefetcher._discard(spec)
+            return None
+
+        plan = AIInterviewer.plan_question(section, previous_answer, state, candidate_info)
+        if plan['isComplete'] or plan['questionType'] == 'follow_up':
+            metrics['branchMisses' if plan['isComplete'] else 'followUpMisses'] += 1
+            QuestionPrefetcher._discard(spec)
+            return None
+
+        task = spec['candidates'].pop((plan['section'], plan['topic']), None)
+        QuestionPrefetcher._discard(spec)
+        if task is None:
+            metrics['branchMisses'] += 1
+            return None
+
+        inflight = not task.done()
+        try:
+            result = await task
+        except Exception as e:
+            print(f"⚠️ Pre-generated question failed: {e}")
+            metrics['errors'] += 1
+            return None
+
+        metrics['inflightHits' if inflight else 'hits'] += 1
+        print(f"⚡ Served pre-generated question ({plan['section']}/{plan['topic']})")
+
+        # Keep the generated text/style, but report the real plan for this turn
+        return {
+            **result,
+            'section': plan['section'],
+            'questionType': plan['questionType'],
+            'topic': plan['topic'],
+            'followUpOpportunities': plan['analysis'].get('follow_up_opportunities', [])
+        }
+
+    @staticmethod
+    def _schedule(
+        interview_id: str,
+        result: Dict[str, Any],
+        resume_data: Dict[str, Any],
+        conversation_history: List[Dict[str, Any]],
+        candidate_info: Dict[str, Any]
+    ):
+        """Start generating likely next questions while the candidate answers"""
+        previous = QuestionPrefetcher._speculations.pop(interview_id, None)
+        if previous:
+            QuestionPrefetcher._discard(previous)
+
+        # Conversation as it will look on the next turn (answer text still unknown).
+        # Server-side sessions record the question with its metadata; plain
+        # client histories only carry the text and section.
+        if isinstance(conversation_history, ConversationState):
+            predicted_history = conversation_history.fork()
+            predicted_history.append(AIInterviewer.question_entry(result))
+        else:
+            predicted_history = ConversationState(conversation_history + [
+                {'type': 'question', 'text': result['question'], 'section': result['section']}
+            ])
+
+        # The client may stay in this section or advance to the next one
+        sections = [result['section']]
+        section_ids = [s['id'] for s in AIInterviewer.SECTIONS]
+        if result['section'] in section_ids:
+            current_idx = section_ids.index(result['section'])
+            if current_idx + 1 < len(section_ids):
+                sections.append(section_ids[current_idx + 1])
+
+        candidates = {}
+        for next_section in sections:
+            plan = AIInterviewer.plan_question(
+                next_section, '', predicted_history, candidate_info, allow_follow_up=False
+            )
+            key = (plan.get('section'), plan.get('topic'))
+            if plan['isComplete'] or key in candidates:
+                continue
+            candidates[key] = asyncio.create_task(
+                AIInterviewer.generate_planned_question(
+                    plan, '', resume_data, predicted_history, candidate_info, hedge=False
+                )
+            )
+            if len(candidates) >= PREFETCH_MAX_CANDIDATES:
+                break
+
+        if not candidates:
+            return
+
+        QuestionPrefetcher._metrics['scheduled'] += len(candidates)
+        QuestionPrefetcher._speculations[interview_id] = {
+            'questionCount': predicted_history.question_count,
+            'createdAt': time.monotonic(),
+            'candidates': candidates
+        }
+
+        # Bound memory: drop the oldest abandoned interviews
+        while len(QuestionPrefetcher._speculations) > PREFETCH_MAX_INTERVIEWS:
+            oldest = next(iter(QuestionPrefetcher._speculations))
+            QuestionPrefetcher._discard(QuestionPrefetcher._speculations.pop(oldest))
+
+    @staticmethod
+    def _discard(spec: Dict[str, Any]):
+        for task in spec['candidates'].values():
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                task.exception()  # Mark failures as retrieved so asyncio doesn't warn
+            QuestionPrefetcher._metrics['discarded'] += 1
+        spec['candidates'].clear()
+
+    @staticmethod
+    def get_metrics() -> Dict[str, Any]:
+        """Hit-rate and waste counters (exposed at /api/llm/stats)"""
+        metrics = dict(QuestionPrefetcher._metrics)
+        lookups = (metrics['hits'] + metrics['inflightHits'] + metrics['followUpMisses']
+                   + metrics['branchMisses'] + metrics['stale'] + metrics['errors'])
+        metrics['enabled'] = QUESTION_PREFETCH
+        metrics['pendingInterviews'] = len(QuestionPrefetcher._speculations)
+        metrics['hitRate'] = round((metrics['hits'] + metrics['inflightHits']) / lookups, 3) if lookups else 0.0
+        return metrics
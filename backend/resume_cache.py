@@ -0,0 +1,157 @@
+"""
+Resume Parse Cache
+Content-addressed cache for parsed resumes, keyed by the SHA-256 of the PDF
+bytes plus the parser/prompt version - re-uploading the same file skips text
+extraction and the LLM call entirely.
+
+Two tiers:
+- In-process LRU (per worker, microseconds)
+- MongoDB collection with a TTL index (shared by all workers, survives restarts)
+"""
+
+import os
+import copy
+import asyncio
+import hashlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+RESUME_CACHE = os.environ.get('RESUME_CACHE', 'true').lower() == 'true'
+RESUME_CACHE_SIZE = int(os.environ.get('RESUME_CACHE_SIZE', '256'))  # In-process entries
+RESUME_CACHE_TTL = int(os.environ.get('RESUME_CACHE_TTL', str(30 * 24 * 3600)))  # Seconds, Mongo tier
+RESUME_CACHE_COLLECTION = 'resume_cache'
+
+
+class ResumeCache:
+    """Two-tier (LRU + Mongo) cache of ResumeParser results"""
+
+    _memory: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+    _inflight: Dict[str, asyncio.Future] = {}
+    _collection = None
+
+    _metrics = {
+        'memoryHits': 0,
+        'mongoHits': 0,
+        'misses': 0,
+        'coalesced': 0,   # Concurrent uploads of the same file that shared one parse
+        'stored': 0,
+        'errors': 0
+    }
+
+    @staticmethod
+    async def init(db):
+        """Attach the Mongo tier and make sure its TTL index exists (called on startup)"""
+        if not RESUME_CACHE or db is None:
+            return
+        try:
+            collection = db[RESUME_CACHE_COLLECTION]
+            await collection.create_index('createdAt', expireAfterSeconds=RESUME_CACHE_TTL)
+            ResumeCache._collection = collection
+            print(f"✅ Resume parse cache ready (TTL {RESUME_CACHE_TTL}s)")
+        except Exception as e:
+            print(f"⚠️ Resume cache persistence disabled: {e}")
+
+    @staticmethod
+    def key(pdf_content: bytes, parser_version: str) -> str:
+        return f"{hashlib.sha256(pdf_content).hexdigest()}:{parser_version}"
+
+    @staticmethod
+    async def get_or_parse(
+        key: str,
+        parse: Callable[[], Awaitable[Tuple[Dict[str, Any], bool]]]
+    ) -> Dict[str, Any]:
+        """
+        Return the cached result for key, or run parse() and cache it
+
+        parse() returns (result, cacheable) - fallback results are passed through
+        but not cached, so a provider outage is not remembered for 30 days.
+        Concurrent calls for the same key share a single parse.
+        """
+        if not RESUME_CACHE:
+            result, _ = await parse()
+            return result
+
+        cached = await ResumeCache._get(key)
+        if cached is not None:
+            return cached
+
+        inflight = ResumeCache._inflight.get(key)
+        if inflight is not None:
+            ResumeCache._metrics['coalesced'] += 1
+            return copy.deepcopy(await asyncio.shield(inflight))
+
+        future = asyncio.get_running_loop().create_future()
+        ResumeCache._inflight[key] = future
+        try:
+            ResumeCache._metrics['misses'] += 1
+            result, cacheable = await parse()
+            if cacheable:
+                await ResumeCache._put(key, result)
+            future.set_result(result)
+            return copy.deepcopy(result)
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Retrieved here in case nobody else was waiting
+            raise
+        finally:
+            ResumeCache._inflight.pop(key, None)
+
+    @staticmethod
+    async def _get(key: str) -> Optional[Dict[str, Any]]:
+        memory = ResumeCache._memory
+        if key in memory:
+            memory.move_to_end(key)
+            ResumeCache._metrics['memoryHits'] += 1
+            print("⚡ Resume parse cache hit (memory)")
+            return copy.deepcopy(memory[key])
+
+        if ResumeCache._collection is None:
+            return None
+        try:
+            doc = await ResumeCache._collection.find_one({'_id': key}, {'result': 1})
+        except Exception as e:
+            ResumeCache._metrics['errors'] += 1
+            print(f"⚠️ Resume cache lookup failed: {e}")
+            return None
+        if not doc:
+            return None
+
+        ResumeCache._metrics['mongoHits'] += 1
+        print("⚡ Resume parse cache hit (database)")
+        ResumeCache._remember(key, doc['result'])
+        return copy.deepcopy(doc['result'])
+
+    @staticmethod
+    async def _put(key: str, result: Dict[str, Any]):
+        ResumeCache._remember(key, copy.deepcopy(result))
+        ResumeCache._metrics['stored'] += 1
+        if ResumeCache._collection is None:
+            return
+        try:
+            await ResumeCache._collection.replace_one(
+                {'_id': key},
+                {'_id': key, 'result': result, 'createdAt': datetime.utcnow()},
+                upsert=True
+            )
+        except Exception as e:
+            ResumeCache._metrics['errors'] += 1
+            print(f"⚠️ Resume cache write failed: {e}")
+
+    @staticmethod
+    def _remember(key: str, result: Dict[str, Any]):
+        memory = ResumeCache._memory
+        memory[key] = result
+        memory.move_to_end(key)
+        while len(memory) > RESUME_CACHE_SIZE:
+            memory.popitem(last=False)
+
+    @staticmethod
+    def get_metrics() -> Dict[str, Any]:
+        metrics = dict(ResumeCache._metrics)
+        lookups = metrics['memoryHits'] + metrics['mongoHits'] + metrics['misses']
+        metrics['enabled'] = RESUME_CACHE
+        metrics['persistent'] = ResumeCache._collection is not None
+        metrics['memoryEntries'] = len(ResumeCache._memory)
+        metrics['hitRate'] = round((metrics['memoryHits'] + metrics['mongoHits']) / lookups, 3) if lookups else 0.0
+        return metrics
@@ -1,15 +1,19 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, File, UploadFile, Header
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, File, UploadFile, Header, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import json
+import base64
 import logging
 import asyncio
 from pathlib import Path
 from typing import List, Optional
 from datetime import datetime
 from bson import ObjectId
+from bson.errors import InvalidId
 
 # CRITICAL: Load .env BEFORE importing ai_services
 ROOT_DIR = Path(__file__).parent
@@ -26,10 +30,22 @@ from models import (
     NextQuestionRequest, NextQuestionResponse, InterviewSubmit, CampaignCreate
 )
 from auth_utils import (
-    hash_password, verify_password, create_access_token, decode_access_token,
-    create_reset_token, verify_reset_token
+    create_access_token, decode_access_token,
+    create_reset_token, verify_reset_token,
+    PasswordHasher, PasswordHasherBusy
 )
-from ai_services import ResumeParser, AIInterviewer, FeedbackGenerator
+from ai_services import ResumeParser, FeedbackGenerator, HEDGE_QUESTIONS
+import llm_gateway
+import tts_service
+from question_prefetch import QuestionPrefetcher
+from interview_sessions import InterviewSessionStore, InterviewTranscript, SessionOutOfSync
+from resume_cache import ResumeCache
+from db_indexes import DBIndexes
+from auth_cache import AuthCache
+from user_stats import UserStats
+from pdf_extraction import PDFExtractionPool, PDFExtractionBusy
+from speech_services import EnhancedSpeechToText, SpeechSessions, AssemblyAITranscripts, ASSEMBLYAI_WEBHOOK_HEADER
+from speech_streaming import StreamingSpeechToText, STT_STREAM_MAX_BYTES, STT_STREAM_IDLE_TIMEOUT
 from email_service import EmailService
 
 
@@ -84,23 +100,34 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-# Dependency to get current user from token
+async def _load_user(user_id: str) -> Optional[dict]:
+    """Fetch the fields get_current_user exposes (auth cache miss)"""
+    try:
+        user = await db.users.find_one({"_id": ObjectId(user_id)}, {"email": 1, "name": 1, "role": 1})
+    except InvalidId:
+        return None
+    if not user:
+        return None
+    return {
+        'id': str(user['_id']),
+        'email': user['email'],
+        'name': user['name'],
+        'role': user.get('role', 'user')  # Default to user
+    }
+
+
+# Dependency to get current user from token (cached - see auth_cache.py)
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
-    payload = decode_access_token(token)
+    payload = AuthCache.verify_token(token)
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
-    user = await db.users.find_one({"_id": ObjectId(payload['user_id'])})
+    user = await AuthCache.get_user(payload, _load_user)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     
-    return {
-        'id': str(user['_id']),
-        'email': user['email'],
-        'name': user['name'],
-        'role': user.get('role', 'user')  # Default to user
-    }
+    return user
 
 
 # ========== AUTHENTICATION ENDPOINTS ==========
@@ -118,7 +145,7 @@ async def signup(user_data: UserCreate):
         user_doc = {
             "name": user_data.name,
             "email": user_data.email,
-            "password": hash_password(user_data.password),
+            "password": await PasswordHasher.hash(user_data.password),
             "role": "user",  # Everyone is just a user
             "createdAt": datetime.utcnow()
         }
@@ -127,7 +154,7 @@ async def signup(user_data: UserCreate):
         user_id = str(result.inserted_id)
         
         # Create token
-        token = create_access_token(user_id, user_data.email, user_data.role)
+        token = create_access_token(user_id, user_data.email, user_doc["role"], user_data.name)
         
         return {
             "token": token,
@@ -135,7 +162,7 @@ async def signup(user_data: UserCreate):
                 "id": user_id,
                 "name": user_data.name,
                 "email": user_data.email,
-                "role": user_data.role
+                "role": user_doc["role"]
             }
         }
     except HTTPException:
@@ -154,14 +181,24 @@ async def login(credentials: UserLogin):
         if not user:
             raise HTTPException(status_code=401, detail="Invalid credentials")
         
-        # Verify password
-        if not verify_password(credentials.password, user['password']):
+        # Verify password (thread pool, login concurrency limit)
+        try:
+            valid, new_hash = await PasswordHasher.verify_login(credentials.password, user['password'])
+        except PasswordHasherBusy:
+            raise HTTPException(status_code=503, detail="Too many login attempts right now - please retry")
+        if not valid:
             raise HTTPException(status_code=401, detail="Invalid credentials")
+        if new_hash:
+            # Stored with another bcrypt cost - upgrade it (skipped if the password changed meanwhile)
+            await db.users.update_one(
+                {"_id": user['_id'], "password": user['password']},
+                {"$set": {"password": new_hash}}
+            )
         
         # Create token
         user_id = str(user['_id'])
         user_role = user.get('role', 'user')  # Default to user
-        token = create_access_token(user_id, user['email'], user_role)
+        token = create_access_token(user_id, user['email'], user_role, user.get('name'))
         
         return {
             "token": token,
@@ -247,9 +284,10 @@ async def google_auth(auth_data: GoogleAuthModel):
                     {"_id": user['_id']},
                     {"$set": {"googleId": google_user['google_id'], "picture": google_user['picture']}}
                 )
+                AuthCache.invalidate_user(user_id=user_id)
         
         # Create token
-        token = create_access_token(user_id, google_user['email'], 'user')
+        token = create_access_token(user_id, google_user['email'], 'user', google_user['name'])
         
         return {
             "token": token,
@@ -301,11 +339,12 @@ async def reset_password(data: ResetPasswordModel):
             raise HTTPException(status_code=400, detail="Invalid or expired token")
         
         # Update password
-        hashed_password = hash_password(data.newPassword)
+        hashed_password = await PasswordHasher.hash(data.newPassword)
         await db.users.update_one(
             {"email": email},
             {"$set": {"password": hashed_password}}
         )
+        AuthCache.invalidate_user(email=email)
         
         return {"success": True, "message": "Password reset successful"}
     except HTTPException:
@@ -328,37 +367,76 @@ async def parse_resume(resume: UploadFile = File(...)):
         result = await ResumeParser.parse_pdf(content)
         
         return result
+    except PDFExtractionBusy:
+        raise HTTPException(status_code=503, detail="Resume parser is busy, please try again shortly")
     except Exception as e:
         logger.error(f"Resume parse error: {e}")
         raise HTTPException(status_code=500, detail="Failed to parse resume")
 
 
+def _candidate_info(request: NextQuestionRequest) -> dict:
+    """Extract candidate info from request (handle None case)"""
+    if not request.candidateInfo:
+        return {}
+    return {
+        'name': request.candidateInfo.get('name'),
+        'role': request.candidateInfo.get('role'),
+        'experience': request.candidateInfo.get('experience'),
+        'skills': request.candidateInfo.get('skills', []),
+        'projects': request.candidateInfo.get('projects', [])
+    }
+
+
+def _begin_session(request: NextQuestionRequest):
+    """Apply this turn's answer to the server-side interview session"""
+    try:
+        return InterviewSessionStore.begin_turn(
+            interview_id=request.interviewId,
+            previous_answer=request.previousAnswer or "",
+            conversation_history=request.conversationHistory,
+            resume_data=request.resumeData,
+            candidate_info=_candidate_info(request),
+            turn=request.turn
+        )
+    except SessionOutOfSync as e:
+        logger.warning(f"⚠️ {e}")
+        raise HTTPException(status_code=409, detail="Interview session not found - resend conversationHistory")
+
+
+def _question_audio(result: dict) -> Optional[str]:
+    """Start synthesizing the question's audio now; returns its handle"""
+    if result.get('isComplete'):
+        return None
+    return tts_service.TTSService.presynthesize(result.get('question', ''))
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 @api_router.post("/interview/next-question")
 async def get_next_question(request: NextQuestionRequest):
     """Get next interview question"""
     try:
         logger.info(f"📝 Generating next question for section: {request.section}")
         logger.info(f"   Previous answer length: {len(request.previousAnswer) if request.previousAnswer else 0}")
-        logger.info(f"   Conversation history length: {len(request.conversationHistory)}")
-        
-        # Extract candidate info from request (handle None case)
-        candidate_info = {}
-        if request.candidateInfo:
-            candidate_info = {
-                'name': request.candidateInfo.get('name'),
-                'role': request.candidateInfo.get('role'),
-                'experience': request.candidateInfo.get('experience'),
-                'skills': request.candidateInfo.get('skills', []),
-                'projects': request.candidateInfo.get('projects', [])
-            }
+        logger.info(f"   Conversation history length: {len(request.conversationHistory or [])}")
+        
+        session = _begin_session(request)
         
-        result = await AIInterviewer.generate_question(
+        # Served instantly when a pre-generated question matches this turn
+        result = await QuestionPrefetcher.generate_question(
+            interview_id=request.interviewId,
             section=request.section,
             previous_answer=request.previousAnswer or "",
-            resume_data=request.resumeData or {},
-            conversation_history=request.conversationHistory or [],
-            candidate_info=candidate_info
+            resume_data=session.resume_data,
+            conversation_history=session.state,
+            candidate_info=session.candidate_info
         )
+        audio_handle = _question_audio(result)
+        InterviewSessionStore.record_question(session, result)
+        await InterviewTranscript.append_turn(session)
         
         logger.info(f"✅ Question generated successfully for section: {result.get('section')}")
         
@@ -366,7 +444,9 @@ async def get_next_question(request: NextQuestionRequest):
         response = {
             'question': result.get('question', ''),
             'section': result.get('section', request.section),
-            'isComplete': result.get('isComplete', False)
+            'isComplete': result.get('isComplete', False),
+            'turn': session.turn,
+            'audioHandle': audio_handle
         }
         
         return response
@@ -379,6 +459,57 @@ async def get_next_question(request: NextQuestionRequest):
         raise HTTPException(status_code=500, detail=f"Failed to generate question: {str(e)}")
 
 
+@api_router.post("/interview/next-question/stream")
+async def stream_next_question(request: NextQuestionRequest):
+    """
+    Stream the next interview question as server-sent events
+    
+    Events:
+        token: {"text": "..."} - question text as the provider produces it
+        done: {"question", "section", "isComplete", "turn", "audioHandle"} - final metadata;
+            "question" is authoritative and replaces the streamed text (e.g. after a fallback)
+        error: {"detail": "..."} - generation failed
+    """
+    logger.info(f"📝 Streaming next question for section: {request.section}")
+    # Resolved before streaming starts so an out-of-sync client gets a plain 409
+    session = _begin_session(request)
+    
+    async def event_stream():
+        try:
+            async for event, payload in QuestionPrefetcher.stream_question(
+                interview_id=request.interviewId,
+                section=request.section,
+                previous_answer=request.previousAnswer or "",
+                resume_data=session.resume_data,
+                conversation_history=session.state,
+                candidate_info=session.candidate_info
+            ):
+                if event == 'token':
+                    yield _sse('token', {'text': payload})
+                else:
+                    audio_handle = _question_audio(payload)
+                    InterviewSessionStore.record_question(session, payload)
+                    logger.info(f"✅ Question streamed successfully for section: {payload.get('section')}")
+                    yield _sse('done', {
+                        'question': payload.get('question', ''),
+                        'section': payload.get('section', request.section),
+                        'isComplete': payload.get('isComplete', False),
+                        'turn': session.turn,
+                        'audioHandle': audio_handle
+                    })
+                    # Persisted after the client already has the question
+                    await InterviewTranscript.append_turn(session)
+        except Exception as e:
+            logger.error(f"❌ Next question stream error: {e}")
+            yield _sse('error', {'detail': f"Failed to generate question: {str(e)}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @api_router.post("/interview/create")
 async def create_interview(interview_data: dict, current_user: dict = Depends(get_current_user)):
     """Create new AI interview session"""
@@ -408,7 +539,8 @@ async def create_interview(interview_data: dict, current_user: dict = Depends(ge
             "status": "active",
             "createdAt": datetime.utcnow(),
             "conversation": [],
-            "answers": []
+            "answers": [],
+            "turnSeq": 0
         }
         
         result = await db.interviews.insert_one(interview_doc)
@@ -489,111 +621,220 @@ async def get_interview_data(interview_id: str, authorization: Optional[str] = H
         raise HTTPException(status_code=500, detail="Failed to get interview data")
 
 
+async def _tts_stream_response(text: str) -> Response:
+    """Chunked audio response; the first chunk is pulled first so provider errors still return 500"""
+    chunks = tts_service.TTSService.stream(text)
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        # Nothing to synthesize (callers reject blank text, so this is a safety net)
+        return Response(status_code=204)
+    
+    async def body():
+        yield first
+        try:
+            async for chunk in chunks:
+                yield chunk
+        except tts_service.TTSError as e:
+            # Headers are already sent - the client gets the sentences synthesized so far
+            logger.error(f"Text-to-speech stream error: {e}")
+        finally:
+            await chunks.aclose()
+    
+    return StreamingResponse(body(), media_type="audio/mpeg", headers={"Cache-Control": "no-cache"})
+
+
 @api_router.post("/interview/text-to-speech")
 async def text_to_speech(request: dict):
-    """Convert text to speech using ElevenLabs"""
+    """
+    Convert text to speech using ElevenLabs (cached by voice, model, settings and text)
+    
+    With "stream": true the audio is sent sentence by sentence as it is synthesized.
+    """
     try:
         text = request.get('text', '')
-        if not text:
+        if not isinstance(text, str) or not text.strip():
             raise HTTPException(status_code=400, detail="Text is required")
+        text = text.strip()
         
-        # Use ElevenLabs API for text-to-speech
-        elevenlabs_api_key = os.environ.get('ELEVENLABS_API_KEY')
-        if not elevenlabs_api_key:
+        if not tts_service.TTSService.configured():
             # Fallback to a simple response
             return {"message": "ElevenLabs API key not configured"}
         
-        import requests
-        
-        # ElevenLabs API call
-        voice_id = "21m00Tcm4TlvDq8ikWAM"  # Default voice
-        url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
-        
-        headers = {
-            "Accept": "audio/mpeg",
-            "Content-Type": "application/json",
-            "xi-api-key": elevenlabs_api_key
-        }
-        
-        data = {
-            "text": text,
-            "model_id": "eleven_monolingual_v1",
-            "voice_settings": {
-                "stability": 0.5,
-                "similarity_boost": 0.5
-            }
-        }
+        if request.get('stream'):
+            return await _tts_stream_response(text)
         
-        response = requests.post(url, json=data, headers=headers)
-        
-        if response.status_code == 200:
-            from fastapi.responses import Response
-            return Response(content=response.content, media_type="audio/mpeg")
-        else:
-            logger.error(f"ElevenLabs API error: {response.status_code}")
-            raise HTTPException(status_code=500, detail="Text-to-speech failed")
+        audio = await tts_service.TTSService.synthesize(text)
+        return Response(content=audio, media_type="audio/mpeg")
             
+    except HTTPException:
+        raise
+    except tts_service.TTSError as e:
+        logger.error(f"Text-to-speech error: {e}")
+        raise HTTPException(status_code=500, detail="Text-to-speech failed")
     except Exception as e:
         logger.error(f"Text-to-speech error: {e}")
         raise HTTPException(status_code=500, detail="Failed to convert text to speech")
 
 
+@api_router.get("/interview/text-to-speech/stream")
+async def stream_text_to_speech(text: str = Query(..., min_length=1, max_length=5000)):
+    """Streaming text-to-speech as a GET, so an <audio> element can play it while it downloads"""
+    text = text.strip()
+    if not text:
+        raise HTTPException(status_code=400, detail="Text is required")
+    if not tts_service.TTSService.configured():
+        raise HTTPException(status_code=503, detail="ElevenLabs API key not configured")
+    try:
+        return await _tts_stream_response(text)
+    except tts_service.TTSError as e:
+        logger.error(f"Text-to-speech error: {e}")
+        raise HTTPException(status_code=500, detail="Text-to-speech failed")
+
+
+@api_router.get("/interview/audio/{handle}")
+async def get_question_audio(handle: str):
+    """Pre-synthesized question audio (waits if synthesis is still running)"""
+    try:
+        audio = await tts_service.TTSService.audio_for_handle(handle)
+    except tts_service.TTSError as e:
+        logger.error(f"Question audio error: {e}")
+        raise HTTPException(status_code=500, detail="Text-to-speech failed")
+    if audio is None:
+        # Unknown to this worker and not in the shared cache - client falls back to POST text-to-speech
+        raise HTTPException(status_code=404, detail="Audio not found")
+    return Response(content=audio, media_type="audio/mpeg", headers={"Cache-Control": "private, max-age=86400"})
+
+
 @api_router.post("/interview/speech-to-text")
 async def speech_to_text(audio: UploadFile = File(...)):
     """Enhanced speech-to-text with multiple providers for better accuracy"""
     try:
-        from speech_services import EnhancedSpeechToText
-        
-        # Read audio file
-        audio_content = await audio.read()
+        if not EnhancedSpeechToText.accept_upload(audio.size):
+            raise HTTPException(status_code=413, detail="Audio file too large")
         
-        # Use enhanced multi-provider transcription
-        result = await EnhancedSpeechToText.transcribe_audio(audio_content, provider='auto')
-        
-        if result['success']:
-            return {
-                "text": result['text'],
-                "confidence": result.get('confidence', 0.9),
-                "provider": result.get('provider', 'unknown'),
-                "words": result.get('words', [])
-            }
-        else:
+        # Forwarded straight from the upload's spooled file - no read() into memory, no temp files
+        async with EnhancedSpeechToText.upload_slot():
+            # Use enhanced multi-provider transcription
+            result = await EnhancedSpeechToText.transcribe_audio(audio.file, provider='auto')
+            
+            if result['success']:
+                return {
+                    "text": result['text'],
+                    "confidence": result.get('confidence', 0.9),
+                    "provider": result.get('provider', 'unknown'),
+                    "words": result.get('words', [])
+                }
+            
             # Fallback to basic Groq Whisper if all providers fail
-            if GROQ_API_KEY:
-                import tempfile
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as temp_file:
-                    temp_file.write(audio_content)
-                    temp_file_path = temp_file.name
-                
-                try:
-                    with open(temp_file_path, "rb") as audio_file:
-                        transcription = groq_client.audio.transcriptions.create(
-                            file=audio_file,
-                            model="whisper-large-v3",
-                            response_format="text"
-                        )
-                    
-                    import os
-                    os.unlink(temp_file_path)
-                    
-                    return {
-                        "text": transcription,
-                        "confidence": 0.85,
-                        "provider": "groq-fallback"
-                    }
-                except Exception as e:
-                    import os
-                    if os.path.exists(temp_file_path):
-                        os.unlink(temp_file_path)
-                    raise e
-            else:
+            groq_client = llm_gateway.get_groq_client()
+            if not groq_client:
                 raise HTTPException(status_code=500, detail="All speech-to-text providers failed")
             
+            audio.file.seek(0)
+            transcription = await groq_client.audio.transcriptions.create(
+                file=("audio.webm", audio.file),
+                model="whisper-large-v3",
+                response_format="text"
+            )
+            
+            return {
+                "text": transcription,
+                "confidence": 0.85,
+                "provider": "groq-fallback"
+            }
+            
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Speech-to-text error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to convert speech to text: {str(e)}")
 
 
+@api_router.post("/interview/speech-to-text/assemblyai-webhook")
+async def assemblyai_webhook(request: Request):
+    """
+    AssemblyAI transcript callback (when ASSEMBLYAI_WEBHOOK_URL points here)
+    
+    Wakes the request waiting on that transcript; the transcript itself is
+    still fetched with our API key, so the callback body is never trusted.
+    """
+    try:
+        payload = await request.json()
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid webhook payload")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Invalid webhook payload")
+    if not AssemblyAITranscripts.receive(payload, request.headers.get(ASSEMBLYAI_WEBHOOK_HEADER)):
+        raise HTTPException(status_code=401, detail="Invalid webhook secret")
+    return {"received": True}
+
+
+@api_router.websocket("/interview/speech-to-text/stream")
+async def speech_to_text_stream(websocket: WebSocket):
+    """
+    Live speech-to-text while the candidate speaks
+    
+    Client -> server: binary audio frames (MediaRecorder chunks), then {"type": "stop"}
+    Server -> client:
+        partial: {"type": "partial", "text": "..."} - transcript so far, revised as audio arrives
+        final: {"type": "final", "text", "confidence", "provider", "success"} - then the socket closes
+        error: {"type": "error", "detail": "..."} - client should fall back to POST speech-to-text
+    
+    A client that sends nothing for STT_STREAM_IDLE_TIMEOUT seconds gets an
+    error and is disconnected, releasing its provider socket and buffers.
+    """
+    await websocket.accept()
+    
+    async def send_partial(text: str):
+        await websocket.send_json({"type": "partial", "text": text})
+    
+    transcriber = StreamingSpeechToText.create(send_partial)
+    if transcriber is None:
+        await websocket.send_json({"type": "error", "detail": "No streaming speech-to-text provider configured"})
+        await websocket.close()
+        return
+    
+    try:
+        await transcriber.start()
+        while True:
+            try:
+                message = await asyncio.wait_for(websocket.receive(), STT_STREAM_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                await websocket.send_json({"type": "error", "detail": "No audio received - connection closed"})
+                await websocket.close(code=1001)
+                return
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes"):
+                if transcriber.received + len(message["bytes"]) > STT_STREAM_MAX_BYTES:
+                    await websocket.send_json({"type": "error", "detail": "Audio too long"})
+                    await websocket.close(code=1009)
+                    return
+                await transcriber.feed(message["bytes"])
+            elif message.get("text") and json.loads(message["text"]).get("type") == "stop":
+                break
+        
+        result = await StreamingSpeechToText.finish(transcriber)
+        if result["success"]:
+            await websocket.send_json({"type": "final", **result})
+        else:
+            logger.error(f"Streaming speech-to-text error: {result.get('error')}")
+            await websocket.send_json({"type": "error", "detail": "Transcription failed"})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Streaming speech-to-text error: {e}")
+        try:
+            await websocket.send_json({"type": "error", "detail": "Transcription failed"})
+            await websocket.close(code=1011)
+        except Exception:
+            pass
+    finally:
+        await transcriber.close()
+
+
 @api_router.post("/interview/analyze-answer")
 async def analyze_answer(request: dict):
     """Analyze candidate's answer for loopholes and follow-up opportunities"""
@@ -625,8 +866,12 @@ async def submit_interview(data: InterviewSubmit):
     """Submit completed interview and generate comprehensive feedback"""
     try:
         logger.info(f"📝 Submitting interview: {data.interviewId}")
-        logger.info(f"   Conversation length: {len(data.conversationHistory)}")
-        logger.info(f"   Answers count: {len(data.answers)}")
+        
+        # Flush any turn the per-turn writes have not stored yet
+        session = InterviewSessionStore.get(data.interviewId)
+        if session is not None:
+            await InterviewTranscript.append_turn(session)
+        InterviewSessionStore.discard(data.interviewId)
         
         # Get interview data for candidate info
         interview = await db.interviews.find_one({"interviewId": data.interviewId})
@@ -645,6 +890,17 @@ async def submit_interview(data: InterviewSubmit):
             logger.error(f"❌ Interview not found for submission: {data.interviewId}")
             raise HTTPException(status_code=404, detail="Interview not found")
         
+        # The transcript is already stored turn by turn; a client-sent one takes precedence
+        if data.conversationHistory:
+            conversation = data.conversationHistory
+        elif interview.get('conversation'):
+            conversation = interview['conversation']
+        elif session is not None:
+            conversation = session.state.history
+        else:
+            raise HTTPException(status_code=409, detail="No stored transcript - resend conversationHistory")
+        logger.info(f"   Conversation length: {len(conversation)}")
+        
         candidate_info = {
             'name': interview.get('candidateName', 'Candidate'),
             'role': interview.get('targetRole', 'Position'),
@@ -655,60 +911,47 @@ async def submit_interview(data: InterviewSubmit):
         
         # Generate comprehensive feedback
         feedback_data = await FeedbackGenerator.generate_feedback(
-            conversation_history=data.conversationHistory,
+            conversation_history=conversation,
             resume_data=interview.get('extractedData', {}) if interview else {},
             candidate_info=candidate_info
         )
         
         logger.info(f"✅ Feedback generated - Overall score: {feedback_data.get('scores', {}).get('overall', 0)}")
         
-        # Update interview in database with feedback
-        # Try to update by interviewId first, then by _id
-        update_result = await db.interviews.update_one(
-            {"interviewId": data.interviewId},
-            {
-                "$set": {
-                    "conversation": data.conversationHistory,
-                    "answers": data.answers,
-                    "scores": feedback_data.get('scores', {}),
-                    "feedback": feedback_data,
-                    "status": "completed",
-                    "completedAt": datetime.utcnow(),
-                    "duration": data.duration,
-                    "recommendation": feedback_data.get('recommendation', 'MAYBE')
-                }
-            }
-        )
+        completion = {
+            "scores": feedback_data.get('scores', {}),
+            "feedback": feedback_data,
+            "status": "completed",
+            "completedAt": datetime.utcnow(),
+            "duration": data.duration,
+            "recommendation": feedback_data.get('recommendation', 'MAYBE')
+        }
+        if data.conversationHistory or not interview.get('conversation'):
+            completion["conversation"] = conversation
+            completion["answers"] = data.answers if data.answers is not None else [
+                c.get('text', '') for c in conversation if c.get('type') == 'answer'
+            ]
         
-        # If not updated by interviewId, try by _id
-        if update_result.modified_count == 0:
-            try:
-                from bson import ObjectId
-                update_result = await db.interviews.update_one(
-                    {"_id": ObjectId(data.interviewId)},
-                    {
-                        "$set": {
-                            "conversation": data.conversationHistory,
-                            "answers": data.answers,
-                            "scores": feedback_data.get('scores', {}),
-                            "feedback": feedback_data,
-                            "status": "completed",
-                            "completedAt": datetime.utcnow(),
-                            "duration": data.duration,
-                            "recommendation": feedback_data.get('recommendation', 'MAYBE')
-                        }
-                    }
-                )
-                if update_result.modified_count > 0:
-                    logger.info(f"✅ Updated interview by _id")
-            except:
-                pass
+        # Update by the document's _id - found above by interviewId or _id
+        update_result = await db.interviews.update_one({"_id": interview["_id"]}, {"$set": completion})
         
         if update_result.modified_count > 0:
             logger.info(f"✅ Interview {data.interviewId} completed with feedback saved to database")
         else:
             logger.warning(f"⚠️ Interview {data.interviewId} - No documents modified")
         
+        # Keep the owner's dashboard rollup current
+        owner = interview.get('createdBy')
+        if owner:
+            try:
+                if interview.get('status') == 'completed':
+                    # Re-submission replaces earlier feedback; recount from scratch
+                    await UserStats.invalidate(db, owner)
+                else:
+                    await UserStats.record_interview(db, owner, {**interview, **completion})
+            except Exception as e:
+                logger.warning(f"⚠️ Performance rollup update failed for {owner}: {e}")
+        
         return {
             "interviewId": data.interviewId,
             "feedback": feedback_data,
@@ -723,128 +966,14 @@ async def submit_interview(data: InterviewSubmit):
 
 
 @api_router.get("/interviews/performance-stats")
-async def get_performance_stats(current_user: dict = Depends(get_current_user)):
+async def get_performance_stats(rebuild: bool = False, current_user: dict = Depends(get_current_user)):
     """Get aggregated performance statistics from current user's completed interviews"""
     try:
         # All authenticated users can see their own performance stats
         # (role check removed - any user can access their own data)
         
-        # Get all completed interviews
-        interviews = await db.interviews.find({
-            "createdBy": current_user['id'],
-            "status": "completed"
-        }).to_list(length=1000)
-        
-        if not interviews:
-            return {
-                "totalInterviews": 0,
-                "averageScores": {},
-                "recommendations": {},
-                "trends": [],
-                "topStrengths": [],
-                "commonImprovements": [],
-                "recentInterviews": []
-            }
-        
-        # Calculate aggregate statistics
-        total_interviews = len(interviews)
-        
-        # Average scores
-        score_totals = {
-            'overall': 0,
-            'communication': 0,
-            'technical': 0,
-            'problemSolving': 0,
-            'behavioral': 0,
-            'cultural': 0
-        }
-        
-        # Recommendation counts
-        recommendations = {
-            'STRONG_HIRE': 0,
-            'HIRE': 0,
-            'MAYBE': 0,
-            'NO_HIRE': 0
-        }
-        
-        # Collect all strengths and improvements
-        all_strengths = []
-        all_improvements = []
-        
-        # Process each interview
-        for interview in interviews:
-            feedback = interview.get('feedback', {})
-            scores = feedback.get('scores', {})
-            
-            # Aggregate scores
-            for key in score_totals.keys():
-                score_totals[key] += scores.get(key, 0)
-            
-            # Count recommendations
-            rec = feedback.get('recommendation', 'MAYBE')
-            if rec in recommendations:
-                recommendations[rec] += 1
-            
-            # Collect strengths and improvements
-            all_strengths.extend(feedback.get('strengths', []))
-            all_improvements.extend(feedback.get('improvements', []))
-        
-        # Calculate averages
-        average_scores = {
-            key: round(total / total_interviews, 1) if total_interviews > 0 else 0
-            for key, total in score_totals.items()
-        }
-        
-        # Get top strengths and improvements (simplified - count frequency)
-        from collections import Counter
-        strength_keywords = []
-        for s in all_strengths:
-            strength_keywords.extend(s.lower().split()[:3])  # First 3 words
-        top_strengths = [word for word, count in Counter(strength_keywords).most_common(10) if len(word) > 4]
-        
-        improvement_keywords = []
-        for i in all_improvements:
-            improvement_keywords.extend(i.lower().split()[:3])
-        common_improvements = [word for word, count in Counter(improvement_keywords).most_common(10) if len(word) > 4]
-        
-        # Recent interviews (last 10)
-        recent_interviews = sorted(interviews, key=lambda x: x.get('completedAt', datetime.min), reverse=True)[:10]
-        recent_list = [
-            {
-                'interviewId': i.get('interviewId'),
-                'candidateName': i.get('candidateName'),
-                'targetRole': i.get('targetRole'),
-                'overallScore': i.get('feedback', {}).get('scores', {}).get('overall', 0),
-                'recommendation': i.get('feedback', {}).get('recommendation', 'MAYBE'),
-                'completedAt': i.get('completedAt').isoformat() if i.get('completedAt') else None
-            }
-            for i in recent_interviews
-        ]
-        
-        # Calculate trends (last 30 days)
-        from datetime import timedelta
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_completed = [i for i in interviews if i.get('completedAt') and i.get('completedAt') > thirty_days_ago]
-        
-        trends = {
-            'last30Days': len(recent_completed),
-            'averageScoreTrend': round(sum(i.get('feedback', {}).get('scores', {}).get('overall', 0) for i in recent_completed) / len(recent_completed), 1) if recent_completed else 0
-        }
-        
-        return {
-            "totalInterviews": total_interviews,
-            "averageScores": average_scores,
-            "recommendations": recommendations,
-            "trends": trends,
-            "topStrengths": top_strengths[:5],
-            "commonImprovements": common_improvements[:5],
-            "recentInterviews": recent_list,
-            "summary": {
-                "strongHireRate": round((recommendations.get('STRONG_HIRE', 0) / total_interviews * 100), 1) if total_interviews > 0 else 0,
-                "hireRate": round(((recommendations.get('STRONG_HIRE', 0) + recommendations.get('HIRE', 0)) / total_interviews * 100), 1) if total_interviews > 0 else 0,
-                "averageOverallScore": average_scores.get('overall', 0)
-            }
-        }
+        # Materialized rollup (kept current by submit_interview); ?rebuild=true recomputes it
+        return await UserStats.get(db, current_user['id'], rebuild=rebuild)
     except Exception as e:
         logger.error(f"Performance stats error: {e}")
         raise HTTPException(status_code=500, detail="Failed to get performance stats")
@@ -1006,6 +1135,7 @@ async def create_demo_data(current_user: dict = Depends(get_current_user)):
         
         # Insert demo interviews
         result = await db.interviews.insert_many(demo_interviews)
+        await UserStats.invalidate(db, current_user['id'])
         
         logger.info(f"Created {len(result.inserted_ids)} demo interviews for user {current_user['id']}")
         
@@ -1032,6 +1162,7 @@ async def clear_demo_data(current_user: dict = Depends(get_current_user)):
         # All authenticated users can clear their own data
         # Only delete interviews created by current user
         interviews_result = await db.interviews.delete_many({"createdBy": current_user['id']})
+        await UserStats.invalidate(db, current_user['id'])
         
         # Delete campaigns created by current user if they exist
         campaigns_result = await db.campaigns.delete_many({"createdBy": current_user['id']})
@@ -1051,15 +1182,97 @@ async def clear_demo_data(current_user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail="Failed to clear demo data")
 
 
+INTERVIEW_PAGE_SIZE = 50
+INTERVIEW_PAGE_MAX = 200
+
+# Only what the listing shows - transcripts and feedback stay in the database
+INTERVIEW_LIST_PROJECTION = {
+    "candidateName": 1, "candidateEmail": 1, "position": 1,
+    "status": 1, "createdAt": 1, "scores": 1
+}
+
+
+def _encode_cursor(interview: dict) -> str:
+    """Opaque keyset cursor: the (createdAt, _id) of the last row on a page"""
+    created_at = interview.get('createdAt')
+    raw = json.dumps({"t": created_at.isoformat() if created_at else None, "id": str(interview['_id'])})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        created_at = datetime.fromisoformat(raw["t"]) if raw["t"] else None
+        return created_at, ObjectId(raw["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _parse_date(value: Optional[str], name: str) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name} - use an ISO 8601 date")
+
+
 @api_router.get("/interviews")
-async def get_interviews(current_user: dict = Depends(get_current_user)):
-    """Get all interviews for current user only"""
+async def get_interviews(
+    response: Response,
+    limit: int = Query(INTERVIEW_PAGE_SIZE, ge=1, le=INTERVIEW_PAGE_MAX),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    date_from: Optional[str] = Query(None, alias="dateFrom"),
+    date_to: Optional[str] = Query(None, alias="dateTo"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get the current user's interviews, newest first, one page at a time
+    
+    Keyset pagination on (createdAt, _id): pass the X-Next-Cursor response
+    header back as ?cursor= to get the next page. The header is absent on the
+    last page. The first page (no cursor) also carries X-Total-Count, the
+    number of matching interviews across all pages. Optional filters: status,
+    dateFrom/dateTo (createdAt, ISO 8601).
+    """
     try:
         # All authenticated users can see their own interviews
         # (role check removed - any user can access their own data)
         
         # SECURITY FIX: Only get interviews created by current user
-        interviews = await db.interviews.find({"createdBy": current_user['id']}).to_list(1000)
+        query = {"createdBy": current_user['id']}
+        if status:
+            query["status"] = status
+        created_range = {}
+        if date_from:
+            created_range["$gte"] = _parse_date(date_from, "dateFrom")
+        if date_to:
+            created_range["$lte"] = _parse_date(date_to, "dateTo")
+        if created_range:
+            query["createdAt"] = created_range
+        if not cursor:
+            # Served by the (createdBy, createdAt) index
+            response.headers["X-Total-Count"] = str(await db.interviews.count_documents(query))
+        else:
+            after_created, after_id = _decode_cursor(cursor)
+            # Documents without createdAt sort last, after every dated one
+            query["$or"] = [
+                {"createdAt": {"$lt": after_created}},
+                {"createdAt": after_created, "_id": {"$lt": after_id}},
+                {"createdAt": None}
+            ] if after_created else [
+                {"createdAt": None, "_id": {"$lt": after_id}}
+            ]
+        
+        # One extra row tells us whether another page exists
+        interviews = await db.interviews.find(query, INTERVIEW_LIST_PROJECTION) \
+            .sort([("createdAt", -1), ("_id", -1)]) \
+            .limit(limit + 1) \
+            .to_list(limit + 1)
+        if len(interviews) > limit:
+            interviews = interviews[:limit]
+            response.headers["X-Next-Cursor"] = _encode_cursor(interviews[-1])
         
         result = []
         for interview in interviews:
@@ -1069,7 +1282,7 @@ async def get_interviews(current_user: dict = Depends(get_current_user)):
                 "candidateEmail": interview.get('candidateEmail', ''),
                 "position": interview.get('position', 'Position'),
                 "status": interview.get('status', 'completed'),
-                "date": interview.get('createdAt', datetime.utcnow()).strftime('%Y-%m-%d'),
+                "date": (interview.get('createdAt') or datetime.utcnow()).strftime('%Y-%m-%d'),
                 "score": interview.get('scores', {}).get('overall', 0),
                 "feedback": interview.get('scores', {})
             })
@@ -1189,6 +1402,31 @@ async def health_check():
     return health_status
 
 
+@api_router.get("/llm/stats")
+async def llm_stats(current_user: dict = Depends(get_current_user)):
+    """
+    Per-provider LLM latency, hedging counters, breaker health and cache/prefetch hit rates
+    
+    Internal operational data, so it requires a signed-in user.
+    """
+    return {
+        "hedgeQuestions": HEDGE_QUESTIONS,
+        "providers": llm_gateway.get_stats(),
+        "health": llm_gateway.get_health(),
+        "questionPrefetch": QuestionPrefetcher.get_metrics(),
+        "resumeCache": ResumeCache.get_metrics(),
+        "pdfExtraction": PDFExtractionPool.get_metrics(),
+        "interviewSessions": InterviewSessionStore.get_metrics(),
+        "interviewTranscript": InterviewTranscript.get_metrics(),
+        "databaseIndexes": DBIndexes.get_report(),
+        "authCache": AuthCache.get_metrics(),
+        "passwordHashing": PasswordHasher.get_metrics(),
+        "textToSpeech": tts_service.TTSService.get_metrics(),
+        "speechToText": EnhancedSpeechToText.get_metrics(),
+        "streamingSpeechToText": StreamingSpeechToText.get_metrics()
+    }
+
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -1198,11 +1436,15 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
 @app.on_event("startup")
 async def startup_db_client():
     """Test database connection on startup"""
+    # Warm, pooled connections for the speech providers (independent of MongoDB)
+    await SpeechSessions.start()
+    
     if client is None:
         print("⚠️ WARNING: MongoDB client not initialized. Database operations will fail.")
         print("💡 Run: python backend/use_local_mongodb.py to switch to local MongoDB")
@@ -1227,6 +1469,16 @@ async def startup_db_client():
         except:
             pass  # Skip if listing fails
         
+        # Indexes for the hot queries (idempotent)
+        try:
+            await DBIndexes.ensure(db)
+        except Exception as e:
+            print(f"⚠️ Index bootstrap failed: {e}")
+        
+        # Persistent tier of the resume parse cache
+        await ResumeCache.init(db)
+        InterviewTranscript.init(db)
+        
     except asyncio.TimeoutError:
         print("⚠️ MongoDB connection timeout (DNS/Network issue)")
         print("💡 Server will start but database operations may fail")
@@ -1244,6 +1496,11 @@ async def startup_db_client():
 @app.on_event("shutdown")
 async def shutdown_db_client():
     """Close database connection on shutdown"""
+    await llm_gateway.aclose()
+    await tts_service.aclose()
+    await SpeechSessions.close()
+    PDFExtractionPool.shutdown()
+    PasswordHasher.shutdown()
     if client:
         client.close()
         print("🔌 MongoDB connection closed")
\ No newline at end of file
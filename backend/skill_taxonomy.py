@@ -0,0 +1,155 @@
+"""
+Skill Taxonomy Matcher
+Data-driven skill extraction and canonicalization backed by skill_taxonomy.json.
+
+All aliases are compiled into prefix-factored (trie-shaped) regular
+expressions, so a resume is scanned in a single linear pass inside the regex
+engine no matter how many skills the taxonomy holds. The same alias table
+canonicalizes skill lists returned by the LLM ("node", "NodeJS" -> "Node.js")
+and removes casing duplicates.
+"""
+
+import re
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+TAXONOMY_PATH = Path(__file__).parent / 'skill_taxonomy.json'
+
+# Skills are whole tokens: not inside a word, not "js" in "Node.js", not "C" in "C++"/"C#"
+_BEFORE = r'(?<![\w.])'
+_AFTER = r'(?![\w#]|\+\+|\.\w)'
+
+
+def _normalize(name: str) -> str:
+    return ' '.join(name.lower().split())
+
+
+def _variants(alias: str) -> List[str]:
+    """Common spelling variants: react.js/reactjs/react js, scikit-learn/scikit learn"""
+    variants = [alias]
+    if alias.endswith('.js') and len(alias) > 3:
+        stem = alias[:-3]
+        variants += [stem + 'js', stem + ' js']
+    if '-' in alias:
+        variants += [alias.replace('-', ' '), alias.replace('-', '')]
+    if ' ' in alias and alias.count(' ') <= 2:
+        variants.append(alias.replace(' ', '-'))
+    return variants
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """Prefix-factored alternation, e.g. {java, javascript} -> java(?:script)?"""
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        ends_here = '' in node
+        branches = []
+        for char in sorted(k for k in node if k):
+            # Any run of whitespace matches a single space in an alias
+            token = r'\s+' if char == ' ' else re.escape(char)
+            branches.append(token + build(node[char]))
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if ends_here:
+            return f'(?:{body})?'
+        return body
+
+    return build(trie)
+
+
+class SkillMatcher:
+    """Compiled skill taxonomy (load once, reuse for every resume)"""
+
+    def __init__(self, taxonomy: Dict[str, Any]):
+        self.canonical: Dict[str, str] = {}   # normalized alias -> canonical name
+        self.categories: Dict[str, str] = {}  # canonical name -> category
+        self.exact: Dict[str, str] = {}       # case-sensitive spelling -> canonical name
+
+        case_sensitive = {_normalize(name): name for name in taxonomy.get('caseSensitive', [])}
+        insensitive = set()
+
+        for category, entries in taxonomy['categories'].items():
+            for canonical, aliases in entries.items():
+                self.categories[canonical] = category
+                for alias in [canonical] + aliases:
+                    key = _normalize(alias)
+                    if key in case_sensitive:
+                        self.exact.setdefault(case_sensitive[key], canonical)
+                        self.canonical.setdefault(key, canonical)
+                        continue
+                    for variant in _variants(key):
+                        if variant in case_sensitive:
+                            continue
+                        self.canonical.setdefault(variant, canonical)
+                        insensitive.add(variant)
+
+        # Matched against lowercased text - much faster than re.IGNORECASE
+        self._insensitive = re.compile(_BEFORE + '(?:' + _trie_regex(insensitive) + ')' + _AFTER)
+        self._sensitive = re.compile(_BEFORE + '(?:' + _trie_regex(self.exact) + ')' + _AFTER)
+
+    def extract(self, text: str) -> List[str]:
+        """Canonical skills mentioned in text, in order of first appearance"""
+        if not text:
+            return []
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few non-ASCII characters change length when lowercased; keep offsets aligned
+            lowered = ''.join(c.lower() if len(c.lower()) == 1 else c for c in text)
+        matches = [(m.start(), m.end(), self.canonical[' '.join(m.group().split())]) for m in self._insensitive.finditer(lowered)]
+        matches += [(m.start(), m.end(), self.exact[m.group()]) for m in self._sensitive.finditer(text)]
+        # Keep the longest match where the two passes overlap ("Objective-C" over "C")
+        matches.sort(key=lambda m: (m[0], -m[1]))
+
+        skills, seen, covered_until = [], set(), -1
+        for start, end, canonical in matches:
+            if end <= covered_until:
+                continue
+            covered_until = max(covered_until, end)
+            if canonical not in seen:
+                seen.add(canonical)
+                skills.append(canonical)
+        return skills
+
+    def canonicalize(self, skills: Iterable[str]) -> List[str]:
+        """Map aliases to canonical names and drop duplicates, keeping order; unknown skills pass through"""
+        result, seen = [], set()
+        for skill in skills:
+            if not isinstance(skill, str) or not skill.strip():
+                continue
+            name = self.canonical.get(_normalize(skill), ' '.join(skill.split()))
+            key = name.lower()
+            if key not in seen:
+                seen.add(key)
+                result.append(name)
+        return result
+
+    def category(self, skill: str) -> Optional[str]:
+        canonical = self.canonical.get(_normalize(skill))
+        return self.categories.get(canonical) if canonical else None
+
+
+_matcher: Optional[SkillMatcher] = None
+
+
+def get_matcher() -> SkillMatcher:
+    """Shared matcher, compiled on first use"""
+    global _matcher
+    if _matcher is None:
+        with open(TAXONOMY_PATH, encoding='utf-8') as f:
+            _matcher = SkillMatcher(json.load(f))
+    return _matcher
+
+
+def extract_skills(text: str) -> List[str]:
+    return get_matcher().extract(text)
+
+
+def canonicalize_skills(skills: Iterable[str]) -> List[str]:
+    return get_matcher().canonicalize(skills)
@@ -4,30 +4,588 @@ Supports: AssemblyAI, Deepgram, OpenAI Whisper, and fallback to browser API
 """
 
 import os
+import hmac
 import asyncio
 import aiohttp
 import json
-from typing import Optional, Dict, Any
+import time
+from collections import OrderedDict, deque
+from typing import Optional, Dict, Any, BinaryIO, List, Union
 import base64
 
+import llm_gateway
+from provider_health import HealthTracker
+
 # API Keys
 ASSEMBLYAI_API_KEY = os.environ.get('ASSEMBLYAI_API_KEY')
 DEEPGRAM_API_KEY = os.environ.get('DEEPGRAM_API_KEY')
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
 GROQ_API_KEY = os.environ.get('GROQ_API_KEY')
 
+# Provider endpoints (overridable to point at a local stand-in)
+DEEPGRAM_BASE_URL = os.environ.get('DEEPGRAM_BASE_URL', 'https://api.deepgram.com').rstrip('/')
+ASSEMBLYAI_BASE_URL = os.environ.get('ASSEMBLYAI_BASE_URL', 'https://api.assemblyai.com').rstrip('/')
+WHISPER_BASE_URL = os.environ.get('WHISPER_BASE_URL', 'https://api.openai.com').rstrip('/')
+
+# Pooled provider connections (one keep-alive session per provider)
+STT_MAX_CONNECTIONS = int(os.environ.get('STT_MAX_CONNECTIONS', '32'))
+STT_MAX_PER_HOST = int(os.environ.get('STT_MAX_PER_HOST', '16'))  # In-flight requests per provider host
+STT_TIMEOUT = float(os.environ.get('STT_TIMEOUT', '60'))
+STT_KEEPALIVE = float(os.environ.get('STT_KEEPALIVE', '60'))
+STT_STREAM_MAX_CONNECTIONS = int(os.environ.get('STT_STREAM_MAX_CONNECTIONS', '200'))  # Live sockets held open
+
+# Uploads are forwarded straight from the request's spooled file in chunks
+# (no read() into memory, no temp files); size and concurrency bound peak memory
+STT_MAX_UPLOAD_MB = float(os.environ.get('STT_MAX_UPLOAD_MB', '25'))
+STT_MAX_CONCURRENT_UPLOADS = int(os.environ.get('STT_MAX_CONCURRENT_UPLOADS', '16'))
+STT_CHUNK_SIZE = 64 * 1024
+
+# Hedged race: the fastest healthy provider transcribes alone; the next one only
+# starts if it runs past its observed p95 latency (or fails / is below the
+# confidence threshold), so most answers still cost a single provider call.
+# The first transcript above the threshold wins and the rest are cancelled.
+STT_RACE = os.environ.get('STT_RACE', 'true').lower() == 'true'
+STT_RACE_PROVIDERS = [p.strip() for p in os.environ.get('STT_RACE_PROVIDERS', 'groq,deepgram,assemblyai,whisper').split(',') if p.strip()]
+STT_RACE_WIDTH = int(os.environ.get('STT_RACE_WIDTH', '2'))  # Most providers in flight for one answer
+STT_MIN_CONFIDENCE = float(os.environ.get('STT_MIN_CONFIDENCE', '0.6'))
+STT_UNKNOWN_LATENCY = 2.0  # Seconds assumed for a provider with no samples yet
+STT_HEDGE_MIN_DELAY = float(os.environ.get('STT_HEDGE_MIN_DELAY', '0.5'))
+STT_HEDGE_MAX_DELAY = float(os.environ.get('STT_HEDGE_MAX_DELAY', '8.0'))
+STT_HEDGE_DEFAULT_DELAY = float(os.environ.get('STT_HEDGE_DEFAULT_DELAY', '3.0'))  # Until enough samples exist
+STT_HEDGE_MIN_SAMPLES = 10
+
+# AssemblyAI is asynchronous (upload, submit, wait). The first status check is
+# scheduled for when the transcript should be ready (a learned turnaround ratio
+# times the clip's duration), then backs off from ASSEMBLYAI_POLL_MIN to
+# ASSEMBLYAI_POLL_MAX. With ASSEMBLYAI_WEBHOOK_URL set, AssemblyAI calls us back
+# instead and polling only runs every ASSEMBLYAI_WEBHOOK_POLL seconds as a safety net.
+ASSEMBLYAI_POLL_MIN = float(os.environ.get('ASSEMBLYAI_POLL_MIN', '0.25'))
+ASSEMBLYAI_POLL_MAX = float(os.environ.get('ASSEMBLYAI_POLL_MAX', '2'))
+ASSEMBLYAI_POLL_BACKOFF = 1.5
+ASSEMBLYAI_TURNAROUND = float(os.environ.get('ASSEMBLYAI_TURNAROUND', '0.25'))  # Initial guess: seconds of processing per second of audio
+ASSEMBLYAI_MAX_WAIT = float(os.environ.get('ASSEMBLYAI_MAX_WAIT', '60'))  # Plus the expected turnaround
+ASSEMBLYAI_WEBHOOK_URL = os.environ.get('ASSEMBLYAI_WEBHOOK_URL')  # Public URL of /api/interview/speech-to-text/assemblyai-webhook
+ASSEMBLYAI_WEBHOOK_SECRET = os.environ.get('ASSEMBLYAI_WEBHOOK_SECRET')
+ASSEMBLYAI_WEBHOOK_HEADER = 'X-Webhook-Secret'
+ASSEMBLYAI_WEBHOOK_POLL = float(os.environ.get('ASSEMBLYAI_WEBHOOK_POLL', '5'))
+# Duration is estimated from size; assuming a high bitrate errs towards checking early
+STT_AUDIO_KBPS = float(os.environ.get('STT_AUDIO_KBPS', '128'))
+
+# Shared with the breaker logic the LLM gateway uses
+stt_health = HealthTracker('stt')
+
+# Raw bytes (e.g. a streamed recording) or a seekable file such as UploadFile.file
+AudioInput = Union[bytes, BinaryIO]
+
+
+class _AudioView:
+    """
+    Independent read position over a shared seekable file
+
+    Racing providers read the same upload concurrently; each gets its own
+    view so one request's seek/read never moves the other's offset. Every
+    read is a synchronous seek + read, so views can't interleave mid-read.
+    """
+
+    def __init__(self, audio: BinaryIO):
+        self._audio = audio
+        self._position = 0
+
+    def read(self, size: int = -1) -> bytes:
+        self._audio.seek(self._position)
+        data = self._audio.read(size)
+        self._position += len(data)
+        return data
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_END:
+            self._position = self._audio.seek(0, os.SEEK_END) + offset
+        elif whence == os.SEEK_CUR:
+            self._position += offset
+        else:
+            self._position = offset
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self):
+        pass  # The upload owns the underlying file
+
+
+def _view(audio: AudioInput) -> AudioInput:
+    return audio if isinstance(audio, (bytes, bytearray)) else _AudioView(audio)
+
+
+def _size(audio: AudioInput) -> int:
+    if isinstance(audio, (bytes, bytearray)):
+        return len(audio)
+    size = audio.seek(0, os.SEEK_END)
+    audio.seek(0)
+    return size
+
+
+def _rewind(audio: AudioInput) -> AudioInput:
+    """Providers are tried in turn, so every attempt starts from the beginning of the file"""
+    if not isinstance(audio, (bytes, bytearray)):
+        audio.seek(0)
+    return audio
+
+
+class _SpooledAudio(aiohttp.payload.Payload):
+    """
+    Request body read from a seekable file in STT_CHUNK_SIZE chunks
+
+    Sent with a Content-Length and left open afterwards - aiohttp's own file
+    payloads close the file, but the next provider may need to resend it.
+    """
+
+    def __init__(self, audio: BinaryIO):
+        audio.seek(0, os.SEEK_END)
+        size = audio.tell()
+        audio.seek(0)
+        super().__init__(audio, content_type='audio/webm')
+        self._size = size
+
+    async def write(self, writer):
+        # Spooled uploads live in memory up to the spool threshold, page cache beyond
+        self._value.seek(0)
+        while True:
+            chunk = self._value.read(STT_CHUNK_SIZE)
+            if not chunk:
+                break
+            await writer.write(chunk)
+
+    def decode(self, encoding: str = 'utf-8', errors: str = 'strict') -> str:
+        raise TypeError("Audio payload is binary")
+
+
+def _body(audio: AudioInput):
+    """aiohttp body (raw or multipart part): bytes as-is, files streamed without copying"""
+    if isinstance(audio, (bytes, bytearray)):
+        return audio
+    return _SpooledAudio(audio)
+
+
+class SpeechSessions:
+    """
+    Long-lived aiohttp sessions, one per speech provider
+
+    Created on startup and closed on shutdown, so transcriptions reuse warm
+    keep-alive connections instead of paying DNS, TCP and TLS setup per call.
+    Each session's connector caps total and per-host connections. Live
+    (WebSocket) transcription gets its own session, since every open socket
+    holds a connection for the whole answer.
+    """
+
+    PROVIDERS = ('deepgram', 'deepgram-live', 'assemblyai', 'whisper')
+
+    _sessions: Dict[str, aiohttp.ClientSession] = {}
+    _connections: Dict[str, Dict[str, int]] = {}  # provider -> {'created', 'reused'}
+
+    @staticmethod
+    def _trace(provider: str) -> aiohttp.TraceConfig:
+        counts = SpeechSessions._connections.setdefault(provider, {'created': 0, 'reused': 0})
+
+        async def created(session, context, params):
+            counts['created'] += 1
+
+        async def reused(session, context, params):
+            counts['reused'] += 1
+
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_end.append(created)
+        trace.on_connection_reuseconn.append(reused)
+        return trace
+
+    @staticmethod
+    def _create(provider: str) -> aiohttp.ClientSession:
+        live = provider.endswith('-live')
+        connector = aiohttp.TCPConnector(
+            limit=STT_STREAM_MAX_CONNECTIONS if live else STT_MAX_CONNECTIONS,
+            limit_per_host=0 if live else STT_MAX_PER_HOST,
+            keepalive_timeout=STT_KEEPALIVE,
+            ttl_dns_cache=300
+        )
+        timeout = aiohttp.ClientTimeout(total=None if live else STT_TIMEOUT, sock_connect=5)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=[SpeechSessions._trace(provider)])
+
+    @staticmethod
+    async def start():
+        """Open sessions for the configured providers (called on app startup)"""
+        configured = {
+            'deepgram': DEEPGRAM_API_KEY, 'deepgram-live': DEEPGRAM_API_KEY,
+            'assemblyai': ASSEMBLYAI_API_KEY, 'whisper': OPENAI_API_KEY
+        }
+        for provider in SpeechSessions.PROVIDERS:
+            if configured[provider]:
+                SpeechSessions.get(provider)
+        if SpeechSessions._sessions:
+            print(f"✅ Speech provider sessions ready: {', '.join(SpeechSessions._sessions)}")
+
+    @staticmethod
+    def get(provider: str) -> aiohttp.ClientSession:
+        """The provider's shared session (created on first use outside the app, e.g. scripts)"""
+        session = SpeechSessions._sessions.get(provider)
+        if session is None or session.closed:
+            session = SpeechSessions._create(provider)
+            SpeechSessions._sessions[provider] = session
+        return session
+
+    @staticmethod
+    async def close():
+        """Close every provider session (called on app shutdown)"""
+        sessions, SpeechSessions._sessions = SpeechSessions._sessions, {}
+        for provider, session in sessions.items():
+            try:
+                await session.close()
+            except Exception as e:
+                print(f"⚠️ Error closing {provider} speech session: {e}")
+
+    @staticmethod
+    def get_metrics() -> Dict[str, Any]:
+        metrics = {}
+        for provider, counts in SpeechSessions._connections.items():
+            total = counts['created'] + counts['reused']
+            metrics[provider] = {
+                'connectionsCreated': counts['created'],
+                'connectionsReused': counts['reused'],
+                'reuseRate': round(counts['reused'] / total, 3) if total else 0.0,
+                'open': provider in SpeechSessions._sessions
+            }
+        return metrics
+
+
+class AssemblyAITranscripts:
+    """
+    When to check on a submitted AssemblyAI transcript, and webhook callbacks
+
+    Polling: the turnaround ratio (processing seconds per audio second) is an
+    EWMA of observed completions, so the first status check lands close to
+    when the transcript is actually ready instead of once a second.
+
+    Webhooks: each transcript waits on a future that the webhook endpoint
+    resolves. A callback can land on another worker (or arrive before the
+    submit response), so polling continues at a slow rate as a safety net and
+    early callbacks are remembered briefly.
+    """
+
+    _EARLY_MAX = 256
+
+    _pending: Dict[str, asyncio.Future] = {}
+    _early: 'OrderedDict[str, str]' = OrderedDict()  # transcript id -> status, callbacks nobody was waiting for yet
+    _turnaround = ASSEMBLYAI_TURNAROUND
+
+    _metrics = {
+        'transcripts': 0,
+        'polls': 0,
+        'webhooksReceived': 0,
+        'webhooksMatched': 0,    # Resolved a transcript this worker was waiting on
+        'webhooksRejected': 0,   # Wrong or missing secret
+        'waitMs': 0.0            # Submit -> completed
+    }
+
+    @staticmethod
+    def webhooks_enabled() -> bool:
+        return bool(ASSEMBLYAI_WEBHOOK_URL)
+
+    @staticmethod
+    def request_fields() -> Dict[str, Any]:
+        """Extra /v2/transcript fields that ask AssemblyAI to call us back"""
+        if not AssemblyAITranscripts.webhooks_enabled():
+            return {}
+        fields = {'webhook_url': ASSEMBLYAI_WEBHOOK_URL}
+        if ASSEMBLYAI_WEBHOOK_SECRET:
+            fields['webhook_auth_header_name'] = ASSEMBLYAI_WEBHOOK_HEADER
+            fields['webhook_auth_header_value'] = ASSEMBLYAI_WEBHOOK_SECRET
+        return fields
+
+    @staticmethod
+    def expected_wait(duration: float) -> float:
+        return duration * AssemblyAITranscripts._turnaround
+
+    @staticmethod
+    def delays(duration: float, webhook: bool):
+        """Seconds to wait before each status check"""
+        if webhook:
+            while True:
+                yield ASSEMBLYAI_WEBHOOK_POLL
+        # First check a little before the expected finish, then short steps
+        # (a twentieth of the expected wait) through the window where it most
+        # likely completes, then backed-off checks for stragglers
+        expected = AssemblyAITranscripts.expected_wait(duration)
+        waited = max(ASSEMBLYAI_POLL_MIN, 0.8 * expected)
+        yield waited
+        delay = min(max(ASSEMBLYAI_POLL_MIN, 0.05 * expected), ASSEMBLYAI_POLL_MAX)
+        while True:
+            yield delay
+            waited += delay
+            if waited > 1.2 * expected:
+                delay = min(delay * ASSEMBLYAI_POLL_BACKOFF, ASSEMBLYAI_POLL_MAX)
+
+    @staticmethod
+    def completed(elapsed: float, duration: float, overshot: bool):
+        """
+        Learn the turnaround ratio from a finished transcript
+
+        overshot: it was already done at the first check, so it finished some
+        time before `elapsed` - aim lower than what was observed.
+        """
+        AssemblyAITranscripts._metrics['transcripts'] += 1
+        AssemblyAITranscripts._metrics['waitMs'] += elapsed * 1000
+        if duration > 0:
+            observed = elapsed / duration * (0.75 if overshot else 1.0)
+            AssemblyAITranscripts._turnaround = 0.7 * AssemblyAITranscripts._turnaround + 0.3 * observed
+
+    @staticmethod
+    def register(transcript_id: str) -> Optional[asyncio.Future]:
+        """Future resolved by the webhook for this transcript (None without webhooks)"""
+        if not AssemblyAITranscripts.webhooks_enabled():
+            return None
+        future = asyncio.get_running_loop().create_future()
+        status = AssemblyAITranscripts._early.pop(transcript_id, None)
+        if status is not None:
+            future.set_result(status)
+        AssemblyAITranscripts._pending[transcript_id] = future
+        return future
+
+    @staticmethod
+    def discard(transcript_id: str):
+        AssemblyAITranscripts._pending.pop(transcript_id, None)
+
+    @staticmethod
+    def receive(payload: Dict[str, Any], secret: Optional[str]) -> bool:
+        """Handle a webhook callback; False if it isn't authentic"""
+        if ASSEMBLYAI_WEBHOOK_SECRET and not hmac.compare_digest(secret or '', ASSEMBLYAI_WEBHOOK_SECRET):
+            AssemblyAITranscripts._metrics['webhooksRejected'] += 1
+            return False
+        AssemblyAITranscripts._metrics['webhooksReceived'] += 1
+        transcript_id, status = payload.get('transcript_id'), payload.get('status', 'completed')
+        if not transcript_id:
+            return True
+        future = AssemblyAITranscripts._pending.get(transcript_id)
+        if future is None:
+            AssemblyAITranscripts._early[transcript_id] = status
+            while len(AssemblyAITranscripts._early) > AssemblyAITranscripts._EARLY_MAX:
+                AssemblyAITranscripts._early.popitem(last=False)
+        elif not future.done():
+            AssemblyAITranscripts._metrics['webhooksMatched'] += 1
+            future.set_result(status)
+        return True
+
+    @staticmethod
+    async def wait(future: Optional[asyncio.Future], delay: float):
+        """Sleep until the next status check, cut short by the webhook"""
+        if future is None or future.done():
+            await asyncio.sleep(delay)
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(future), delay)
+        except asyncio.TimeoutError:
+            pass
+
+    @staticmethod
+    def get_metrics() -> Dict[str, Any]:
+        metrics = dict(AssemblyAITranscripts._metrics)
+        transcripts = metrics['transcripts']
+        metrics['avgWaitMs'] = round(metrics.pop('waitMs') / transcripts, 1) if transcripts else 0.0
+        metrics['pollsPerTranscript'] = round(metrics['polls'] / transcripts, 2) if transcripts else 0.0
+        metrics['turnaroundRatio'] = round(AssemblyAITranscripts._turnaround, 3)
+        metrics['webhooks'] = AssemblyAITranscripts.webhooks_enabled()
+        metrics['pending'] = len(AssemblyAITranscripts._pending)
+        return metrics
+
 
 class EnhancedSpeechToText:
     """Multi-provider speech-to-text with automatic fallback"""
     
+    _upload_slots = asyncio.Semaphore(STT_MAX_CONCURRENT_UPLOADS)
+    _latencies: Dict[str, deque] = {}  # provider -> recent successful call durations (seconds)
+    
+    _metrics = {
+        'uploads': 0,
+        'rejectedTooLarge': 0,
+        'uploadBytes': 0,
+        'maxUploadBytes': 0,
+        'races': 0,
+        'hedged': 0,           # Backup providers started after a slow or failed one
+        'raceWins': {},        # provider -> races won
+        'cancelled': 0,        # Losing requests cancelled mid-flight
+        'belowThreshold': 0,   # Transcripts under STT_MIN_CONFIDENCE (or empty)
+        'raceFallbacks': 0     # Races with no successful racer
+    }
+    
+    @staticmethod
+    def accept_upload(size: Optional[int]) -> bool:
+        """Record an upload's size; False if it exceeds STT_MAX_UPLOAD_MB"""
+        if size is not None and size > STT_MAX_UPLOAD_MB * 1024 * 1024:
+            EnhancedSpeechToText._metrics['rejectedTooLarge'] += 1
+            return False
+        EnhancedSpeechToText._metrics['uploads'] += 1
+        EnhancedSpeechToText._metrics['uploadBytes'] += size or 0
+        EnhancedSpeechToText._metrics['maxUploadBytes'] = max(EnhancedSpeechToText._metrics['maxUploadBytes'], size or 0)
+        return True
+    
+    @staticmethod
+    def upload_slot() -> asyncio.Semaphore:
+        """Bounds concurrent uploads being forwarded (and so their buffers)"""
+        return EnhancedSpeechToText._upload_slots
+    
+    @staticmethod
+    def get_metrics() -> Dict[str, Any]:
+        metrics = dict(EnhancedSpeechToText._metrics)
+        metrics['raceWins'] = dict(metrics['raceWins'])
+        metrics['forwarding'] = STT_MAX_CONCURRENT_UPLOADS - EnhancedSpeechToText._upload_slots._value
+        metrics['raceEnabled'] = STT_RACE
+        metrics['raceOrder'] = EnhancedSpeechToText._race_candidates()
+        metrics['hedgeDelayMs'] = {
+            p: round(EnhancedSpeechToText._hedge_delay(p) * 1000, 1) for p in metrics['raceOrder']
+        }
+        metrics['health'] = stt_health.snapshot()
+        metrics['sessions'] = SpeechSessions.get_metrics()
+        metrics['assemblyai'] = AssemblyAITranscripts.get_metrics()
+        return metrics
+    
+    @staticmethod
+    def _configured(provider: str) -> bool:
+        if provider == 'groq':
+            return bool(GROQ_API_KEY) and llm_gateway.get_groq_client() is not None
+        return bool({
+            'deepgram': DEEPGRAM_API_KEY,
+            'assemblyai': ASSEMBLYAI_API_KEY,
+            'whisper': OPENAI_API_KEY
+        }.get(provider))
+    
+    @staticmethod
+    async def _attempt(provider: str, audio_data: AudioInput) -> Dict[str, Any]:
+        """One provider call with breaker admission and health accounting"""
+        if not stt_health.acquire(provider):
+            return {'success': False, 'provider': provider, 'error': f'{provider} circuit open'}
+        
+        transcribe = {
+            'groq': EnhancedSpeechToText._transcribe_groq_whisper,
+            'deepgram': EnhancedSpeechToText._transcribe_deepgram,
+            'assemblyai': EnhancedSpeechToText._transcribe_assemblyai,
+            'whisper': EnhancedSpeechToText._transcribe_whisper
+        }[provider]
+        started = time.perf_counter()
+        try:
+            result = await transcribe(audio_data)
+        except asyncio.CancelledError:
+            # Lost a race - says nothing about the provider's health
+            stt_health.release(provider)
+            raise
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        
+        if result.get('success'):
+            elapsed = time.perf_counter() - started
+            stt_health.record_success(provider, elapsed)
+            EnhancedSpeechToText._latencies.setdefault(provider, deque(maxlen=200)).append(elapsed)
+        else:
+            stt_health.record_failure(provider)
+            print(f"Provider {provider} failed: {result.get('error')}")
+        return result
+    
+    @staticmethod
+    def _race_candidates() -> List[str]:
+        """Configured, admissible race providers, healthy first, then by observed latency"""
+        candidates = [
+            p for p in STT_RACE_PROVIDERS
+            if EnhancedSpeechToText._configured(p) and stt_health.get(p).is_available()
+        ]
+        
+        def expected_latency(provider: str):
+            health = stt_health.get(provider)
+            latency = health.ewma_latency if health.ewma_latency is not None else STT_UNKNOWN_LATENCY
+            return (health.is_degraded(), latency)
+        
+        return sorted(candidates, key=expected_latency)
+    
     @staticmethod
-    async def transcribe_audio(audio_data: bytes, provider: str = 'auto') -> Dict[str, Any]:
+    def _hedge_delay(provider: str) -> float:
+        """Seconds to wait on this provider before starting the next one (its p95)"""
+        latencies = EnhancedSpeechToText._latencies.get(provider)
+        if not latencies or len(latencies) < STT_HEDGE_MIN_SAMPLES:
+            return STT_HEDGE_DEFAULT_DELAY
+        ordered = sorted(latencies)
+        p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+        return min(STT_HEDGE_MAX_DELAY, max(STT_HEDGE_MIN_DELAY, p95))
+    
+    @staticmethod
+    def _qualifies(result: Dict[str, Any]) -> bool:
+        return bool(result.get('success')) and bool((result.get('text') or '').strip()) \
+            and result.get('confidence', 0.0) >= STT_MIN_CONFIDENCE
+    
+    @staticmethod
+    async def _race(providers: List[str], audio_data: AudioInput) -> Optional[Dict[str, Any]]:
+        """
+        Hedged race over providers (fastest first): the next one starts when the
+        running one exceeds its p95 latency or comes back failed or below the
+        confidence threshold. The first qualifying transcript wins and the other
+        requests are cancelled. Falls back to the best successful (low-confidence
+        or empty) transcript, or None if all failed.
+        """
+        EnhancedSpeechToText._metrics['races'] += 1
+        remaining = list(providers)
+        tasks: Dict[asyncio.Task, str] = {}
+        
+        pending = set()
+        
+        def launch():
+            provider = remaining.pop(0)
+            task = asyncio.create_task(EnhancedSpeechToText._attempt(provider, _view(audio_data)))
+            tasks[task] = provider
+            pending.add(task)
+            return provider
+        
+        last_launched = launch()
+        best = None
+        try:
+            while pending:
+                delay = EnhancedSpeechToText._hedge_delay(last_launched) if remaining else None
+                done, _ = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                pending -= done
+                
+                if not done:
+                    # Running provider is slower than its p95 - start a backup
+                    EnhancedSpeechToText._metrics['hedged'] += 1
+                    last_launched = launch()
+                    continue
+                
+                for task in done:
+                    result = task.result()
+                    if EnhancedSpeechToText._qualifies(result):
+                        wins = EnhancedSpeechToText._metrics['raceWins']
+                        wins[tasks[task]] = wins.get(tasks[task], 0) + 1
+                        EnhancedSpeechToText._metrics['cancelled'] += len(pending)
+                        return result
+                    if result.get('success'):
+                        EnhancedSpeechToText._metrics['belowThreshold'] += 1
+                        if best is None or result.get('confidence', 0.0) > best.get('confidence', 0.0):
+                            best = result
+                
+                # Nothing usable yet - replace it right away instead of waiting out the delay
+                if remaining:
+                    last_launched = launch()
+            return best
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    @staticmethod
+    async def transcribe_audio(audio_data: AudioInput, provider: str = 'auto') -> Dict[str, Any]:
         """
         Transcribe audio using the best available provider
         
         Args:
-            audio_data: Audio file bytes (wav, mp3, webm, etc.)
-            provider: 'auto', 'assemblyai', 'deepgram', 'whisper', 'groq'
+            audio_data: Audio bytes or a seekable file (wav, mp3, webm, etc.) - files
+                are streamed to the provider and rewound between attempts
+            provider: 'auto', 'race', 'assemblyai', 'deepgram', 'whisper', 'groq'.
+                'auto' runs a hedged race over the STT_RACE_WIDTH fastest healthy
+                providers when STT_RACE is on (backups start only past the
+                primary's p95), then falls back to the rest one at a time.
         
         Returns:
             {
@@ -39,41 +597,32 @@ class EnhancedSpeechToText:
             }
         """
         
-        if provider == 'auto':
+        tried = []
+        if provider == 'race' or (provider == 'auto' and STT_RACE):
+            racers = EnhancedSpeechToText._race_candidates()[:max(STT_RACE_WIDTH, 1)]
+            if len(racers) > 1:
+                result = await EnhancedSpeechToText._race(racers, audio_data)
+                if result is not None:
+                    return result
+                tried = racers
+                EnhancedSpeechToText._metrics['raceFallbacks'] += 1
+        
+        if provider in ('auto', 'race'):
             # Try providers in order: FREE → FAST → ACCURATE
             # Groq is FREE, fast, and accurate - perfect primary choice
-            providers = ['groq', 'deepgram', 'assemblyai', 'whisper']
+            providers = [p for p in stt_health.rank(['groq', 'deepgram', 'assemblyai', 'whisper']) if p not in tried]
         else:
             providers = [provider]
         
         last_error = None
         
         for prov in providers:
-            try:
-                if prov == 'whisper' and OPENAI_API_KEY:
-                    result = await EnhancedSpeechToText._transcribe_whisper(audio_data)
-                    if result['success']:
-                        return result
-                
-                elif prov == 'assemblyai' and ASSEMBLYAI_API_KEY:
-                    result = await EnhancedSpeechToText._transcribe_assemblyai(audio_data)
-                    if result['success']:
-                        return result
-                
-                elif prov == 'deepgram' and DEEPGRAM_API_KEY:
-                    result = await EnhancedSpeechToText._transcribe_deepgram(audio_data)
-                    if result['success']:
-                        return result
-                
-                elif prov == 'groq' and GROQ_API_KEY:
-                    result = await EnhancedSpeechToText._transcribe_groq_whisper(audio_data)
-                    if result['success']:
-                        return result
-                        
-            except Exception as e:
-                last_error = str(e)
-                print(f"Provider {prov} failed: {e}")
+            if not EnhancedSpeechToText._configured(prov):
                 continue
+            result = await EnhancedSpeechToText._attempt(prov, _rewind(audio_data))
+            if result['success']:
+                return result
+            last_error = result.get('error')
         
         # All providers failed
         return {
@@ -85,78 +634,53 @@ class EnhancedSpeechToText:
         }
     
     @staticmethod
-    async def _transcribe_whisper(audio_data: bytes) -> Dict[str, Any]:
+    async def _transcribe_whisper(audio_data: AudioInput) -> Dict[str, Any]:
         """Transcribe using OpenAI Whisper API (highest accuracy)"""
         try:
-            import aiofiles
-            import tempfile
-            
-            # Save audio to temp file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.webm') as temp_file:
-                temp_file.write(audio_data)
-                temp_path = temp_file.name
+            session = SpeechSessions.get('whisper')
+            form = aiohttp.FormData()
+            form.add_field('file', _body(audio_data), filename='audio.webm', content_type='audio/webm')
+            form.add_field('model', 'whisper-1')
+            form.add_field('language', 'en')
+            form.add_field('response_format', 'verbose_json')
             
-            async with aiohttp.ClientSession() as session:
-                with open(temp_path, 'rb') as audio_file:
-                    form = aiohttp.FormData()
-                    form.add_field('file', audio_file, filename='audio.webm', content_type='audio/webm')
-                    form.add_field('model', 'whisper-1')
-                    form.add_field('language', 'en')
-                    form.add_field('response_format', 'verbose_json')
+            async with session.post(
+                f'{WHISPER_BASE_URL}/v1/audio/transcriptions',
+                headers={'Authorization': f'Bearer {OPENAI_API_KEY}'},
+                data=form
+            ) as response:
+                if response.status == 200:
+                    result = await response.json()
                     
-                    async with session.post(
-                        'https://api.openai.com/v1/audio/transcriptions',
-                        headers={'Authorization': f'Bearer {OPENAI_API_KEY}'},
-                        data=form
-                    ) as response:
-                        if response.status == 200:
-                            result = await response.json()
-                            
-                            # Clean up temp file
-                            os.unlink(temp_path)
-                            
-                            return {
-                                'text': result.get('text', ''),
-                                'confidence': 0.95,  # Whisper is highly accurate
-                                'provider': 'whisper',
-                                'words': result.get('words', []),
-                                'success': True
-                            }
-                        else:
-                            error_text = await response.text()
-                            print(f"Whisper API error: {error_text}")
-                            os.unlink(temp_path)
-                            return {'success': False, 'error': error_text}
-        
+                    return {
+                        'text': result.get('text', ''),
+                        'confidence': 0.95,  # Whisper is highly accurate
+                        'provider': 'whisper',
+                        'words': result.get('words', []),
+                        'success': True
+                    }
+                else:
+                    error_text = await response.text()
+                    print(f"Whisper API error: {error_text}")
+                    return {'success': False, 'error': error_text}
+    
         except Exception as e:
             print(f"Whisper transcription error: {e}")
             return {'success': False, 'error': str(e)}
     
     @staticmethod
-    async def _transcribe_groq_whisper(audio_data: bytes) -> Dict[str, Any]:
+    async def _transcribe_groq_whisper(audio_data: AudioInput) -> Dict[str, Any]:
         """Transcribe using Groq's Whisper implementation (fast and free)"""
         try:
-            import tempfile
-            from groq import Groq
-            
-            client = Groq(api_key=GROQ_API_KEY)
-            
-            # Save audio to temp file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.webm') as temp_file:
-                temp_file.write(audio_data)
-                temp_path = temp_file.name
-            
-            # Transcribe with Groq Whisper
-            with open(temp_path, 'rb') as audio_file:
-                transcription = client.audio.transcriptions.create(
-                    file=audio_file,
-                    model="whisper-large-v3",
-                    language="en",
-                    response_format="verbose_json"
-                )
+            client = llm_gateway.get_groq_client()
             
-            # Clean up
-            os.unlink(temp_path)
+            # Sent as a multipart file part straight from memory or the upload spool
+            transcription = await client.audio.transcriptions.create(
+                file=('audio.webm', _rewind(audio_data)),
+                model="whisper-large-v3",
+                language="en",
+                response_format="verbose_json"
+            )
             
             return {
                 'text': transcription.text,
@@ -170,56 +694,64 @@ class EnhancedSpeechToText:
             return {'success': False, 'error': str(e)}
     
     @staticmethod
-    async def _transcribe_assemblyai(audio_data: bytes) -> Dict[str, Any]:
+    async def _transcribe_assemblyai(audio_data: AudioInput) -> Dict[str, Any]:
         """Transcribe using AssemblyAI (excellent accuracy with word-level timestamps)"""
         try:
-            async with aiohttp.ClientSession() as session:
-                # Step 1: Upload audio
-                upload_response = await session.post(
-                    'https://api.assemblyai.com/v2/upload',
-                    headers={'authorization': ASSEMBLYAI_API_KEY},
-                    data=audio_data
-                )
-                
+            session = SpeechSessions.get('assemblyai')
+            headers = {'authorization': ASSEMBLYAI_API_KEY}
+            
+            duration = _size(audio_data) * 8 / (STT_AUDIO_KBPS * 1000)
+            
+            # Step 1: Upload audio
+            async with session.post(
+                f'{ASSEMBLYAI_BASE_URL}/v2/upload', headers=headers, data=_body(audio_data)
+            ) as upload_response:
                 if upload_response.status != 200:
                     return {'success': False, 'error': 'Upload failed'}
-                
                 upload_data = await upload_response.json()
-                audio_url = upload_data['upload_url']
-                
-                # Step 2: Request transcription
-                transcript_request = {
-                    'audio_url': audio_url,
-                    'language_code': 'en',
-                    'punctuate': True,
-                    'format_text': True
-                }
-                
-                transcript_response = await session.post(
-                    'https://api.assemblyai.com/v2/transcript',
-                    headers={'authorization': ASSEMBLYAI_API_KEY},
-                    json=transcript_request
-                )
-                
+            audio_url = upload_data['upload_url']
+            
+            # Step 2: Request transcription
+            transcript_request = {
+                'audio_url': audio_url,
+                'language_code': 'en',
+                'punctuate': True,
+                'format_text': True,
+                **AssemblyAITranscripts.request_fields()
+            }
+            
+            async with session.post(
+                f'{ASSEMBLYAI_BASE_URL}/v2/transcript', headers=headers, json=transcript_request
+            ) as transcript_response:
                 if transcript_response.status != 200:
                     return {'success': False, 'error': 'Transcription request failed'}
-                
                 transcript_data = await transcript_response.json()
-                transcript_id = transcript_data['id']
-                
-                # Step 3: Poll for completion
-                max_attempts = 60
-                for _ in range(max_attempts):
-                    await asyncio.sleep(1)
-                    
-                    status_response = await session.get(
-                        f'https://api.assemblyai.com/v2/transcript/{transcript_id}',
-                        headers={'authorization': ASSEMBLYAI_API_KEY}
-                    )
+            transcript_id = transcript_data['id']
+            submitted = time.perf_counter()
+            
+            # Step 3: Wait for completion (webhook or adaptive polling)
+            callback = AssemblyAITranscripts.register(transcript_id)
+            deadline = submitted + ASSEMBLYAI_MAX_WAIT + AssemblyAITranscripts.expected_wait(duration)
+            delays = AssemblyAITranscripts.delays(duration, webhook=callback is not None)
+            checks = 0
+            try:
+                while True:
+                    delay = min(next(delays), max(0.0, deadline - time.perf_counter()))
+                    await AssemblyAITranscripts.wait(callback, delay)
                     
-                    status_data = await status_response.json()
+                    async with session.get(
+                        f'{ASSEMBLYAI_BASE_URL}/v2/transcript/{transcript_id}', headers=headers
+                    ) as status_response:
+                        status_data = await status_response.json()
+                    AssemblyAITranscripts._metrics['polls'] += 1
+                    checks += 1
                     
                     if status_data['status'] == 'completed':
+                        AssemblyAITranscripts.completed(
+                            time.perf_counter() - submitted,
+                            status_data.get('audio_duration') or duration,
+                            overshot=checks == 1 and not (callback is not None and callback.done())
+                        )
                         return {
                             'text': status_data['text'],
                             'confidence': status_data.get('confidence', 0.9),
@@ -229,42 +761,49 @@ class EnhancedSpeechToText:
                         }
                     elif status_data['status'] == 'error':
                         return {'success': False, 'error': status_data.get('error', 'Unknown error')}
-                
-                return {'success': False, 'error': 'Timeout waiting for transcription'}
+                    
+                    if time.perf_counter() >= deadline:
+                        return {'success': False, 'error': 'Timeout waiting for transcription'}
+                    if callback is not None and callback.done():
+                        # Called back but not readable yet - poll normally from here
+                        callback = None
+                        delays = AssemblyAITranscripts.delays(0.0, webhook=False)
+            finally:
+                AssemblyAITranscripts.discard(transcript_id)
         
         except Exception as e:
             print(f"AssemblyAI error: {e}")
             return {'success': False, 'error': str(e)}
     
     @staticmethod
-    async def _transcribe_deepgram(audio_data: bytes) -> Dict[str, Any]:
+    async def _transcribe_deepgram(audio_data: AudioInput) -> Dict[str, Any]:
         """Transcribe using Deepgram (fast real-time transcription)"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    'https://api.deepgram.com/v1/listen?model=nova-2&punctuate=true&smart_format=true&language=en',
-                    headers={
-                        'Authorization': f'Token {DEEPGRAM_API_KEY}',
-                        'Content-Type': 'audio/webm'
-                    },
-                    data=audio_data
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        
-                        transcript = result['results']['channels'][0]['alternatives'][0]
-                        
-                        return {
-                            'text': transcript['transcript'],
-                            'confidence': transcript.get('confidence', 0.9),
-                            'provider': 'deepgram',
-                            'words': transcript.get('words', []),
-                            'success': True
-                        }
-                    else:
-                        error_text = await response.text()
-                        return {'success': False, 'error': error_text}
-        
+            session = SpeechSessions.get('deepgram')
+            async with session.post(
+                f'{DEEPGRAM_BASE_URL}/v1/listen?model=nova-2&punctuate=true&smart_format=true&language=en',
+                headers={
+                    'Authorization': f'Token {DEEPGRAM_API_KEY}',
+                    'Content-Type': 'audio/webm'
+                },
+                data=_body(audio_data)
+            ) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    
+                    transcript = result['results']['channels'][0]['alternatives'][0]
+                    
+                    return {
+                        'text': transcript['transcript'],
+                        'confidence': transcript.get('confidence', 0.9),
+                        'provider': 'deepgram',
+                        'words': transcript.get('words', []),
+                        'success': True
+                    }
+                else:
+                    error_text = await response.text()
+                    return {'success': False, 'error': error_text}
+    
         except Exception as e:
             print(f"Deepgram error: {e}")
             return {'success': False, 'error': str(e)}
@@ -290,9 +829,6 @@ class AnswerAnalyzer:
         """
         
         try:
-            from groq import Groq
-            client = Groq(api_key=GROQ_API_KEY)
-            
             # Build context from conversation
             recent_qa = []
             for i, entry in enumerate(conversation_history[-10:]):
@@ -357,81 +893,14 @@ Return ONLY valid JSON:
 
 Be thorough but fair. Look for genuine issues, not nitpicks."""
 
-            # Try DeepSeek (Priority: A4F > OpenRouter > Groq)
-            A4F_API_KEY = os.environ.get('A4F_API_KEY')
-            OPENROUTER_API_KEY = os.environ.get('OPENROUTER_API_KEY')
-            result_text = None
-            
-            # Try A4F first
-            if A4F_API_KEY and A4F_API_KEY != 'your_a4f_api_key_here':
-                try:
-                    import httpx
-                    async with httpx.AsyncClient(timeout=30.0) as client_http:
-                        response = await client_http.post(
-                            "https://api.a4f.co/v1/chat/completions",
-                            headers={
-                                "Authorization": f"Bearer {A4F_API_KEY}",
-                                "Content-Type": "application/json"
-                            },
-                            json={
-                                "model": "provider-1/deepseek-v3.1",  # A4F format
-                                "messages": [
-                                    {"role": "system", "content": "You are an expert interviewer and answer analyzer. Identify loopholes, inconsistencies, and follow-up opportunities in candidate answers."},
-                                    {"role": "user", "content": prompt}
-                                ],
-                                "temperature": 0.3,
-                                "max_tokens": 1500
-                            }
-                        )
-                        if response.status_code == 200:
-                            result = response.json()
-                            result_text = result['choices'][0]['message']['content'].strip()
-                            print("✅ Answer analysis using A4F DeepSeek")
-                except Exception as e:
-                    print(f"⚠️ A4F failed: {e}, trying OpenRouter...")
-            
-            # Fallback to OpenRouter
-            if not result_text and OPENROUTER_API_KEY:
-                try:
-                    import httpx
-                    async with httpx.AsyncClient(timeout=30.0) as client_http:
-                        response = await client_http.post(
-                            "https://openrouter.ai/api/v1/chat/completions",
-                            headers={
-                                "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                                "HTTP-Referer": "http://localhost:3000",
-                                "X-Title": "AI Interview System"
-                            },
-                            json={
-                                "model": "deepseek/deepseek-chat",
-                                "messages": [
-                                    {"role": "system", "content": "You are an expert interviewer and answer analyzer. Identify loopholes, inconsistencies, and follow-up opportunities in candidate answers."},
-                                    {"role": "user", "content": prompt}
-                                ],
-                                "temperature": 0.3,
-                                "max_tokens": 1500
-                            }
-                        )
-                        if response.status_code == 200:
-                            result = response.json()
-                            result_text = result['choices'][0]['message']['content'].strip()
-                            print("✅ Answer analysis using OpenRouter DeepSeek")
-                except Exception as e:
-                    print(f"⚠️ OpenRouter failed: {e}, trying Groq...")
-            
-            # Final fallback to Groq
-            if not result_text:
-                completion = client.chat.completions.create(
-                    model="llama3-70b-8192",
-                    messages=[
-                        {"role": "system", "content": "You are an expert interviewer and answer analyzer. Identify loopholes, inconsistencies, and follow-up opportunities in candidate answers."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.3,
-                    max_tokens=1500
-                )
-                result_text = completion.choices[0].message.content.strip()
-                print("✅ Answer analysis using Groq Llama3")
+            # A4F DeepSeek → OpenRouter DeepSeek → Groq Llama3 (see llm_gateway.MODEL_POLICIES)
+            result_text = await llm_gateway.complete(
+                [
+                    {"role": "system", "content": "You are an expert interviewer and answer analyzer. Identify loopholes, inconsistencies, and follow-up opportunities in candidate answers."},
+                    {"role": "user", "content": prompt}
+                ],
+                'answer_analysis'
+            )
             
             # Clean JSON
             if '```json' in result_text:
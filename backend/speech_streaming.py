@@ -0,0 +1,255 @@
+"""
+Streaming Speech-to-Text
+Live transcription behind the /api/interview/speech-to-text/stream WebSocket:
+the browser sends MediaRecorder chunks while the candidate speaks, and partial
+transcripts flow back as they become available.
+
+Two back ends:
+- Deepgram live (preferred): audio is forwarded over Deepgram's streaming
+  socket with interim results on. Partials are the finalized segments plus
+  the current interim hypothesis. After the candidate stops, Deepgram flushes
+  the last segment within a few hundred milliseconds.
+- Chunked Groq Whisper (fallback): Whisper has no streaming API, so the
+  growing recording is re-transcribed every STT_PARTIAL_INTERVAL seconds for
+  partials (while it is under STT_PARTIAL_MAX_BYTES). The final transcript is
+  one pass over the whole clip.
+"""
+
+import os
+import json
+import time
+import asyncio
+import aiohttp
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import llm_gateway
+from speech_services import SpeechSessions, DEEPGRAM_BASE_URL
+
+DEEPGRAM_API_KEY = os.environ.get('DEEPGRAM_API_KEY')
+DEEPGRAM_LIVE_URL = (
+    DEEPGRAM_BASE_URL.replace('http', 'ws', 1) +
+    '/v1/listen?model=nova-2&punctuate=true&smart_format=true&language=en&interim_results=true&endpointing=300'
+)
+
+STT_STREAM_PROVIDER = os.environ.get('STT_STREAM_PROVIDER', 'auto').lower()  # auto | deepgram | groq
+STT_PARTIAL_INTERVAL = float(os.environ.get('STT_PARTIAL_INTERVAL', '1.5'))  # Seconds, Groq fallback
+STT_PARTIAL_MAX_BYTES = int(os.environ.get('STT_PARTIAL_MAX_BYTES', str(2 * 1024 * 1024)))
+STT_PARTIAL_MODEL = os.environ.get('STT_PARTIAL_MODEL', 'whisper-large-v3-turbo')
+STT_STREAM_MAX_BYTES = int(os.environ.get('STT_STREAM_MAX_BYTES', str(25 * 1024 * 1024)))  # Per answer
+STT_FINAL_TIMEOUT = float(os.environ.get('STT_FINAL_TIMEOUT', '10'))
+STT_STREAM_IDLE_TIMEOUT = float(os.environ.get('STT_STREAM_IDLE_TIMEOUT', '30'))  # Seconds without a client frame
+
+PartialCallback = Callable[[str], Awaitable[None]]
+
+
+class StreamingTranscriber(ABC):
+    """One live transcription: start(), feed() audio chunks, then finish()"""
+
+    provider = 'none'
+
+    def __init__(self, on_partial: PartialCallback):
+        self.on_partial = on_partial
+        self.received = 0
+        self._last_partial = ''
+
+    async def _emit(self, text: str):
+        text = text.strip()
+        if text and text != self._last_partial:
+            self._last_partial = text
+            await self.on_partial(text)
+
+    async def start(self):
+        pass
+
+    @abstractmethod
+    async def feed(self, chunk: bytes):
+        """Forward one chunk of the recording"""
+
+    @abstractmethod
+    async def finish(self) -> Dict[str, Any]:
+        """Final transcript, in the same shape as EnhancedSpeechToText.transcribe_audio"""
+
+    async def close(self):
+        pass
+
+
+class DeepgramLiveTranscriber(StreamingTranscriber):
+    """Forwards audio to Deepgram's live endpoint and relays interim results"""
+
+    provider = 'deepgram-live'
+
+    def __init__(self, on_partial: PartialCallback):
+        super().__init__(on_partial)
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._segments: List[str] = []
+        self._confidences: List[float] = []
+        self._words: List[Dict[str, Any]] = []
+
+    async def start(self):
+        self._ws = await SpeechSessions.get('deepgram-live').ws_connect(
+            DEEPGRAM_LIVE_URL,
+            headers={'Authorization': f'Token {DEEPGRAM_API_KEY}'},
+            heartbeat=20
+        )
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self):
+        async for message in self._ws:
+            if message.type != aiohttp.WSMsgType.TEXT:
+                if message.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    break
+                continue
+            data = json.loads(message.data)
+            if data.get('type') != 'Results':
+                continue
+            alternative = (data.get('channel', {}).get('alternatives') or [{}])[0]
+            text = alternative.get('transcript', '')
+            interim = ''
+            if data.get('is_final'):
+                if text:
+                    self._segments.append(text)
+                    self._confidences.append(alternative.get('confidence', 0.9))
+                    self._words.extend(alternative.get('words', []))
+            else:
+                interim = text
+            await self._emit(' '.join(self._segments + ([interim] if interim else [])))
+
+    async def feed(self, chunk: bytes):
+        self.received += len(chunk)
+        await self._ws.send_bytes(chunk)
+
+    async def finish(self) -> Dict[str, Any]:
+        # CloseStream makes Deepgram flush pending audio as final results, then close
+        await self._ws.send_str(json.dumps({'type': 'CloseStream'}))
+        await asyncio.wait_for(self._reader, STT_FINAL_TIMEOUT)
+        return {
+            'text': ' '.join(self._segments).strip(),
+            'confidence': sum(self._confidences) / len(self._confidences) if self._confidences else 0.9,
+            'provider': self.provider,
+            'words': self._words,
+            'success': True
+        }
+
+    async def close(self):
+        if self._reader is not None and not self._reader.done():
+            self._reader.cancel()
+        if self._ws is not None:
+            await self._ws.close()
+
+
+class ChunkedWhisperTranscriber(StreamingTranscriber):
+    """Periodically re-transcribes the recording so far with Groq Whisper"""
+
+    provider = 'groq-whisper-chunked'
+
+    def __init__(self, on_partial: PartialCallback):
+        super().__init__(on_partial)
+        # MediaRecorder chunks only carry the container header in the first one,
+        # so partials always transcribe the whole prefix
+        self._audio = bytearray()
+        self._pending = False
+        self._partials: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._partials = asyncio.create_task(self._partial_loop())
+
+    async def _transcribe(self, audio: bytes, model: str) -> str:
+        transcription = await llm_gateway.get_groq_client().audio.transcriptions.create(
+            file=('audio.webm', audio),
+            model=model,
+            language='en',
+            response_format='text'
+        )
+        return transcription if isinstance(transcription, str) else getattr(transcription, 'text', '')
+
+    async def _partial_loop(self):
+        while True:
+            await asyncio.sleep(STT_PARTIAL_INTERVAL)
+            if not self._pending or len(self._audio) > STT_PARTIAL_MAX_BYTES:
+                continue
+            self._pending = False
+            try:
+                await self._emit(await self._transcribe(bytes(self._audio), STT_PARTIAL_MODEL))
+            except Exception as e:
+                print(f"⚠️ Partial transcription failed: {e}")
+
+    async def feed(self, chunk: bytes):
+        self.received += len(chunk)
+        self._audio.extend(chunk)
+        self._pending = True
+
+    async def finish(self) -> Dict[str, Any]:
+        await self.close()
+        if not self._audio:
+            return {'text': '', 'confidence': 0.0, 'provider': self.provider, 'success': True}
+        text = await asyncio.wait_for(self._transcribe(bytes(self._audio), 'whisper-large-v3'), STT_FINAL_TIMEOUT)
+        return {'text': text.strip(), 'confidence': 0.92, 'provider': self.provider, 'success': True}
+
+    async def close(self):
+        if self._partials is not None and not self._partials.done():
+            self._partials.cancel()
+
+
+class StreamingSpeechToText:
+    """Picks a streaming back end and keeps per-provider metrics"""
+
+    _metrics = {
+        'sessions': 0,
+        'completed': 0,
+        'errors': 0,
+        'partials': 0,
+        'finalMs': 0.0,  # Stop message -> final transcript
+        'providers': {}
+    }
+
+    @staticmethod
+    def available() -> bool:
+        return StreamingSpeechToText._choose() is not None
+
+    @staticmethod
+    def _choose():
+        if STT_STREAM_PROVIDER in ('auto', 'deepgram') and DEEPGRAM_API_KEY:
+            return DeepgramLiveTranscriber
+        if STT_STREAM_PROVIDER in ('auto', 'groq') and llm_gateway.get_groq_client() is not None:
+            return ChunkedWhisperTranscriber
+        return None
+
+    @staticmethod
+    def create(on_partial: PartialCallback) -> Optional[StreamingTranscriber]:
+        """New transcriber, or None when no streaming-capable provider is configured"""
+        transcriber_class = StreamingSpeechToText._choose()
+        if transcriber_class is None:
+            return None
+
+        async def counted(text: str):
+            StreamingSpeechToText._metrics['partials'] += 1
+            await on_partial(text)
+
+        StreamingSpeechToText._metrics['sessions'] += 1
+        providers = StreamingSpeechToText._metrics['providers']
+        providers[transcriber_class.provider] = providers.get(transcriber_class.provider, 0) + 1
+        return transcriber_class(counted)
+
+    @staticmethod
+    async def finish(transcriber: StreamingTranscriber) -> Dict[str, Any]:
+        """transcriber.finish() with latency/error accounting"""
+        started = time.perf_counter()
+        try:
+            result = await transcriber.finish()
+        except Exception as e:
+            StreamingSpeechToText._metrics['errors'] += 1
+            return {'text': '', 'confidence': 0.0, 'provider': transcriber.provider, 'success': False, 'error': str(e) or type(e).__name__}
+        StreamingSpeechToText._metrics['completed'] += 1
+        StreamingSpeechToText._metrics['finalMs'] += (time.perf_counter() - started) * 1000
+        return result
+
+    @staticmethod
+    def get_metrics() -> Dict[str, Any]:
+        metrics = dict(StreamingSpeechToText._metrics)
+        metrics['providers'] = dict(metrics['providers'])
+        completed = metrics['completed']
+        metrics['avgFinalMs'] = round(metrics.pop('finalMs') / completed, 1) if completed else 0.0
+        metrics['provider'] = getattr(StreamingSpeechToText._choose(), 'provider', None)
+        return metrics
@@ -0,0 +1,478 @@
+"""
+Text-to-Speech Service
+ElevenLabs synthesis on a pooled, persistent async client, fronted by a
+content-addressed audio cache.
+
+Cache keys are the SHA-256 of (voice_id, model_id, voice settings, text), so
+the templated intro and fallback questions are synthesized once and then
+served from local disk. The cache is an LRU bounded by total bytes
+(TTS_CACHE_MAX_MB); files are written atomically, so several workers can
+share one TTS_CACHE_DIR. Each worker keeps its own index and evicts only
+what it knows about - the cap is per worker, not global.
+
+Question audio is pre-synthesized: next-question starts synthesis in the
+background as soon as the text exists and hands the client an audio handle
+(the clip's cache key) to fetch from /api/interview/audio/{handle}.
+
+Streaming mode splits the text on sentence boundaries and pipes each
+sentence's audio from ElevenLabs' streaming endpoint as chunks arrive, while
+the next sentence is already being synthesized - the first sentence plays
+before the last one exists. Sentences are cached individually.
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import tempfile
+import httpx
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+ELEVENLABS_API_KEY = os.environ.get('ELEVENLABS_API_KEY')
+ELEVENLABS_URL = 'https://api.elevenlabs.io/v1'
+
+TTS_VOICE_ID = os.environ.get('TTS_VOICE_ID', '21m00Tcm4TlvDq8ikWAM')
+TTS_MODEL_ID = os.environ.get('TTS_MODEL_ID', 'eleven_monolingual_v1')
+TTS_VOICE_SETTINGS = {'stability': 0.5, 'similarity_boost': 0.5}
+TTS_TIMEOUT = float(os.environ.get('TTS_TIMEOUT', '30'))
+TTS_MAX_CONNECTIONS = int(os.environ.get('TTS_MAX_CONNECTIONS', '10'))
+
+# Start question audio as soon as the text exists (next-question returns an audio handle)
+TTS_PRESYNTHESIZE = os.environ.get('TTS_PRESYNTHESIZE', 'true').lower() == 'true'
+TTS_HANDLE_MAX = int(os.environ.get('TTS_HANDLE_MAX', '2000'))
+# Without the disk cache, finished clips wait in memory until their handle is fetched
+TTS_READY_MAX = int(os.environ.get('TTS_READY_MAX', '64'))
+
+# Streaming mode: sentences synthesized ahead of the one currently being sent
+TTS_STREAM_LOOKAHEAD = int(os.environ.get('TTS_STREAM_LOOKAHEAD', '1'))
+TTS_MIN_SENTENCE_CHARS = 40  # Shorter sentences are merged with the next one
+STREAM_CHUNK_SIZE = 16 * 1024
+
+TTS_CACHE = os.environ.get('TTS_CACHE', 'true').lower() == 'true'
+TTS_CACHE_DIR = os.environ.get('TTS_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'interview_tts_cache'))
+TTS_CACHE_MAX_MB = float(os.environ.get('TTS_CACHE_MAX_MB', '256'))
+
+
+class TTSError(Exception):
+    """Raised when the speech provider fails or is not configured"""
+
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+|(?<=[.!?]["\')\]])\s+')
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split on sentence boundaries, merging fragments too short to be worth a request"""
+    sentences = []
+    for part in _SENTENCE_END.split(text.strip()):
+        part = part.strip()
+        if not part:
+            continue
+        if sentences and len(sentences[-1]) < TTS_MIN_SENTENCE_CHARS:
+            sentences[-1] = f"{sentences[-1]} {part}"
+        else:
+            sentences.append(part)
+    return sentences
+
+
+class AudioCache:
+    """Disk-backed LRU of synthesized audio, bounded by total size"""
+
+    _index: 'OrderedDict[str, int]' = OrderedDict()  # key -> size in bytes, least recent first
+    _bytes = 0
+    _loaded = False
+    _load_lock = asyncio.Lock()  # Callers during the first load wait for it
+
+    @staticmethod
+    def key(text: str, voice_id: str, model_id: str, settings: Dict[str, Any]) -> str:
+        material = json.dumps([voice_id, model_id, settings, text], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _path(key: str) -> str:
+        return os.path.join(TTS_CACHE_DIR, key[:2], f"{key}.mp3")
+
+    @staticmethod
+    def _scan() -> List[Tuple[str, int]]:
+        """(key, size) of every cached clip, oldest first (mtime is bumped on every hit); runs in a thread"""
+        entries = []
+        for root, _, files in os.walk(TTS_CACHE_DIR):
+            for name in files:
+                if not name.endswith('.mp3'):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        return [(key, size) for _, key, size in sorted(entries)]
+
+    @staticmethod
+    async def _ensure_loaded():
+        """Rebuild the index from disk once; the index is only ever touched on the event loop"""
+        if AudioCache._loaded:
+            return
+        async with AudioCache._load_lock:
+            if AudioCache._loaded:
+                return
+            entries = await asyncio.to_thread(AudioCache._scan)
+            # Anything already indexed is more recent than the disk scan - keep it last
+            recent = AudioCache._index
+            AudioCache._index = OrderedDict((key, size) for key, size in entries if key not in recent)
+            AudioCache._index.update(recent)
+            AudioCache._bytes = sum(AudioCache._index.values())
+            AudioCache._loaded = True
+            if entries:
+                print(f"🔊 TTS cache: {len(entries)} clips ({AudioCache._bytes / 1e6:.1f} MB) in {TTS_CACHE_DIR}")
+        await AudioCache._evict()
+
+    @staticmethod
+    def _read(key: str) -> Optional[bytes]:
+        path = AudioCache._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except OSError:
+            return None
+
+    @staticmethod
+    def _write(key: str, audio: bytes):
+        path = AudioCache._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _unlink(keys: List[str]):
+        for key in keys:
+            try:
+                os.unlink(AudioCache._path(key))
+            except OSError:
+                pass
+
+    @staticmethod
+    async def _evict():
+        limit = TTS_CACHE_MAX_MB * 1024 * 1024
+        evicted = []
+        while AudioCache._bytes > limit and AudioCache._index:
+            key, size = AudioCache._index.popitem(last=False)
+            AudioCache._bytes -= size
+            evicted.append(key)
+        if evicted:
+            await asyncio.to_thread(AudioCache._unlink, evicted)
+
+    @staticmethod
+    async def get(key: str) -> Optional[bytes]:
+        if not TTS_CACHE:
+            return None
+        await AudioCache._ensure_loaded()
+        audio = await asyncio.to_thread(AudioCache._read, key)
+        if audio is None:
+            if key in AudioCache._index:
+                AudioCache._bytes -= AudioCache._index.pop(key)
+            return None
+        if key not in AudioCache._index:
+            # Written by another worker sharing the directory
+            AudioCache._bytes += len(audio)
+        AudioCache._index[key] = len(audio)
+        AudioCache._index.move_to_end(key)
+        return audio
+
+    @staticmethod
+    async def put(key: str, audio: bytes):
+        if not TTS_CACHE or not audio:
+            return
+        await AudioCache._ensure_loaded()
+        try:
+            await asyncio.to_thread(AudioCache._write, key, audio)
+        except OSError as e:
+            print(f"⚠️ TTS cache write failed: {e}")
+            return
+        AudioCache._bytes += len(audio) - AudioCache._index.get(key, 0)
+        AudioCache._index[key] = len(audio)
+        AudioCache._index.move_to_end(key)
+        await AudioCache._evict()
+
+
+# Pooled ElevenLabs client (keep-alive across requests)
+elevenlabs_client = None
+if ELEVENLABS_API_KEY:
+    elevenlabs_client = httpx.AsyncClient(
+        base_url=ELEVENLABS_URL,
+        headers={'xi-api-key': ELEVENLABS_API_KEY, 'Accept': 'audio/mpeg'},
+        limits=httpx.Limits(
+            max_connections=TTS_MAX_CONNECTIONS,
+            max_keepalive_connections=TTS_MAX_CONNECTIONS,
+            keepalive_expiry=60.0
+        ),
+        timeout=httpx.Timeout(TTS_TIMEOUT, connect=5.0)
+    )
+
+
+class TTSService:
+    """Cached, coalesced ElevenLabs synthesis"""
+
+    _inflight: Dict[str, asyncio.Future] = {}
+    _handles: 'OrderedDict[str, str]' = OrderedDict()  # audio handle -> text, for re-synthesis after eviction
+    _tasks: set = set()  # Background pre-synthesis (strong references until done)
+    _ready: 'OrderedDict[str, bytes]' = OrderedDict()  # handle -> audio not yet fetched (TTS_CACHE off only)
+
+    _metrics = {
+        'cacheHits': 0,
+        'misses': 0,
+        'coalesced': 0,   # Concurrent requests for the same clip that shared one synthesis
+        'presynthesized': 0,
+        'handleWaits': 0,  # Audio requested while its pre-synthesis was still running
+        'errors': 0,
+        'streams': 0,
+        'providerMs': 0.0,
+        'firstChunkMs': 0.0
+    }
+
+    @staticmethod
+    def configured() -> bool:
+        return elevenlabs_client is not None
+
+    @staticmethod
+    def cache_key(text: str, voice_id: Optional[str] = None) -> str:
+        return AudioCache.key(text, voice_id or TTS_VOICE_ID, TTS_MODEL_ID, TTS_VOICE_SETTINGS)
+
+    @staticmethod
+    async def _fetch(text: str, voice_id: str) -> bytes:
+        started = time.perf_counter()
+        try:
+            response = await elevenlabs_client.post(
+                f"/text-to-speech/{voice_id}",
+                json={'text': text, 'model_id': TTS_MODEL_ID, 'voice_settings': TTS_VOICE_SETTINGS}
+            )
+        except httpx.HTTPError as e:
+            raise TTSError(f"ElevenLabs request failed: {e}") from e
+        finally:
+            TTSService._metrics['providerMs'] += (time.perf_counter() - started) * 1000
+        if response.status_code != 200:
+            raise TTSError(f"ElevenLabs API error: {response.status_code}")
+        return response.content
+
+    @staticmethod
+    async def synthesize(text: str, voice_id: Optional[str] = None) -> bytes:
+        """MP3 audio for text, from the cache when this exact clip was synthesized before"""
+        if not TTSService.configured():
+            raise TTSError("ElevenLabs API key not configured")
+        voice_id = voice_id or TTS_VOICE_ID
+        key = TTSService.cache_key(text, voice_id)
+
+        pending = TTSService._inflight.get(key)
+        if pending is not None:
+            TTSService._metrics['coalesced'] += 1
+            return await asyncio.shield(pending)
+
+        # Registered before the first await so concurrent callers always coalesce
+        future = asyncio.get_running_loop().create_future()
+        TTSService._inflight[key] = future
+        try:
+            audio = await AudioCache.get(key)
+            if audio is not None:
+                TTSService._metrics['cacheHits'] += 1
+            else:
+                TTSService._metrics['misses'] += 1
+                audio = await TTSService._fetch(text, voice_id)
+                await AudioCache.put(key, audio)
+            future.set_result(audio)
+            return audio
+        except BaseException as e:
+            TTSService._metrics['errors'] += 1
+            future.set_exception(e if isinstance(e, Exception) else TTSError("Synthesis cancelled"))
+            future.exception()  # Mark retrieved so an unawaited failure isn't logged
+            raise
+        finally:
+            TTSService._inflight.pop(key, None)
+
+    @staticmethod
+    def presynthesize(text: str) -> Optional[str]:
+        """
+        Start synthesizing text in the background and return its audio handle
+
+        The handle is the clip's cache key; audio_for_handle() serves it once
+        ready, or waits for the synthesis still in flight. Returns None when
+        TTS is unavailable or pre-synthesis is disabled.
+        """
+        if not text or not TTS_PRESYNTHESIZE or not TTSService.configured():
+            return None
+        handle = TTSService.cache_key(text)
+        TTSService._handles[handle] = text
+        TTSService._handles.move_to_end(handle)
+        while len(TTSService._handles) > TTS_HANDLE_MAX:
+            TTSService._handles.popitem(last=False)
+
+        if handle not in TTSService._inflight:
+            TTSService._metrics['presynthesized'] += 1
+            task = asyncio.create_task(TTSService._presynthesize(text))
+            TTSService._tasks.add(task)
+            task.add_done_callback(TTSService._tasks.discard)
+        return handle
+
+    @staticmethod
+    async def _presynthesize(text: str):
+        try:
+            audio = await TTSService.synthesize(text)
+        except Exception as e:
+            print(f"⚠️ Question audio pre-synthesis failed: {e}")
+            return
+        if not TTS_CACHE:
+            # Nowhere else to serve it from - a later fetch would pay for a second synthesis
+            handle = TTSService.cache_key(text)
+            TTSService._ready[handle] = audio
+            TTSService._ready.move_to_end(handle)
+            while len(TTSService._ready) > TTS_READY_MAX:
+                TTSService._ready.popitem(last=False)
+
+    @staticmethod
+    async def audio_for_handle(handle: str) -> Optional[bytes]:
+        """Audio for a presynthesize() handle, or None if the handle is unknown here"""
+        if len(handle) != 64 or any(c not in '0123456789abcdef' for c in handle):
+            return None
+        pending = TTSService._inflight.get(handle)
+        if pending is not None:
+            TTSService._metrics['handleWaits'] += 1
+            audio = await asyncio.shield(pending)
+            TTSService._ready.pop(handle, None)  # Stored as the synthesis finished; served now
+            return audio
+
+        audio = TTSService._ready.pop(handle, None)
+        if audio is not None:
+            TTSService._metrics['cacheHits'] += 1
+            return audio
+        text = TTSService._handles.get(handle)
+        if text is not None:
+            return await TTSService.synthesize(text)
+        # Issued by another worker: only servable if it reached the shared disk cache
+        audio = await AudioCache.get(handle)
+        if audio is not None:
+            TTSService._metrics['cacheHits'] += 1
+        return audio
+
+    @staticmethod
+    async def _stream_sentence(sentence: str, voice_id: str, queue: asyncio.Queue):
+        """Push one sentence's audio chunks onto queue, then None (or the error)"""
+        key = TTSService.cache_key(sentence, voice_id)
+        try:
+            audio = await AudioCache.get(key)
+            if audio is not None:
+                TTSService._metrics['cacheHits'] += 1
+                await queue.put(audio)
+                await queue.put(None)
+                return
+
+            TTSService._metrics['misses'] += 1
+            started = time.perf_counter()
+            parts = []
+            try:
+                async with elevenlabs_client.stream(
+                    'POST', f"/text-to-speech/{voice_id}/stream",
+                    json={'text': sentence, 'model_id': TTS_MODEL_ID, 'voice_settings': TTS_VOICE_SETTINGS}
+                ) as response:
+                    if response.status_code != 200:
+                        raise TTSError(f"ElevenLabs API error: {response.status_code}")
+                    async for chunk in response.aiter_bytes():
+                        parts.append(chunk)
+                        await queue.put(chunk)
+            except httpx.HTTPError as e:
+                raise TTSError(f"ElevenLabs request failed: {e}") from e
+            finally:
+                TTSService._metrics['providerMs'] += (time.perf_counter() - started) * 1000
+            await AudioCache.put(key, b''.join(parts))
+            await queue.put(None)
+        except Exception as e:
+            TTSService._metrics['errors'] += 1
+            await queue.put(e)
+
+    @staticmethod
+    async def stream(text: str, voice_id: Optional[str] = None) -> AsyncIterator[bytes]:
+        """
+        MP3 audio for text as it is synthesized, sentence by sentence
+
+        Up to TTS_STREAM_LOOKAHEAD following sentences are synthesized while the
+        current one streams. Raises TTSError if a sentence fails (callers should
+        pull the first chunk before committing to a response).
+        """
+        if not TTSService.configured():
+            raise TTSError("ElevenLabs API key not configured")
+        voice_id = voice_id or TTS_VOICE_ID
+        TTSService._metrics['streams'] += 1
+        started = time.perf_counter()
+
+        # The whole clip may already exist (e.g. pre-synthesized question audio)
+        audio = await AudioCache.get(TTSService.cache_key(text, voice_id))
+        if audio is not None:
+            TTSService._metrics['cacheHits'] += 1
+            TTSService._metrics['firstChunkMs'] += (time.perf_counter() - started) * 1000
+            for offset in range(0, len(audio), STREAM_CHUNK_SIZE):
+                yield audio[offset:offset + STREAM_CHUNK_SIZE]
+            return
+
+        sentences = split_sentences(text)
+        queues: List[asyncio.Queue] = []
+        tasks: List[asyncio.Task] = []
+
+        def start_next():
+            queue = asyncio.Queue()
+            queues.append(queue)
+            tasks.append(asyncio.create_task(TTSService._stream_sentence(sentences[len(tasks)], voice_id, queue)))
+
+        try:
+            for _ in range(min(len(sentences), TTS_STREAM_LOOKAHEAD + 1)):
+                start_next()
+            first = True
+            for index in range(len(sentences)):
+                while True:
+                    item = await queues[index].get()
+                    if item is None:
+                        break
+                    if isinstance(item, Exception):
+                        raise item if isinstance(item, TTSError) else TTSError(str(item))
+                    if first:
+                        TTSService._metrics['firstChunkMs'] += (time.perf_counter() - started) * 1000
+                        first = False
+                    yield item
+                if len(tasks) < len(sentences):
+                    start_next()
+        finally:
+            # Client went away or a sentence failed: stop synthesizing the rest
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def get_metrics() -> Dict[str, Any]:
+        metrics = dict(TTSService._metrics)
+        requests = metrics['cacheHits'] + metrics['misses']
+        metrics['hitRate'] = round(metrics['cacheHits'] / requests, 3) if requests else 0.0
+        metrics['avgProviderMs'] = round(metrics.pop('providerMs') / metrics['misses'], 1) if metrics['misses'] else 0.0
+        metrics['avgFirstChunkMs'] = round(metrics.pop('firstChunkMs') / metrics['streams'], 1) if metrics['streams'] else 0.0
+        metrics['cachedClips'] = len(AudioCache._index)
+        metrics['cacheMB'] = round(AudioCache._bytes / 1e6, 2)
+        metrics['cacheEnabled'] = TTS_CACHE
+        metrics['pendingPresynthesis'] = len(TTSService._tasks)
+        metrics['readyClips'] = len(TTSService._ready)
+        return metrics
+
+
+async def aclose():
+    """Close the pooled ElevenLabs connection (called on app shutdown)"""
+    try:
+        if elevenlabs_client is not None:
+            await elevenlabs_client.aclose()
+    except Exception as e:
+        print(f"⚠️ Error closing TTS client: {e}")
@@ -0,0 +1,319 @@
+"""
+Per-User Performance Rollups
+Materialized dashboard statistics in the user_stats collection (one document
+per user, _id = user id), so /api/interviews/performance-stats is a single
+point read no matter how many interviews the user has.
+
+The rollup holds running sums and counts per score dimension, recommendation
+counters, strength/improvement keyword counts, per-day buckets for the
+30-day trend and a capped list of recent interviews. submit_interview applies
+each completed interview with one $inc/$push; anything that rewrites history
+(re-submission, demo data, clearing data) drops the rollup and the next read
+rebuilds it.
+
+A rebuild races with submits: it only replaces a rollup whose `rev` (bumped
+by every $inc) is unchanged since before it aggregated, otherwise it retries,
+and an interview already among the rebuilt `recent` entries isn't applied
+again.
+
+Rebuilds run as a single aggregation inside MongoDB ($match on the
+(createdBy, status, completedAt) index, $project down to scores,
+recommendation, dates and keywords, then one $facet per statistic), so
+only a few kilobytes of results cross the wire however long the history is.
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+STATS_COLLECTION = 'user_stats'
+ROLLUP_VERSION = 1  # Bump when the document shape changes - old rollups are rebuilt
+
+SCORE_KEYS = ['overall', 'communication', 'technical', 'problemSolving', 'behavioral', 'cultural']
+RECOMMENDATIONS = ['STRONG_HIRE', 'HIRE', 'MAYBE', 'NO_HIRE']
+RECENT_LIMIT = 10
+TREND_DAYS = 30
+REBUILD_ATTEMPTS = 3
+
+# Fields a rollup needs from an interview document (transcripts are never read)
+INTERVIEW_PROJECTION = {
+    '_id': 0, 'interviewId': 1, 'candidateName': 1, 'targetRole': 1, 'completedAt': 1,
+    'scores': '$feedback.scores',
+    'recommendation': {'$ifNull': ['$feedback.recommendation', 'MAYBE']},
+    'strengths': '$feedback.strengths',
+    'improvements': '$feedback.improvements'
+}
+
+
+def _field_name(word: str) -> str:
+    # Field names can't contain dots or start with $
+    return word.replace('.', '').lstrip('$')
+
+
+def _keywords(items: Iterable[str]) -> Counter:
+    """First three words of each strength/improvement (split like $split in stats_pipeline)"""
+    words = Counter()
+    for item in items or []:
+        if not isinstance(item, str):
+            continue
+        for word in item.lower().split(' ')[:3]:
+            word = _field_name(word)
+            if word:
+                words[word] += 1
+    return words
+
+
+def _day(value: Optional[datetime]) -> Optional[str]:
+    return value.strftime('%Y-%m-%d') if isinstance(value, datetime) else None
+
+
+def _keyword_facet(field: str):
+    """Per-word counts of the first three words of each entry in an array field"""
+    return [
+        {'$unwind': f'${field}'},
+        {'$match': {field: {'$type': 'string'}}},
+        {'$project': {'words': {'$slice': [{'$split': [{'$toLower': f'${field}'}, ' ']}, 3]}}},
+        {'$unwind': '$words'},
+        {'$match': {'words': {'$ne': ''}}},
+        {'$group': {'_id': '$words', 'count': {'$sum': 1}}}
+    ]
+
+
+def stats_pipeline(user_id: str, trend_start: datetime):
+    """Aggregation computing every rollup field for one user's completed interviews"""
+    numeric = {key: {'$isNumber': f'$scores.{key}'} for key in SCORE_KEYS}
+    totals = {'_id': None, 'count': {'$sum': 1}}
+    for key in SCORE_KEYS:
+        totals[f'sum_{key}'] = {'$sum': {'$cond': [numeric[key], f'$scores.{key}', 0]}}
+        totals[f'count_{key}'] = {'$sum': {'$cond': [numeric[key], 1, 0]}}
+
+    return [
+        {'$match': {'createdBy': user_id, 'status': 'completed'}},
+        {'$project': INTERVIEW_PROJECTION},
+        {'$facet': {
+            'totals': [{'$group': totals}],
+            'recommendations': [{'$group': {'_id': '$recommendation', 'count': {'$sum': 1}}}],
+            'daily': [
+                {'$match': {'completedAt': {'$gte': trend_start}}},
+                {'$group': {
+                    '_id': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$completedAt'}},
+                    'count': {'$sum': 1},
+                    'overallSum': {'$sum': {'$ifNull': ['$scores.overall', 0]}}
+                }}
+            ],
+            'recent': [
+                {'$sort': {'completedAt': -1}},
+                {'$limit': RECENT_LIMIT},
+                {'$project': {
+                    'interviewId': 1, 'candidateName': 1, 'targetRole': 1, 'completedAt': 1,
+                    'recommendation': 1, 'overallScore': {'$ifNull': ['$scores.overall', 0]}
+                }}
+            ],
+            'strengthWords': _keyword_facet('strengths'),
+            'improvementWords': _keyword_facet('improvements')
+        }}
+    ]
+
+
+class UserStats:
+    """Incrementally maintained performance statistics per user"""
+
+    @staticmethod
+    def _increments(interview: Dict[str, Any]) -> Dict[str, int]:
+        """Flat $inc document for one completed interview"""
+        feedback = interview.get('feedback') or {}
+        scores = feedback.get('scores') or {}
+        inc = {'count': 1}
+        for key in SCORE_KEYS:
+            if isinstance(scores.get(key), (int, float)):
+                inc[f'scoreSums.{key}'] = scores[key]
+                inc[f'scoreCounts.{key}'] = 1
+        inc[f"recommendations.{_field_name(str(feedback.get('recommendation', 'MAYBE')))}"] = 1
+        for word, count in _keywords(feedback.get('strengths')).items():
+            inc[f'strengthWords.{word}'] = count
+        for word, count in _keywords(feedback.get('improvements')).items():
+            inc[f'improvementWords.{word}'] = count
+        day = _day(interview.get('completedAt'))
+        if day:
+            inc[f'daily.{day}.count'] = 1
+            inc[f'daily.{day}.overallSum'] = scores.get('overall', 0) or 0
+        return inc
+
+    @staticmethod
+    def _recent_entry(interview: Dict[str, Any]) -> Dict[str, Any]:
+        feedback = interview.get('feedback') or {}
+        return {
+            'interviewId': interview.get('interviewId'),
+            'candidateName': interview.get('candidateName'),
+            'targetRole': interview.get('targetRole'),
+            'overallScore': (feedback.get('scores') or {}).get('overall', 0),
+            'recommendation': feedback.get('recommendation', 'MAYBE'),
+            'completedAt': interview.get('completedAt')
+        }
+
+    @staticmethod
+    async def record_interview(db, user_id: str, interview: Dict[str, Any]) -> bool:
+        """
+        Apply one newly completed interview to the user's rollup
+
+        Only updates an existing rollup - a user without one gets it built from
+        their interviews on the next read, which already includes this one. So
+        does a rollup rebuilt after the interview completed, which then lists
+        it in `recent` (it is the newest completion) and is skipped here.
+        """
+        query = {'_id': user_id, 'version': ROLLUP_VERSION}
+        if interview.get('interviewId'):
+            query['recent.interviewId'] = {'$ne': interview['interviewId']}
+        result = await db[STATS_COLLECTION].update_one(
+            query,
+            {
+                '$inc': {**UserStats._increments(interview), 'rev': 1},
+                '$push': {'recent': {
+                    '$each': [UserStats._recent_entry(interview)],
+                    '$sort': {'completedAt': -1},
+                    '$slice': RECENT_LIMIT
+                }},
+                '$set': {'updatedAt': datetime.utcnow()}
+            }
+        )
+        return result.matched_count > 0
+
+    @staticmethod
+    async def invalidate(db, user_id: str):
+        """Drop the rollup; the next read rebuilds it"""
+        await db[STATS_COLLECTION].delete_one({'_id': user_id})
+
+    @staticmethod
+    async def rebuild(db, user_id: str) -> Dict[str, Any]:
+        """
+        Recompute the rollup from the user's completed interviews and store it
+
+        Compare-and-swap on `rev`: a submit landing between the aggregation and
+        the write bumps it, so the write misses and the rebuild starts over
+        rather than dropping that interview.
+        """
+        collection = db[STATS_COLLECTION]
+        for _ in range(REBUILD_ATTEMPTS):
+            current = await collection.find_one({'_id': user_id}, {'rev': 1})
+            doc = await UserStats._aggregate(db, user_id)
+            try:
+                if current is None:
+                    # Fails if another rebuild created it meanwhile
+                    await collection.insert_one({**doc, 'rev': 0})
+                    return doc
+                doc['rev'] = current.get('rev', 0) + 1
+                result = await collection.replace_one({'_id': user_id, 'rev': current.get('rev')}, doc)
+                if result.matched_count:
+                    return doc
+            except DuplicateKeyError:
+                pass
+        # Still contended - serve this aggregate and leave the stored rollup to the next read
+        print(f"⚠️ Performance rollup for user {user_id} changed during every rebuild attempt")
+        return doc
+
+    @staticmethod
+    async def _aggregate(db, user_id: str) -> Dict[str, Any]:
+        """The rollup document, computed from the user's completed interviews (aggregated in MongoDB)"""
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        trend_start = today - timedelta(days=TREND_DAYS)
+        results = await db.interviews.aggregate(stats_pipeline(user_id, trend_start)).to_list(1)
+        facets = results[0] if results else {}
+
+        totals = (facets.get('totals') or [{}])[0]
+        doc = {
+            '_id': user_id,
+            'version': ROLLUP_VERSION,
+            'count': totals.get('count', 0),
+            'scoreSums': {key: totals[f'sum_{key}'] for key in SCORE_KEYS if totals.get(f'count_{key}')},
+            'scoreCounts': {key: totals[f'count_{key}'] for key in SCORE_KEYS if totals.get(f'count_{key}')},
+            'recommendations': {_field_name(str(r['_id'])): r['count'] for r in facets.get('recommendations', [])},
+            'daily': {d['_id']: {'count': d['count'], 'overallSum': d['overallSum']} for d in facets.get('daily', []) if d['_id']},
+            'recent': [
+                {
+                    'interviewId': r.get('interviewId'),
+                    'candidateName': r.get('candidateName'),
+                    'targetRole': r.get('targetRole'),
+                    'overallScore': r.get('overallScore', 0),
+                    'recommendation': r.get('recommendation', 'MAYBE'),
+                    'completedAt': r.get('completedAt')
+                }
+                for r in facets.get('recent', [])
+            ],
+            'updatedAt': datetime.utcnow()
+        }
+        for facet in ('strengthWords', 'improvementWords'):
+            words = Counter()
+            for w in facets.get(facet, []):
+                name = _field_name(w['_id'])
+                if name:
+                    words[name] += w['count']
+            doc[facet] = dict(words)
+        return doc
+
+    @staticmethod
+    async def get(db, user_id: str, rebuild: bool = False) -> Dict[str, Any]:
+        """Dashboard statistics for a user (point read, rebuilt when missing or on request)"""
+        doc = None if rebuild else await db[STATS_COLLECTION].find_one({'_id': user_id})
+        if doc is None or doc.get('version') != ROLLUP_VERSION:
+            print(f"📊 Building performance rollup for user {user_id}")
+            doc = await UserStats.rebuild(db, user_id)
+
+        cutoff = _day(datetime.utcnow() - timedelta(days=TREND_DAYS))
+        expired = [day for day in doc.get('daily', {}) if day < cutoff]
+        if expired:
+            await db[STATS_COLLECTION].update_one(
+                {'_id': user_id}, {'$unset': {f'daily.{day}': '' for day in expired}}
+            )
+        return UserStats.to_response(doc, cutoff)
+
+    @staticmethod
+    def to_response(doc: Dict[str, Any], cutoff: str) -> Dict[str, Any]:
+        """Rollup document -> performance-stats response"""
+        total = doc.get('count', 0)
+        if not total:
+            return {
+                "totalInterviews": 0,
+                "averageScores": {},
+                "recommendations": {},
+                "trends": [],
+                "topStrengths": [],
+                "commonImprovements": [],
+                "recentInterviews": []
+            }
+
+        sums, counts = doc.get('scoreSums', {}), doc.get('scoreCounts', {})
+        average_scores = {
+            key: round(sums.get(key, 0) / counts[key], 1) if counts.get(key) else 0
+            for key in SCORE_KEYS
+        }
+        recommendations = {rec: doc.get('recommendations', {}).get(rec, 0) for rec in RECOMMENDATIONS}
+
+        def top_words(words: Dict[str, int]):
+            return [word for word, _ in Counter(words).most_common(10) if len(word) > 4][:5]
+
+        recent_days = [bucket for day, bucket in doc.get('daily', {}).items() if day >= cutoff]
+        recent_count = sum(bucket.get('count', 0) for bucket in recent_days)
+        trends = {
+            'last30Days': recent_count,
+            'averageScoreTrend': round(sum(bucket.get('overallSum', 0) for bucket in recent_days) / recent_count, 1) if recent_count else 0
+        }
+
+        return {
+            "totalInterviews": total,
+            "averageScores": average_scores,
+            "recommendations": recommendations,
+            "trends": trends,
+            "topStrengths": top_words(doc.get('strengthWords', {})),
+            "commonImprovements": top_words(doc.get('improvementWords', {})),
+            "recentInterviews": [
+                {**entry, 'completedAt': entry['completedAt'].isoformat() if entry.get('completedAt') else None}
+                for entry in doc.get('recent', [])
+            ],
+            "summary": {
+                "strongHireRate": round(recommendations['STRONG_HIRE'] / total * 100, 1),
+                "hireRate": round((recommendations['STRONG_HIRE'] + recommendations['HIRE']) / total * 100, 1),
+                "averageOverallScore": average_scores.get('overall', 0)
+            }
+        }
@@ -30,8 +30,10 @@ const AIInterviewSession = () => {
   const audioRef = useRef(null);
   const isSpeakingRef = useRef(false);
   const lastSpokenTextRef = useRef('');
+  const sessionTurnRef = useRef(null);
   const mediaRecorderRef = useRef(null);
   const audioChunksRef = useRef([]);
+  const transcriptSocketRef = useRef(null);
   
   // State
   const [interviewData, setInterviewData] = useState(null);
@@ -135,7 +137,7 @@ const AIInterviewSession = () => {
     setCurrentQuestion(firstQuestion.question);
     
     // Convert to speech and play
-    await speakQuestion(firstQuestion.question);
+    await speakQuestion(firstQuestion.question, firstQuestion.audioHandle);
     setAiAvatarState('listening');
   };
 
@@ -149,30 +151,48 @@ const AIInterviewSession = () => {
         return { question: "Can you tell me about yourself and your background?" };
       }
 
-      const response = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/interview/next-question`, {
+      const fullRequest = {
+        interviewId: interviewId,
+        section: getCurrentSection(),
+        previousAnswer: previousAnswer || "",
+        resumeData: dataToUse?.extractedData || {},
+        conversationHistory: conversationHistory || [],
+        candidateInfo: {
+          name: dataToUse?.candidateName || "Candidate",
+          role: dataToUse?.targetRole || "software-engineer",
+          experience: dataToUse?.experienceLevel || "mid-level",
+          skills: dataToUse?.skills || [],
+          projects: dataToUse?.projects || []
+        }
+      };
+      // The server keeps the conversation, so later turns only send the new answer
+      const deltaRequest = {
+        interviewId: interviewId,
+        section: fullRequest.section,
+        previousAnswer: fullRequest.previousAnswer,
+        turn: sessionTurnRef.current
+      };
+
+      const postQuestion = (body) => fetch(`${process.env.REACT_APP_BACKEND_URL}/api/interview/next-question`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
           'Authorization': `Bearer ${localStorage.getItem('token')}`
         },
-        body: JSON.stringify({
-          interviewId: interviewId,
-          section: getCurrentSection(),
-          previousAnswer: previousAnswer || "",
-          resumeData: dataToUse?.extractedData || {},
-          conversationHistory: conversationHistory || [],
-          candidateInfo: {
-            name: dataToUse?.candidateName || "Candidate",
-            role: dataToUse?.targetRole || "software-engineer",
-            experience: dataToUse?.experienceLevel || "mid-level",
-            skills: dataToUse?.skills || [],
-            projects: dataToUse?.projects || []
-          }
-        })
+        body: JSON.stringify(body)
       });
 
+      const canSendDelta = previousAnswer && sessionTurnRef.current !== null;
+      let response = await postQuestion(canSendDelta ? deltaRequest : fullRequest);
+      if (response.status === 409) {
+        // Server lost the session (restart/expiry) - resend the full conversation
+        response = await postQuestion(fullRequest);
+      }
+
       if (response.ok) {
-        return await response.json();
+        const data = await response.json();
+        sessionTurnRef.current = data.turn ?? null;
+        return data;
       }
       throw new Error('Failed to get next question');
     } catch (error) {
@@ -190,7 +210,7 @@ const AIInterviewSession = () => {
     return 'closing';
   };
 
-  const speakQuestion = async (text) => {
+  const speakQuestion = async (text, audioHandle) => {
     try {
       // Prevent duplicate speaking of the same text
       if (isSpeakingRef.current || lastSpokenTextRef.current === text) {
@@ -203,34 +223,36 @@ const AIInterviewSession = () => {
       setIsAITalking(true);
       setAiAvatarState('talking');
 
-      const response = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/interview/text-to-speech`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${localStorage.getItem('token')}`
-        },
-        body: JSON.stringify({ text: text })
-      });
+      const finishSpeaking = () => {
+        setIsAITalking(false);
+        setAiAvatarState('listening');
+        isSpeakingRef.current = false;
+      };
 
-      if (response.ok) {
-        const audioBlob = await response.blob();
-        const audioUrl = URL.createObjectURL(audioBlob);
-        
-        const audio = new Audio(audioUrl);
-        audio.onended = () => {
-          setIsAITalking(false);
-          setAiAvatarState('listening');
-          isSpeakingRef.current = false;
-        };
-        
-        if (!isMuted) {
+      if (isMuted) {
+        finishSpeaking();
+        return;
+      }
+
+      // Audio synthesis started when the question was generated - play it straight
+      // from the server (which waits for it if synthesis is still running)
+      if (audioHandle) {
+        try {
+          const audio = new Audio(`${process.env.REACT_APP_BACKEND_URL}/api/interview/audio/${audioHandle}`);
+          audio.onended = finishSpeaking;
           await audio.play();
-        } else {
-          setIsAITalking(false);
-          setAiAvatarState('listening');
-          isSpeakingRef.current = false;
+          return;
+        } catch (handleError) {
+          console.warn('Pre-synthesized audio unavailable, synthesizing on demand:', handleError);
         }
       }
+
+      // Streamed sentence by sentence, so playback starts before the whole question is synthesized
+      const audio = new Audio(
+        `${process.env.REACT_APP_BACKEND_URL}/api/interview/text-to-speech/stream?text=${encodeURIComponent(text)}`
+      );
+      audio.onended = finishSpeaking;
+      await audio.play();
     } catch (error) {
       console.error('Error with text-to-speech:', error);
       isSpeakingRef.current = false;
@@ -239,22 +261,74 @@ const AIInterviewSession = () => {
     }
   };
 
+  // Live transcription: audio is sent while the candidate speaks and partial
+  // transcripts come back, so the final text is ready right after they stop
+  const openTranscriptSocket = () => {
+    try {
+      const wsUrl = `${process.env.REACT_APP_BACKEND_URL.replace(/^http/, 'ws')}/api/interview/speech-to-text/stream`;
+      const socket = new WebSocket(wsUrl);
+      socket.final = new Promise((resolve) => {
+        socket.onmessage = (event) => {
+          const message = JSON.parse(event.data);
+          if (message.type === 'partial') {
+            setCandidateAnswer(message.text);
+          } else if (message.type === 'final') {
+            resolve(message.text);
+          } else if (message.type === 'error') {
+            resolve(null);
+          }
+        };
+        socket.onerror = () => resolve(null);
+        socket.onclose = () => resolve(null);
+      });
+      socket.onopen = () => {
+        // MediaRecorder only writes the container header into the first chunk
+        audioChunksRef.current.forEach((chunk) => socket.send(chunk));
+      };
+      return socket;
+    } catch (error) {
+      console.warn('Live transcription unavailable:', error);
+      return null;
+    }
+  };
+
+  const finishLiveTranscript = async () => {
+    const socket = transcriptSocketRef.current;
+    transcriptSocketRef.current = null;
+    if (!socket || socket.readyState !== WebSocket.OPEN) {
+      if (socket) socket.close();
+      return null;
+    }
+    socket.send(JSON.stringify({ type: 'stop' }));
+    const timeout = new Promise((resolve) => setTimeout(() => resolve(null), 5000));
+    const text = await Promise.race([socket.final, timeout]);
+    socket.close();
+    return text;
+  };
+
   const startRecording = async () => {
     try {
       const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
       mediaRecorderRef.current = new MediaRecorder(stream);
       audioChunksRef.current = [];
+      transcriptSocketRef.current = openTranscriptSocket();
 
       mediaRecorderRef.current.ondataavailable = (event) => {
         audioChunksRef.current.push(event.data);
+        const socket = transcriptSocketRef.current;
+        if (socket && socket.readyState === WebSocket.OPEN && event.data.size > 0) {
+          socket.send(event.data);
+        }
       };
 
       mediaRecorderRef.current.onstop = async () => {
         const audioBlob = new Blob(audioChunksRef.current, { type: 'audio/wav' });
-        await processAnswer(audioBlob);
+        const liveTranscript = await finishLiveTranscript();
+        await processAnswer(audioBlob, liveTranscript);
       };
 
-      mediaRecorderRef.current.start();
+      // Small timeslices so audio reaches the live transcriber while the candidate speaks
+      mediaRecorderRef.current.start(250);
       setIsRecording(true);
     } catch (error) {
       toast({
@@ -272,24 +346,30 @@ const AIInterviewSession = () => {
     }
   };
 
-  const processAnswer = async (audioBlob) => {
+  const processAnswer = async (audioBlob, liveTranscript = null) => {
     try {
       setAiAvatarState('thinking');
       
-      // Convert speech to text
-      const formData = new FormData();
-      formData.append('audio', audioBlob);
+      // Convert speech to text (upload the recording if live transcription was unavailable)
+      const transcribeUpload = async () => {
+        const formData = new FormData();
+        formData.append('audio', audioBlob);
+        
+        const transcriptionResponse = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/interview/speech-to-text`, {
+          method: 'POST',
+          headers: {
+            'Authorization': `Bearer ${localStorage.getItem('token')}`
+          },
+          body: formData
+        });
+        if (!transcriptionResponse.ok) return null;
+        const { text } = await transcriptionResponse.json();
+        return text;
+      };
       
-      const transcriptionResponse = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/interview/speech-to-text`, {
-        method: 'POST',
-        headers: {
-          'Authorization': `Bearer ${localStorage.getItem('token')}`
-        },
-        body: formData
-      });
+      const text = liveTranscript ?? await transcribeUpload();
 
-      if (transcriptionResponse.ok) {
-        const { text } = await transcriptionResponse.json();
+      if (text !== null) {
         setCandidateAnswer(text);
         
         // Add to conversation with enhanced metadata
@@ -330,10 +410,10 @@ const AIInterviewSession = () => {
             setAiAvatarState('thinking');
             // Brief pause before follow-up to make it feel natural
             setTimeout(async () => {
-              await speakQuestion(nextQuestion.question);
+              await speakQuestion(nextQuestion.question, nextQuestion.audioHandle);
             }, 1500);
           } else {
-            await speakQuestion(nextQuestion.question);
+            await speakQuestion(nextQuestion.question, nextQuestion.audioHandle);
           }
         }
       }
@@ -352,19 +432,25 @@ const AIInterviewSession = () => {
     setAiAvatarState('thinking');
     
     try {
-      const response = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/interview/submit`, {
+      const postSubmit = (body) => fetch(`${process.env.REACT_APP_BACKEND_URL}/api/interview/submit`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
           'Authorization': `Bearer ${localStorage.getItem('token')}`
         },
-        body: JSON.stringify({
+        body: JSON.stringify(body)
+      });
+
+      // The server stores each turn as it happens, so only the duration is needed
+      let response = await postSubmit({ interviewId: interviewId, duration: timeElapsed });
+      if (response.status === 409) {
+        response = await postSubmit({
           interviewId: interviewId,
           conversationHistory: conversation,
           answers: conversation.filter(c => c.type === 'answer').map(c => c.text),
           duration: timeElapsed
-        })
-      });
+        });
+      }
 
       if (response.ok) {
         const result = await response.json();
@@ -22,21 +22,32 @@ const RecruiterDashboard = () => {
   const { user, logout } = useAuth();
   const { toast } = useToast();
   const [interviews, setInterviews] = useState([]);
+  const [totalInterviews, setTotalInterviews] = useState(0);
+  const [averageScore, setAverageScore] = useState(0);
   const [resumeAnalyses, setResumeAnalyses] = useState([]);
 
   useEffect(() => {
     // Load interview data from API
     const fetchData = async () => {
       try {
-        const interviewsResponse = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/interviews`, {
-          headers: {
-            'Authorization': `Bearer ${localStorage.getItem('token')}`
-          }
-        });
+        const headers = { 'Authorization': `Bearer ${localStorage.getItem('token')}` };
+        // /api/interviews is paginated: the first page is enough for the recent list,
+        // the total comes from X-Total-Count and the average from the performance rollup
+        const [interviewsResponse, statsResponse] = await Promise.all([
+          fetch(`${process.env.REACT_APP_BACKEND_URL}/api/interviews`, { headers }),
+          fetch(`${process.env.REACT_APP_BACKEND_URL}/api/interviews/performance-stats`, { headers })
+        ]);
         
         if (interviewsResponse.ok) {
           const interviewsData = await interviewsResponse.json();
           setInterviews(interviewsData);
+          const total = parseInt(interviewsResponse.headers.get('X-Total-Count'), 10);
+          setTotalInterviews(Number.isNaN(total) ? interviewsData.length : total);
+        }
+
+        if (statsResponse.ok) {
+          const statsData = await statsResponse.json();
+          setAverageScore(Math.round(statsData.summary?.averageOverallScore || 0));
         }
 
         // TODO: Fetch resume analyses when endpoint is ready
@@ -76,6 +87,8 @@ const RecruiterDashboard = () => {
       if (response.ok) {
         const result = await response.json();
         setInterviews([]);
+        setTotalInterviews(0);
+        setAverageScore(0);
         setResumeAnalyses([]);
         
         toast({
@@ -125,7 +138,7 @@ const RecruiterDashboard = () => {
   const stats = [
     {
       title: 'Total Interviews',
-      value: interviews.length,
+      value: totalInterviews,
       icon: Users,
       color: 'bg-blue-500'
     },
@@ -137,7 +150,7 @@ const RecruiterDashboard = () => {
     },
     {
       title: 'Average Score',
-      value: Math.round(interviews.reduce((acc, i) => acc + (i.score || 0), 0) / interviews.length) || 0,
+      value: averageScore,
       icon: TrendingUp,
       color: 'bg-purple-500'
     }